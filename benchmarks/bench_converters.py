@@ -0,0 +1,412 @@
+# benchmarks/bench_converters.py
+#
+# Runs each converter's core function on the corpus (benchmarks/corpus.py)
+# and records wall time, CPU time (including child processes such as
+# ghostscript/soffice), peak RSS and output size. Every run happens in a
+# fresh process, so numbers include nothing from earlier cases.
+#
+#   python -m benchmarks.bench_converters                     # run + compare
+#   python -m benchmarks.bench_converters --save-baseline     # record baseline
+#   python -m benchmarks.bench_converters --only pdf_to_jpg --sizes small,medium
+#
+# Exit status is 1 when a result regressed past --threshold against
+# benchmarks/baseline.json, and 2 when none of the results had a baseline
+# entry to be compared with. The baseline records the machine it was
+# measured on; timings from another machine are compared with a warning.
+#
+# No baseline ships with the repo: numbers only mean something on the
+# machine that gates changes. Record one there, with every converter
+# dependency installed (plus LibreOffice and the rembg model for the cases
+# that need them), and commit the file:
+#
+#   python -m benchmarks.bench_converters --save-baseline --repeat 5
+#   git add benchmarks/baseline.json
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from pathlib import Path
+
+from benchmarks import corpus as corpus_module
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# Libraries whose version changes the numbers
+MEASURED_PACKAGES = [
+    "PyMuPDF", "pikepdf", "Pillow", "numpy", "pdf2docx", "python-pptx",
+    "pandas", "openpyxl", "camelot-py", "pdfplumber", "tabula-py", "rembg", "onnxruntime",
+]
+
+
+def _soffice_missing():
+    import config
+    if shutil.which(config.SOFFICE_BINARY) or Path(config.SOFFICE_BINARY).exists():
+        return None
+    return "LibreOffice (soffice) not installed"
+
+
+def _rembg_model_missing():
+    model_dir = Path(os.environ.get("U2NET_HOME", Path.home() / ".u2net"))
+    if (model_dir / "u2net.onnx").exists():
+        return None
+    return f"rembg model not in {model_dir} (would be downloaded)"
+
+
+def _pdf_to_jpg(render_pdf_to_jpg_zip, src, out):
+    # The route's own path: chunks fanned out through run_tool (a process
+    # pool inside this benchmark process), pages stored into the ZIP
+    import asyncio
+    from converters.pdf_to_jpg import plan_pages
+    from utils import executor
+
+    path = out / "pages.zip"
+    page_count = len(plan_pages(src, 200, False))
+    try:
+        asyncio.run(render_pdf_to_jpg_zip(src, path, list(range(page_count)), 200, 95, False))
+    finally:
+        executor.shutdown()
+
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        if archive.testzip() is not None or len(names) != page_count:
+            raise RuntimeError(f"pdf_to_jpg: broken ZIP ({len(names)} of {page_count} pages)")
+    return path
+
+
+# name -> (function "module:attr", input kind, how to call it, skip check)
+# call(func, inputs, out_dir) runs the conversion and returns the output path.
+CASES = {
+    "add_pg_no": (
+        "converters.add_pg_no:add_page_numbers", "pdf",
+        lambda f, src, out: (f(str(src), str(out / "out.pdf")), out / "out.pdf")[1],
+        None,
+    ),
+    "pdf_compress": (
+        "converters.pdf_compress:compress_pdf", "pdf",
+        lambda f, src, out: (f(str(src), str(out / "out.pdf")), out / "out.pdf")[1],
+        None,
+    ),
+    "split_pdf": (
+        "converters.split_pdf:split_pdf_pages", "pdf",
+        lambda f, src, out: f(src, out / "out.pdf", 1, 2),
+        None,
+    ),
+    "merge_pdf": (
+        "converters.merge_pdf:merge_pdf_files", "pdf",
+        lambda f, src, out: f([src, src, src], out / "out.pdf"),
+        None,
+    ),
+    "pdf_to_jpg": (
+        "converters.pdf_to_jpg:render_pdf_to_jpg_zip", "pdf",
+        _pdf_to_jpg,
+        None,
+    ),
+    "pdf_to_ppt": (
+        "converters.pdf_to_pptx:pdf_file_to_ppt", "pdf",
+        lambda f, src, out: (f(str(src), str(out / "out.pptx")), out / "out.pptx")[1],
+        None,
+    ),
+    "pdf_to_word": (
+        "converters.pdf_to_word:pdf_to_word_internal", "pdf",
+        lambda f, src, out: (f(Path(src), out / "out.docx"), out / "out.docx")[1],
+        None,
+    ),
+    "pdf_to_excel": (
+        "converters.pdf_to_excel:hybrid_pdf_to_excel", "pdf",
+        lambda f, src, out: f(str(src), str(out / "out.xlsx")),
+        None,
+    ),
+    "jpg_to_pdf": (
+        "converters.jpg_to_pdf:jpg_to_pdf", "image",
+        lambda f, src, out: (f(src, out / "out.pdf"), out / "out.pdf")[1],
+        None,
+    ),
+    "bw_converter": (
+        "converters.black_white_converter:bw_convert_image", "image",
+        lambda f, src, out: (f(src, out / "out.png"), out / "out.png")[1],
+        None,
+    ),
+    "bw_converter_otsu": (
+        "converters.black_white_converter:bw_convert_image", "image",
+        lambda f, src, out: (f(src, out / "out.png", "otsu"), out / "out.png")[1],
+        None,
+    ),
+    "bw_converter_adaptive_g4": (
+        "converters.black_white_converter:bw_convert_image", "image",
+        lambda f, src, out: (f(src, out / "out.tiff", "adaptive"), out / "out.tiff")[1],
+        None,
+    ),
+    "bg_remove": (
+        "converters.bg_remove:process_background_removal", "image",
+        lambda f, src, out: (f(src, out / "out.png"), out / "out.png")[1],
+        _rembg_model_missing,
+    ),
+    "bg_white_adder": (
+        "converters.bg_white_adder:add_white_background", "image",
+        lambda f, src, out: (f(src, out / "out.jpg"), out / "out.jpg")[1],
+        _rembg_model_missing,
+    ),
+    "word_to_pdf": (
+        "converters.word_to_pdf:convert_word_to_pdf_libreoffice", "docx",
+        lambda f, src, out: f(Path(src), out / "out.pdf"),
+        _soffice_missing,
+    ),
+    "excel_to_pdf": (
+        "converters.excel_to_pdf:excel_to_pdf", "xlsx",
+        lambda f, src, out: f(str(src), str(out / "out.pdf")),
+        _soffice_missing,
+    ),
+    "pptx_to_pdf": (
+        "converters.pptx_to_pdf:convert_ppt_logic", "pptx",
+        lambda f, src, out: (f(str(src), str(out / "out.pdf")), out / "out.pdf")[1],
+        None,
+    ),
+}
+
+# text_to_speech is left out: gTTS needs the network.
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak = max(own, children)
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _cpu_seconds():
+    if resource is None:
+        return time.process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _output_size(path) -> int:
+    path = Path(path)
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+
+def _run_once(case_name: str, input_path: str) -> dict:
+    """Runs in a fresh worker process."""
+    target, _, call, _ = CASES[case_name]
+    module_name, attr = target.split(":")
+    func = getattr(importlib.import_module(module_name), attr)
+
+    with tempfile.TemporaryDirectory(prefix="dtit_bench_") as out_dir:
+        # Working copy, so tools that delete or rewrite their input can't
+        # touch the corpus
+        src = Path(out_dir) / f"input{Path(input_path).suffix}"
+        shutil.copy2(input_path, src)
+
+        cpu_start = _cpu_seconds()
+        wall_start = time.perf_counter()
+        output = call(func, src, Path(out_dir))
+        wall = time.perf_counter() - wall_start
+        cpu = _cpu_seconds() - cpu_start
+
+        return {
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_rss_kb": _peak_rss_kb(),
+            "output_bytes": _output_size(output),
+        }
+
+
+def machine_info() -> dict:
+    """
+    What the numbers were measured on: platform, CPU, memory, Python and
+    the versions of the converter libraries (None when not installed).
+    """
+    memory = None
+    if hasattr(os, "sysconf"):
+        try:
+            memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError):
+            pass
+
+    packages = {}
+    for name in MEASURED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "memory_bytes": memory,
+        "python": platform.python_version(),
+        "packages": packages,
+    }
+
+
+def _same_machine(a: dict, b: dict) -> bool:
+    keys = ("platform", "machine", "processor", "cpu_count", "memory_bytes", "python")
+    return all(a.get(k) == b.get(k) for k in keys)
+
+
+def load_baseline(path: Path) -> dict:
+    if not path.exists():
+        return {"machine": None, "results": {}}
+    return json.loads(path.read_text())
+
+
+def save_baseline(path: Path, results: dict):
+    """
+    Record results (failed cases left out) with this machine's details.
+    Entries from an earlier run on the same machine are kept; a baseline
+    from another machine is replaced.
+    """
+    machine = machine_info()
+    baseline = load_baseline(path)
+    kept = baseline["results"] if baseline["machine"] and _same_machine(baseline["machine"], machine) else {}
+
+    kept.update({key: result for key, result in results.items() if "error" not in result})
+    path.write_text(json.dumps({"machine": machine, "results": kept}, indent=2, sort_keys=True) + "\n")
+
+
+def run_case(case_name: str, input_path: Path, repeat: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    runs = []
+
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            runs.append(pool.submit(_run_once, case_name, str(input_path)).result())
+
+    peaks = [r["peak_rss_kb"] for r in runs if r["peak_rss_kb"] is not None]
+    return {
+        "input_bytes": input_path.stat().st_size,
+        "wall_seconds": round(statistics.median(r["wall_seconds"] for r in runs), 4),
+        "cpu_seconds": round(statistics.median(r["cpu_seconds"] for r in runs), 4),
+        "peak_rss_kb": max(peaks) if peaks else None,
+        "output_bytes": runs[-1]["output_bytes"],
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Regressions as (case, metric, baseline, current). Output size is checked
+    both ways: a shrinking output can mean lost content.
+    """
+    regressions = []
+
+    for key, current in results.items():
+        before = baseline.get(key)
+        if not before or "error" in current or "error" in before:
+            continue
+
+        for metric in ("wall_seconds", "cpu_seconds", "peak_rss_kb"):
+            old, new = before.get(metric), current.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append((key, metric, old, new))
+
+        old, new = before.get("output_bytes"), current.get("output_bytes")
+        if old and new is not None and abs(new - old) > old * threshold:
+            regressions.append((key, "output_bytes", old, new))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every converter on the corpus")
+    parser.add_argument("--only", help="comma-separated case names (default: all)")
+    parser.add_argument("--sizes", default="small,medium,large,sample", help="comma-separated corpus sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (median is kept)")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown/growth vs baseline (0.2 = 20%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    sizes = args.sizes.split(",")
+    corpus = corpus_module.build()
+    results = {}
+
+    for name in names:
+        _, kind, _, check = CASES[name]
+        skip_reason = check() if check else None
+
+        for size in sizes:
+            input_path = corpus.get(kind, {}).get(size)
+            if input_path is None:
+                continue
+
+            key = f"{name}/{size}"
+            if skip_reason:
+                print(f"  {key:28s} skipped: {skip_reason}")
+                continue
+
+            try:
+                result = run_case(name, input_path, args.repeat)
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+                print(f"  {key:28s} failed: {result['error']}")
+            else:
+                rss = f"{result['peak_rss_kb'] / 1024:8.1f} MB" if result["peak_rss_kb"] else "       n/a"
+                print(
+                    f"  {key:28s} wall {result['wall_seconds']:8.3f} s  cpu {result['cpu_seconds']:8.3f} s"
+                    f"  rss {rss}  out {result['output_bytes'] / 1024:10.1f} KB"
+                )
+            results[key] = result
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    compared = [key for key, result in results.items() if "error" not in result and key in baseline["results"]]
+    if not compared:
+        print(f"nothing compared: no baseline entries in {args.baseline} for these results;")
+        print("record them on this machine with --save-baseline")
+        sys.exit(2)
+
+    if not _same_machine(baseline["machine"] or {}, machine_info()):
+        print("WARNING: the baseline was recorded on another machine; timings are not comparable:")
+        print(f"  baseline: {json.dumps(baseline['machine'], sort_keys=True)}")
+
+    regressions = compare(results, baseline["results"], args.threshold)
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%} vs baseline")
+        return
+
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} vs baseline:")
+    for key, metric, old, new in regressions:
+        print(f"  {key:28s} {metric:14s} {old} -> {new}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
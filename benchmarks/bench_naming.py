@@ -0,0 +1,99 @@
+
+# benchmarks/bench_naming.py
+#
+# Output naming: legacy counter probing (name(1), name(2), ...) vs one
+# request folder per output.
+#
+#   python -m benchmarks.bench_naming --existing 5000 --calls 200 --threads 16
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from utils.file_utils import get_unique_filename, create_request_dir
+
+
+def seed_directory(directory: Path, count: int):
+    """Fill directory with name.pdf, name(1).pdf, ... name(count-1).pdf"""
+    (directory / "name.pdf").touch()
+    for i in range(1, count):
+        (directory / f"name({i}).pdf").touch()
+
+
+def time_counter_naming(directory: Path, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        filename = get_unique_filename(directory, "name", ".pdf")
+        (directory / filename).touch()
+    return time.perf_counter() - start
+
+
+def time_request_dirs(directory: Path, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        (create_request_dir(directory) / "name.pdf").touch()
+    return time.perf_counter() - start
+
+
+def count_collisions(directory: Path, threads: int, naming) -> int:
+    """
+    Let threads name outputs at the same moment; count names handed out twice.
+    """
+    barrier = threading.Barrier(threads)
+    names = []
+    lock = threading.Lock()
+
+    def worker():
+        barrier.wait()
+        path = naming(directory)
+        with lock:
+            names.append(path)
+        path.touch()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    return len(names) - len(set(names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark output naming schemes")
+    parser.add_argument("--existing", type=int, default=5000, help="same-named files already in the folder")
+    parser.add_argument("--calls", type=int, default=200, help="outputs to name per scheme")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent requests for the race test")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir = Path(tmp) / "legacy"
+        request_dir = Path(tmp) / "request_dirs"
+        legacy_dir.mkdir()
+        request_dir.mkdir()
+
+        seed_directory(legacy_dir, args.existing)
+        for _ in range(args.existing):
+            (create_request_dir(request_dir) / "name.pdf").touch()
+
+        legacy = time_counter_naming(legacy_dir, args.calls)
+        per_request = time_request_dirs(request_dir, args.calls)
+
+        legacy_races = count_collisions(
+            legacy_dir, args.threads,
+            lambda d: d / get_unique_filename(d, "name", ".pdf"),
+        )
+        request_races = count_collisions(
+            request_dir, args.threads,
+            lambda d: create_request_dir(d) / "name.pdf",
+        )
+
+    print(f"{args.existing} existing same-named files, {args.calls} new outputs")
+    print(f"  counter naming : {legacy / args.calls * 1000:8.3f} ms/output, {legacy_races} collisions")
+    print(f"  request folders: {per_request / args.calls * 1000:8.3f} ms/output, {request_races} collisions")
+
+
+if __name__ == "__main__":
+    main()
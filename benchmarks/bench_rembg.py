@@ -0,0 +1,101 @@
+# benchmarks/bench_rembg.py
+#
+# Background-removal quality tiers: per-image inference latency and mask IoU
+# against the full-precision u2net, on the image corpus.
+#
+#   python -m benchmarks.bench_rembg
+#   python -m benchmarks.bench_rembg --models u2net,u2net_int8,u2netp,silueta --repeat 5
+#
+# Build the int8 model first with python -m scripts.quantize_rembg.
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from benchmarks import corpus as corpus_module
+from utils import segmentation
+
+
+REFERENCE_MODEL = "u2net"
+
+
+def mask_iou(a, b, threshold: int = 128) -> float:
+    import numpy as np
+
+    a = np.asarray(a) >= threshold
+    b = np.asarray(b) >= threshold
+    union = np.logical_or(a, b).sum()
+    if union == 0:
+        return 1.0
+    return float(np.logical_and(a, b).sum() / union)
+
+
+def bench_model(model: str, images: list, repeat: int) -> dict:
+    start = time.perf_counter()
+    segmentation.get_session(model)
+    load_seconds = time.perf_counter() - start
+
+    latencies, masks = [], []
+    for image in images:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            mask = segmentation.predict_raw_masks([image], model)[0]
+            runs.append(time.perf_counter() - start)
+        latencies.append(statistics.median(runs))
+        masks.append(segmentation.fit_mask(mask, image.size))
+
+    return {"load_seconds": load_seconds, "latencies": latencies, "masks": masks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark background-removal models and tiers")
+    parser.add_argument("--models", default="u2net,u2net_int8,u2netp", help="comma-separated models")
+    parser.add_argument("--repeat", type=int, default=3, help="inferences per image (median is kept)")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    corpus = corpus_module.build()
+    paths = list(corpus["image"].values())
+    images = [segmentation.open_for_inference(path, REFERENCE_MODEL) for path in paths]
+
+    models = [m for m in args.models.split(",") if segmentation.is_available(m)]
+    skipped = [m for m in args.models.split(",") if m not in models]
+    if REFERENCE_MODEL not in models:
+        models.insert(0, REFERENCE_MODEL)
+
+    results = {name: bench_model(name, images, args.repeat) for name in models}
+    reference = results[REFERENCE_MODEL]["masks"]
+
+    report = {}
+    print(f"{len(images)} images, median of {args.repeat} runs each, IoU vs {REFERENCE_MODEL}")
+    print(f"  {'model':12s} {'load s':>8s} {'ms/image':>10s} {'speedup':>8s} {'mean IoU':>9s} {'min IoU':>8s}")
+
+    reference_ms = statistics.mean(results[REFERENCE_MODEL]["latencies"]) * 1000
+    for name, result in results.items():
+        ms = statistics.mean(result["latencies"]) * 1000
+        ious = [mask_iou(a, b) for a, b in zip(result["masks"], reference)]
+        report[name] = {
+            "load_seconds": round(result["load_seconds"], 3),
+            "ms_per_image": round(ms, 2),
+            "speedup": round(reference_ms / ms, 2),
+            "mean_iou": round(statistics.mean(ious), 4),
+            "min_iou": round(min(ious), 4),
+        }
+        r = report[name]
+        print(
+            f"  {name:12s} {r['load_seconds']:8.2f} {r['ms_per_image']:10.1f} {r['speedup']:7.2f}x"
+            f" {r['mean_iou']:9.4f} {r['min_iou']:8.4f}"
+        )
+
+    for name in skipped:
+        print(f"  {name:12s} skipped: model file not found")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+#
+# Import time of the app and of every tool router, each measured in a fresh
+# interpreter so nothing is already cached in sys.modules.
+#
+#   python -m benchmarks.bench_startup --repeat 3
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ROUTERS = [
+    "converters.add_pg_no",
+    "converters.bg_remove",
+    "converters.bg_white_adder",
+    "converters.black_white_converter",
+    "converters.excel_to_pdf",
+    "converters.jpg_to_pdf",
+    "converters.merge_pdf",
+    "converters.pdf_compress",
+    "converters.pdf_to_excel",
+    "converters.pdf_to_jpg",
+    "converters.pdf_to_pptx",
+    "converters.pdf_to_word",
+    "converters.pptx_to_pdf",
+    "converters.split_pdf",
+    "converters.text_to_speech",
+    "converters.word_to_pdf",
+]
+
+# Imported first and subtracted, so router numbers are only their own cost
+BASELINE = ["fastapi", "config", "utils.storage_manager", "utils.jobs", "utils.executor"]
+
+PROBE = """
+import importlib, json, sys, time
+for name in {baseline!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+error = None
+try:
+    importlib.import_module({module!r})
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+print(json.dumps({{"seconds": time.perf_counter() - start, "error": error}}))
+"""
+
+
+def time_import(module: str, baseline) -> dict:
+    code = PROBE.format(baseline=list(baseline), module=module)
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        lines = result.stderr.strip().splitlines() or ["no output"]
+        return {"seconds": None, "error": lines[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def best_of(module: str, baseline, repeat: int) -> dict:
+    runs = [time_import(module, baseline) for _ in range(repeat)]
+    timed = [r for r in runs if r["seconds"] is not None and r["error"] is None]
+    if not timed:
+        return runs[-1]
+    return min(timed, key=lambda r: r["seconds"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app and router import time")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module (best is kept)")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    results = {"main": best_of("main", [], args.repeat)}
+    for module in ROUTERS:
+        results[module] = best_of(module, BASELINE, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"best of {args.repeat} fresh interpreters")
+    for module, result in results.items():
+        if result["error"]:
+            print(f"  {module:36s}   failed: {result['error']}")
+        else:
+            print(f"  {module:36s} {result['seconds'] * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
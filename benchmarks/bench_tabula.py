@@ -0,0 +1,77 @@
+# benchmarks/bench_tabula.py
+#
+# tabula cold vs warm: one java subprocess per call (the old behaviour)
+# against the resident JPype JVM, on the PDF corpus. Each mode runs in a
+# fresh process, so "first call" includes JVM startup and class loading.
+#
+#   python -m benchmarks.bench_tabula
+#   python -m benchmarks.bench_tabula --repeat 10 --json tabula.json
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks import corpus as corpus_module
+
+
+def _measure(force_subprocess: bool, pdf_path: str, repeat: int) -> dict:
+    """Runs in a fresh process."""
+    import config
+    from utils import tables
+
+    config.TABULA_FORCE_SUBPROCESS = force_subprocess
+
+    timings = []
+    for _ in range(repeat + 1):
+        start = time.perf_counter()
+        tables.read_tables(pdf_path)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "first_call": timings[0],
+        "warm_median": statistics.median(timings[1:]),
+        "jvm_in_process": tables.jvm_running(),
+    }
+
+
+def measure(force_subprocess: bool, pdf_path: Path, repeat: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure, force_subprocess, str(pdf_path), repeat).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tabula: java subprocess per call vs resident JVM")
+    parser.add_argument("--repeat", type=int, default=5, help="calls after the first one")
+    parser.add_argument("--sizes", help="comma-separated corpus sizes (default: all)")
+    parser.add_argument("--json", type=Path, help="also write results to this file")
+    args = parser.parse_args()
+
+    pdfs = corpus_module.build()["pdf"]
+    sizes = args.sizes.split(",") if args.sizes else list(pdfs)
+
+    report = {}
+    print(f"  {'size':8s} {'mode':10s} {'first s':>8s} {'warm s':>8s}")
+    for size in sizes:
+        report[size] = {}
+        for mode, force_subprocess in (("subprocess", True), ("jvm", False)):
+            result = measure(force_subprocess, pdfs[size], args.repeat)
+            if mode == "jvm" and not result["jvm_in_process"]:
+                mode = "jvm (n/a)"  # JPype missing: tabula fell back to subprocess
+            report[size][mode] = {k: round(v, 4) if isinstance(v, float) else v for k, v in result.items()}
+            print(f"  {size:8s} {mode:10s} {result['first_call']:8.3f} {result['warm_median']:8.3f}")
+
+        sub, jvm = report[size].get("subprocess"), report[size].get("jvm")
+        if sub and jvm and jvm["warm_median"]:
+            print(f"  {size:8s} warm speed-up {sub['warm_median'] / jvm['warm_median']:.1f}x")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# benchmarks/corpus.py
+#
+# Reproducible benchmark inputs. Synthetic files are generated from fixed
+# seeds in three sizes (small / medium / large); real-world samples found in
+# storage/uploads are copied in as a fourth "sample" size. Nothing is
+# downloaded.
+#
+#   python -m benchmarks.corpus            # build (or reuse) benchmarks/corpus/
+
+import argparse
+import random
+import shutil
+from pathlib import Path
+
+import config
+
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+SIZES = ["small", "medium", "large"]
+
+PDF_PAGES = {"small": 2, "medium": 20, "large": 100}
+IMAGE_SIZES = {"small": (800, 600), "medium": (2000, 1500), "large": (4000, 3000)}
+SHEET_ROWS = {"small": 50, "medium": 500, "large": 5000}
+SLIDES = {"small": 2, "medium": 20, "large": 60}
+
+SAMPLE_EXTENSIONS = {
+    "pdf": {".pdf"},
+    "image": {".jpg", ".jpeg"},
+    "docx": {".docx"},
+    "xlsx": {".xlsx"},
+    "pptx": {".ppt", ".pptx"},
+}
+
+
+def make_image(path: Path, size: tuple, seed: int):
+    """Photo-like JPEG: gradients plus random shapes, fixed by seed."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    width, height = size
+
+    red = Image.linear_gradient("L").resize(size)
+    green = Image.radial_gradient("L").resize(size)
+    blue = Image.linear_gradient("L").rotate(90).resize(size)
+    image = Image.merge("RGB", (red, green, blue))
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(200):
+        x0, y0 = rng.randrange(width), rng.randrange(height)
+        x1, y1 = x0 + rng.randrange(width // 4 + 1), y0 + rng.randrange(height // 4 + 1)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        if rng.random() < 0.5:
+            draw.ellipse((x0, y0, x1, y1), fill=color)
+        else:
+            draw.rectangle((x0, y0, x1, y1), fill=color)
+
+    image.save(path, "JPEG", quality=90)
+
+
+def make_pdf(path: Path, pages: int, seed: int):
+    """Text paragraphs, a ruled table and one photo per page."""
+    import fitz
+
+    rng = random.Random(seed)
+    photo = path.with_suffix(".photo.jpg")
+    make_image(photo, (1200, 900), seed)
+
+    doc = fitz.open()
+    try:
+        for page_number in range(pages):
+            page = doc.new_page(width=595, height=842)
+
+            words = [rng.choice(["lorem", "ipsum", "dolor", "sit", "amet", "table", "value", "total"])
+                     for _ in range(120)]
+            page.insert_textbox(fitz.Rect(50, 50, 545, 250), " ".join(words), fontsize=10)
+
+            # 6 x 5 table
+            top = 270
+            for row in range(7):
+                page.draw_line((50, top + row * 20), (545, top + row * 20))
+            for col in range(6):
+                x = 50 + col * 99
+                page.draw_line((x, top), (x, top + 120))
+            for row in range(6):
+                for col in range(5):
+                    page.insert_text((55 + col * 99, top + 14 + row * 20), str(rng.randrange(10000)), fontsize=9)
+
+            page.insert_image(fitz.Rect(50, 420, 545, 790), filename=str(photo))
+            page.insert_text((280, 820), f"Page {page_number + 1}", fontsize=8)
+
+        doc.save(path, deflate=True)
+    finally:
+        doc.close()
+        photo.unlink(missing_ok=True)
+
+
+def make_xlsx(path: Path, rows: int, seed: int):
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["id", "name", "quantity", "price", "total"])
+    for i in range(rows):
+        quantity, price = rng.randrange(1, 100), round(rng.uniform(1, 500), 2)
+        sheet.append([i + 1, f"item-{rng.randrange(100000)}", quantity, price, round(quantity * price, 2)])
+    workbook.save(path)
+
+
+def make_pptx(path: Path, slides: int, seed: int):
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    photo = path.with_suffix(".photo.jpg")
+    make_image(photo, (1280, 720), seed)
+
+    prs = Presentation()
+    try:
+        for i in range(slides):
+            slide = prs.slides.add_slide(prs.slide_layouts[5])
+            slide.shapes.title.text = f"Slide {i + 1}"
+            slide.shapes.add_picture(str(photo), Inches(1), Inches(1.5), width=Inches(8))
+        prs.save(path)
+    finally:
+        photo.unlink(missing_ok=True)
+
+
+def _find_sample(kind: str):
+    extensions = SAMPLE_EXTENSIONS[kind]
+    if not config.UPLOAD_ROOT.exists():
+        return None
+    candidates = sorted(
+        p for p in config.UPLOAD_ROOT.rglob("*")
+        if p.is_file() and p.suffix.lower() in extensions
+    )
+    return candidates[0] if candidates else None
+
+
+def build(corpus_dir: Path = CORPUS_DIR, force: bool = False) -> dict:
+    """
+    Create the corpus (existing files are reused unless force) and return
+    {kind: {size: path}}.
+    """
+    if force and corpus_dir.exists():
+        shutil.rmtree(corpus_dir)
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+
+    generators = {
+        "pdf": (".pdf", lambda p, size, seed: make_pdf(p, PDF_PAGES[size], seed)),
+        "image": (".jpg", lambda p, size, seed: make_image(p, IMAGE_SIZES[size], seed)),
+        "xlsx": (".xlsx", lambda p, size, seed: make_xlsx(p, SHEET_ROWS[size], seed)),
+        "pptx": (".pptx", lambda p, size, seed: make_pptx(p, SLIDES[size], seed)),
+    }
+
+    corpus = {kind: {} for kind in SAMPLE_EXTENSIONS}
+
+    for kind, (extension, generate) in generators.items():
+        for seed, size in enumerate(SIZES, start=1):
+            path = corpus_dir / f"{kind}_{size}{extension}"
+            if not path.exists():
+                generate(path, size, seed)
+            corpus[kind][size] = path
+
+    for kind in SAMPLE_EXTENSIONS:
+        path = corpus_dir / f"{kind}_sample"
+        existing = sorted(corpus_dir.glob(f"{kind}_sample.*"))
+        if existing:
+            corpus[kind]["sample"] = existing[0]
+            continue
+
+        sample = _find_sample(kind)
+        if sample is not None:
+            path = path.with_suffix(sample.suffix.lower())
+            shutil.copy2(sample, path)
+            corpus[kind]["sample"] = path
+
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the benchmark corpus")
+    parser.add_argument("--force", action="store_true", help="regenerate every file")
+    args = parser.parse_args()
+
+    corpus = build(force=args.force)
+    for kind, files in corpus.items():
+        for size, path in files.items():
+            print(f"  {kind:6s} {size:7s} {path.stat().st_size / 1024:10.1f} KB  {path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/fakes.py
+#
+# Local stand-ins for the Google services text_to_speech calls (gTTS and
+# googletrans), so the tool can be load-tested offline. They keep the shape
+# of the real work: a network-like delay, then a valid MP3 that pydub can
+# decode, roughly as long as the text.
+
+import time
+from types import SimpleNamespace
+
+
+# One MPEG-1 Layer III frame, 128 kbit/s, 44.1 kHz, mono, all-zero side info
+# and main data: decodes to ~26 ms of silence.
+SILENT_MP3_FRAME = b"\xff\xfb\x90\xc4" + bytes(413)
+FRAMES_PER_SECOND = 38
+
+SECONDS_PER_WORD = 0.35
+
+
+def silent_mp3(seconds: float) -> bytes:
+    return SILENT_MP3_FRAME * max(1, int(seconds * FRAMES_PER_SECOND))
+
+
+class FakeTranslator:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def translate(self, text, src="auto", dest="en"):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=text, src=src, dest=dest)
+
+
+def make_synthesize(latency: float):
+    def synthesize(text: str, language: str, mp3_path: str):
+        time.sleep(latency)
+        seconds = len(text.split()) * SECONDS_PER_WORD
+        with open(mp3_path, "wb") as f:
+            f.write(silent_mp3(seconds))
+
+    return synthesize
+
+
+def install(latency: float = 0.2):
+    """
+    Route text_to_speech through the fakes. latency is the simulated round
+    trip to Google per call, in seconds.
+    """
+    from converters import text_to_speech
+
+    text_to_speech.synthesize = make_synthesize(latency)
+    text_to_speech._translator = FakeTranslator(latency)
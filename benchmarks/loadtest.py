@@ -0,0 +1,354 @@
+# benchmarks/loadtest.py
+#
+# HTTP load test: a weighted mix of tools hit concurrently, reporting
+# throughput, p50/p95/p99 latency and error rate per tool. Google TTS and
+# translation are replaced by local fakes (benchmarks/fakes.py), and the
+# result cache is off so every request really converts.
+#
+#   # in-process (no server needed)
+#   python -m benchmarks.loadtest --mix add_pg_no=2,pdf_to_jpg=1,text_to_speech=3 --concurrency 16 --duration 30
+#
+#   # real uvicorn servers, once per worker count
+#   python -m benchmarks.loadtest --workers 1,2,4 --duration 60
+#
+#   # an already running server
+#   python -m benchmarks.loadtest --url http://127.0.0.1:8000
+#
+# Each run is saved to benchmarks/results/ as JSON; --compare prints the
+# change against an earlier report.
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from benchmarks import corpus as corpus_module
+
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+ROOT = Path(__file__).resolve().parent.parent
+
+TTS_TEXTS = [
+    "The quick brown fox jumps over the lazy dog while the band plays on.",
+    "Please find attached the quarterly report with the revised figures.",
+    "Tomorrow the meeting starts at nine in the main conference room.",
+]
+
+# tool -> (route, corpus kind, upload field, files per request, extra form data)
+TOOLS = {
+    "add_pg_no": ("/add-page-number/", "pdf", "file", 1, {}),
+    "pdf_compress": ("/pdf-compress/", "pdf", "file", 1, {}),
+    "split_pdf": ("/split-pdf/", "pdf", "file", 1, {"start_page": "1", "end_page": "1"}),
+    "merge_pdf": ("/merge-pdf/", "pdf", "files", 2, {}),
+    "pdf_to_jpg": ("/pdf-to-jpg/", "pdf", "file", 1, {}),
+    "pdf_to_jpg_stream": ("/pdf-to-jpg/", "pdf", "file", 1, {"stream": "true"}),
+    "pdf_to_ppt": ("/pdf-to-ppt/", "pdf", "file", 1, {}),
+    "pdf_to_word": ("/pdf-to-word/", "pdf", "file", 1, {}),
+    "pdf_to_excel": ("/pdf-to-excel/", "pdf", "file", 1, {}),
+    "jpg_to_pdf": ("/jpg-to-pdf/", "image", "file", 1, {}),
+    "bw_converter": ("/bw-converter/", "image", "img", 1, {}),
+    "bg_remove": ("/remove-bg/", "image", "file", 1, {}),
+    "bg_white_adder": ("/white-background/", "image", "file", 1, {}),
+    "word_to_pdf": ("/word-to-pdf/", "docx", "file", 1, {}),
+    "excel_to_pdf": ("/excel-to-pdf/", "xlsx", "file", 1, {}),
+    "pptx_to_pdf": ("/pptx-to-pdf/", "pptx", "file", 1, {}),
+    "text_to_speech": ("/text-to-speech/", None, None, 0, {"gender": "female", "language": "en"}),
+}
+
+DEFAULT_MIX = "add_pg_no=2,pdf_compress=1,split_pdf=2,merge_pdf=1,pdf_to_jpg=1,jpg_to_pdf=2,bw_converter=2,text_to_speech=3"
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in TOOLS:
+            raise SystemExit(f"unknown tool in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    # nearest rank
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def is_error(response: httpx.Response) -> bool:
+    if response.status_code >= 400:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and (body.get("status") == "error" or body.get("success") is False)
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, weights: dict, inputs: dict, seed: int):
+        self.client = client
+        self.tools = list(weights)
+        self.weights = [weights[t] for t in self.tools]
+        self.inputs = inputs
+        self.rng = random.Random(seed)
+        self.samples = {tool: [] for tool in self.tools}
+
+    def _request(self, tool: str):
+        route, kind, field, count, data = TOOLS[tool]
+        data = dict(data)
+
+        if kind is None:
+            data["text"] = self.rng.choice(TTS_TEXTS)
+            return route, data, None
+
+        name, content = self.inputs[kind]
+        files = [(field, (name, content)) for _ in range(count)]
+        return route, data, files
+
+    async def _one(self, tool: str):
+        route, data, files = self._request(tool)
+        start = time.perf_counter()
+        try:
+            response = await self.client.post(route, data=data, files=files)
+            error = is_error(response)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            error, status = True, type(e).__name__
+        self.samples[tool].append((time.perf_counter() - start, error, status))
+
+    async def _worker(self, deadline: float, budget: list):
+        while time.perf_counter() < deadline:
+            if budget is not None:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+            tool = self.rng.choices(self.tools, self.weights)[0]
+            await self._one(tool)
+
+    async def run(self, concurrency: int, duration: float, requests: int = None) -> float:
+        deadline = time.perf_counter() + duration
+        budget = [requests] if requests else None
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(deadline, budget) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        tools = {}
+        all_latencies, all_errors = [], 0
+
+        for tool, samples in self.samples.items():
+            latencies = [s[0] for s in samples]
+            errors = sum(1 for s in samples if s[1])
+            statuses = {}
+            for _, _, status in samples:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+            all_latencies += latencies
+            all_errors += errors
+
+            tools[tool] = {
+                "requests": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / len(samples), 4) if samples else None,
+                "throughput_rps": round((len(samples) - errors) / elapsed, 3),
+                "p50_seconds": _round(percentile(latencies, 50)),
+                "p95_seconds": _round(percentile(latencies, 95)),
+                "p99_seconds": _round(percentile(latencies, 99)),
+                "statuses": statuses,
+            }
+
+        total = len(all_latencies)
+        tools["_all"] = {
+            "requests": total,
+            "errors": all_errors,
+            "error_rate": round(all_errors / total, 4) if total else None,
+            "throughput_rps": round((total - all_errors) / elapsed, 3),
+            "p50_seconds": _round(percentile(all_latencies, 50)),
+            "p95_seconds": _round(percentile(all_latencies, 95)),
+            "p99_seconds": _round(percentile(all_latencies, 99)),
+        }
+        return tools
+
+
+def _round(value):
+    return None if value is None else round(value, 4)
+
+
+def load_inputs(size: str) -> dict:
+    corpus = corpus_module.build()
+    inputs = {}
+    for kind, files in corpus.items():
+        path = files.get(size) or files.get("sample")
+        if path is not None:
+            inputs[kind] = (f"input{path.suffix}", path.read_bytes())
+    return inputs
+
+
+async def run_in_process(args, weights, inputs) -> dict:
+    os.environ["DTIT_FAKE_LATENCY"] = str(args.fake_latency)
+    if args.cache:
+        os.environ["DTIT_LOADTEST_CACHE"] = "1"
+    from benchmarks.loadtest_app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            test = LoadTest(client, weights, inputs, args.seed)
+            elapsed = await test.run(args.concurrency, args.duration, args.requests)
+    return {"elapsed_seconds": round(elapsed, 3), "tools": test.report(elapsed)}
+
+
+async def run_against(url: str, args, weights, inputs) -> dict:
+    async with httpx.AsyncClient(base_url=url, timeout=args.timeout) as client:
+        test = LoadTest(client, weights, inputs, args.seed)
+        elapsed = await test.run(args.concurrency, args.duration, args.requests)
+    return {"elapsed_seconds": round(elapsed, 3), "tools": test.report(elapsed)}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, args):
+    port = _free_port()
+    env = dict(os.environ, DTIT_FAKE_LATENCY=str(args.fake_latency))
+    if args.cache:
+        env["DTIT_LOADTEST_CACHE"] = "1"
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.loadtest_app:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {process.returncode}")
+        try:
+            if httpx.get(f"{url}/api/", timeout=1).status_code < 500:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("uvicorn did not come up in time")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(label: str, run: dict):
+    print(f"\n{label}  ({run['elapsed_seconds']} s)")
+    print(f"  {'tool':16s} {'reqs':>6s} {'err%':>6s} {'ok/s':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+    for tool, stats in run["tools"].items():
+        err = f"{stats['error_rate'] * 100:5.1f}" if stats["error_rate"] is not None else "  n/a"
+        p = [f"{stats[k]:8.3f}" if stats[k] is not None else "     n/a" for k in ("p50_seconds", "p95_seconds", "p99_seconds")]
+        print(f"  {tool:16s} {stats['requests']:6d} {err:>6s} {stats['throughput_rps']:8.2f} {p[0]} {p[1]} {p[2]}")
+
+
+def print_comparison(report: dict, previous: dict):
+    print(f"\ncompared with {previous.get('meta', {}).get('timestamp', 'previous run')}:")
+    old_runs = previous.get("runs", {})
+    for label, run in report["runs"].items():
+        old = old_runs.get(label)
+        if old is None:
+            continue
+        for tool, stats in run["tools"].items():
+            before = old["tools"].get(tool)
+            if not before or not before.get("p95_seconds") or stats.get("p95_seconds") is None:
+                continue
+            rps = stats["throughput_rps"] - before["throughput_rps"]
+            p95 = (stats["p95_seconds"] / before["p95_seconds"] - 1) * 100
+            print(f"  {label:10s} {tool:16s} ok/s {rps:+8.2f}   p95 {p95:+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the API with a concurrent mix of tools")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="tool=weight,... (default: tools that need no models or LibreOffice)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests (per run)")
+    parser.add_argument("--size", default="small", choices=corpus_module.SIZES + ["sample"], help="corpus file size")
+    parser.add_argument("--workers", help="comma-separated uvicorn worker counts; starts a server per count")
+    parser.add_argument("--url", help="test an already running server instead")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="simulated Google round trip (s)")
+    parser.add_argument("--cache", action="store_true", help="keep the result cache on")
+    parser.add_argument("--timeout", type=float, default=300, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="report path (default: benchmarks/results/loadtest_<time>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    inputs = load_inputs(args.size)
+    missing = {TOOLS[t][1] for t in weights if TOOLS[t][1] and TOOLS[t][1] not in inputs}
+    if missing:
+        raise SystemExit(f"no corpus files for: {', '.join(sorted(missing))}")
+
+    runs = {}
+    if args.url:
+        runs["external"] = asyncio.run(run_against(args.url, args, weights, inputs))
+    elif args.workers:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            process, url = start_server(workers, args)
+            try:
+                runs[f"workers={workers}"] = asyncio.run(run_against(url, args, weights, inputs))
+            finally:
+                process.terminate()
+                process.wait()
+    else:
+        runs["in-process"] = asyncio.run(run_in_process(args, weights, inputs))
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    report = {
+        "meta": {
+            "timestamp": timestamp,
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        },
+        "runs": runs,
+    }
+
+    for label, run in runs.items():
+        print_report(label, run)
+
+    output = args.output or RESULTS_DIR / f"loadtest_{timestamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"\nreport saved to {output}")
+
+    if args.compare:
+        print_comparison(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
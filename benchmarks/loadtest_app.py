@@ -0,0 +1,23 @@
+# benchmarks/loadtest_app.py
+#
+# The API with offline stand-ins for Google TTS / translation, for load
+# tests against real uvicorn workers:
+#
+#   uvicorn benchmarks.loadtest_app:app --workers 4
+#
+# DTIT_FAKE_LATENCY  simulated Google round trip in seconds (default 0.2)
+# DTIT_LOADTEST_CACHE=1 keeps the result cache on (off by default, so
+#                    repeated inputs are really converted every time)
+
+import os
+
+import config
+from benchmarks import fakes
+
+
+fakes.install(float(os.environ.get("DTIT_FAKE_LATENCY", "0.2")))
+
+if os.environ.get("DTIT_LOADTEST_CACHE") != "1":
+    config.RESULT_CACHE_ENABLED = False
+
+from main import app  # noqa: E402
@@ -5,7 +5,7 @@
 from pathlib import Path
 
 
-
+import os
 import shutil
 
 
@@ -54,7 +54,360 @@ GS_BINARY = (
 )
 
 
+# ---------- LIBREOFFICE ----------
+SOFFICE_BINARY = (
+    shutil.which("soffice")
+    or shutil.which("libreoffice")
+    or r"C:\Program Files\LibreOffice\program\soffice.exe"
+)
+
+# Warm headless instances kept running for word/excel/pptx -> PDF.
+# Needs LibreOffice's Python "uno" module; without it every conversion
+# cold-starts soffice instead. Set to 0 to disable the pool.
+LIBREOFFICE_POOL_SIZE = 2
+
+# Each instance gets its own profile folder here
+LIBREOFFICE_PROFILE_ROOT = STORAGE_DIR / "lo_profiles"
+
+LIBREOFFICE_STARTUP_TIMEOUT = 30
+LIBREOFFICE_CONVERT_TIMEOUT = 120
+
+# Restart an instance after this many conversions to contain memory growth
+LIBREOFFICE_MAX_CONVERSIONS = 200
+
+LIBREOFFICE_HEALTH_CHECK_INTERVAL = 30
+
+
+# ---------- WORKER POOLS ----------
+# Converters never run on the event loop. CPU-heavy tools go to a process pool,
+# subprocess/network-bound tools go to a thread pool.
+
+THREAD_POOL_WORKERS = 16
+
+# Process pools by name -> worker count. Tools that keep large models in
+# memory (u2net sessions, EasyOCR readers, the tabula JVM) get pools of their
+# own, so those models are loaded by a few workers instead of every one.
+PROCESS_POOLS = {
+    "default": max(2, (os.cpu_count() or 2) - 1),
+    "rembg": 2,
+    "tables": 1,
+}
+
+# "spawn" keeps workers independent of the server's threads (and works on Windows)
+PROCESS_POOL_START_METHOD = "spawn"
+
+# "thread" or the name of a process pool in PROCESS_POOLS
+TOOL_EXECUTORS = {
+    "add_pg_no": "default",
+    "bg_remove": "rembg",
+    "bg_white_adder": "rembg",
+    "bw_converter": "default",
+    "jpg_to_pdf": "default",
+    "merge_pdf": "default",
+    "pdf_to_excel": "tables",
+    "pdf_to_jpg": "default",
+    "pdf_to_ppt": "default",
+    "pdf_to_word": "default",
+    "split_pdf": "default",
+    "excel_to_pdf": "thread",
+    "pdf_compress": "thread",
+    "pptx_to_pdf": "thread",
+    "text_to_speech": "thread",
+    "word_to_pdf": "thread",
+}
+
+# Max conversions of one tool running at the same time (others wait their turn)
+DEFAULT_TOOL_CONCURRENCY = 2
+
+TOOL_CONCURRENCY = {
+    "add_pg_no": 4,
+    "bg_remove": 2,
+    "bg_white_adder": 2,
+    "bw_converter": 4,
+    "excel_to_pdf": 2,
+    "jpg_to_pdf": 4,
+    "merge_pdf": 4,
+    "pdf_compress": 2,
+    "pdf_to_excel": 1,
+    "pdf_to_jpg": 4,
+    "pdf_to_ppt": 2,
+    "pdf_to_word": 2,
+    "pptx_to_pdf": 2,
+    "split_pdf": 4,
+    "text_to_speech": 4,
+    "word_to_pdf": 2,
+}
+
+# Heavy libraries are imported on first use, so the API starts in about a
+# second. With warm-up on, they are imported in the background right after
+# startup (in the API process for thread-pool tools, in every worker of a
+# process pool for that pool's tools) so the first request does not pay for
+# it either.
+WARMUP_ON_STARTUP = True
+
+# Executor ("thread" or a PROCESS_POOLS name) -> module names, or
+# "module:function" to also call a no-argument function
+WARMUP_IMPORTS = {
+    "thread": ["gtts", "pydub", "langdetect", "googletrans"],
+    "default": ["pdf2docx"],
+    "rembg": ["utils.segmentation:preload"],
+    "tables": [
+        "utils.ocr:preload",
+        "utils.tables:warm_up",
+        "pandas", "camelot", "pdfplumber",
+    ],
+}
+
+
+# ---------- BACKGROUND REMOVAL ----------
+# Request value -> rembg model name
+REMBG_MODELS = {
+    "u2net": "u2net",
+    "u2netp": "u2netp",
+    "isnet": "isnet-general-use",
+    "silueta": "silueta",
+}
+
+REMBG_DEFAULT_MODEL = "u2net"
+
+# Sessions created by the process-pool warm-up (others load on first use)
+REMBG_PRELOAD_MODELS = ["u2net"]
+
+# Inferences running on one shared session at the same time
+REMBG_SESSION_CONCURRENCY = 1
+
+# Models loaded from a local .onnx file: name -> (path, architecture it was
+# exported from). Create the int8 u2net with scripts/quantize_rembg.py.
+REMBG_MODEL_DIR = STORAGE_DIR / "models"
+
+REMBG_CUSTOM_MODELS = {
+    "u2net_int8": (REMBG_MODEL_DIR / "u2net_int8.onnx", "u2net"),
+}
+
+# Form field "quality": "high" runs the requested model; "fast" runs the
+# first available of its list (int8 u2net, else the small u2netp)
+REMBG_QUALITY_TIERS = {
+    "high": None,
+    "fast": ["u2net_int8", "u2netp"],
+}
+
+# Images per ONNX run in batch requests
+REMBG_INFERENCE_BATCH = 8
+
+# Feed the model a reduced decode (JPEG draft mode) and scale only the mask
+# up to the original size. Per request: form field "low_res".
+REMBG_LOW_RES_INFERENCE = True
+
+# Masks shared by bg_remove and bg_white_adder, keyed by image SHA-256 + model
+MASK_CACHE_ENABLED = True
+MASK_CACHE_DIR = STORAGE_DIR / "cache" / "masks"
+MASK_CACHE_MAX_BYTES = 512 * 1024 * 1024
+MASK_CACHE_TTL_SECONDS = 24 * 60 * 60
+MASK_CACHE_EVICT_INTERVAL = 60
+
+# Batch endpoints (/remove-bg/batch, /white-background/batch)
+BATCH_MAX_FILES = 500
+BATCH_MAX_UPLOAD_BYTES = 2 * 1024 * 1024 * 1024
+
+# Images per worker task; chunks of one batch run in parallel
+BATCH_CHUNK_SIZE = 16
+
+# Decode/encode threads inside one worker task
+BATCH_IO_THREADS = 4
+
+
+# ---------- BLACK & WHITE ----------
+# "dither" (Floyd-Steinberg, the original behaviour), "grayscale",
+# "threshold" (fixed level), "otsu" (level from the histogram) or
+# "adaptive" (local mean)
+BW_MODES = ["dither", "grayscale", "threshold", "otsu", "adaptive"]
+BW_DEFAULT_MODE = "dither"
+
+BW_DEFAULT_THRESHOLD = 128
+
+# Adaptive mode: neighbourhood side in pixels (odd) and how far below the
+# local mean a pixel must be to turn black
+BW_ADAPTIVE_BLOCK = 31
+BW_ADAPTIVE_OFFSET = 10
+
+# Pixels per strip for threshold/otsu/adaptive, which bounds the working
+# memory on top of the decoded 8-bit image
+BW_TILE_PIXELS = 4 * 1024 * 1024
+
+# Largest image accepted, checked from the header before decoding. The image
+# is always decoded whole, and dither/grayscale also convert it whole (error
+# diffusion carries from row to row), so this bounds their memory: about two
+# bytes per pixel.
+BW_MAX_PIXELS = 150 * 1000 * 1000
+
+# Output: "png" (1-bit for black & white), "tiff" (CCITT G4 for black &
+# white, deflate for grayscale) or "original" (input extension)
+BW_OUTPUT_FORMATS = ["png", "tiff", "original"]
+BW_DEFAULT_OUTPUT_FORMAT = "png"
+
+
+# ---------- PAGE RENDERING ----------
+# Largest pixmap one PDF page may be rendered into (pdf_to_jpg, pdf_to_ppt).
+# Bigger pages (posters, drawings) are rendered at a lower DPI and reported
+# in the response as "reduced_pages".
+RENDER_MAX_PIXMAP_BYTES = 100 * 1024 * 1024
+
 
+# ---------- PDF TO JPG ----------
+PDF_TO_JPG_DEFAULT_DPI = 200
+PDF_TO_JPG_MIN_DPI = 36
+PDF_TO_JPG_MAX_DPI = 600
+PDF_TO_JPG_DEFAULT_QUALITY = 95
 
+# Pages are rendered in chunks of this many, one worker task per chunk, with
+# at most PDF_TO_JPG_PARALLEL_TASKS chunks of one request in flight
+PDF_TO_JPG_PAGES_PER_TASK = 8
+PDF_TO_JPG_PARALLEL_TASKS = 4
 
 
+# ---------- PDF TO PPT ----------
+# Slide image encoding: "png" (lossless) or "jpeg" (much smaller for photos
+# and scans) at PDF_TO_PPT_DEFAULT_QUALITY unless the request sets "quality"
+PDF_TO_PPT_IMAGE_FORMATS = ["png", "jpeg"]
+PDF_TO_PPT_DEFAULT_FORMAT = "png"
+PDF_TO_PPT_DEFAULT_QUALITY = 85
+
+# Optional page limit: PDFs with more pages are refused with a 400. Off by
+# default (None); slide images are spilled to disk, so long PDFs do not need it
+PDF_TO_PPT_MAX_PAGES = None
+
+
+# ---------- PDF TO EXCEL ----------
+# Per-page probe (utils/pdf_probe.py) that routes each page to the engines
+# likely to find something. Pages with fewer text characters are scanned
+# and go to OCR only.
+PDF_PROBE_MIN_TEXT_CHARS = 20
+
+# Ruled tables -> camelot: at least this many straight strokes (points long)
+PDF_PROBE_MIN_RULINGS = 4
+PDF_PROBE_MIN_RULING_LENGTH = 20
+
+# Unruled tables -> tabula: at least this many text lines split into three
+# or more columns by gaps wider than PDF_PROBE_COLUMN_GAP points
+PDF_PROBE_MIN_TABLE_ROWS = 3
+PDF_PROBE_COLUMN_GAP = 15
+
+# tabula, camelot and text extraction run side by side in one worker
+PDF_TO_EXCEL_ENGINE_THREADS = 3
+
+
+# ---------- TABLE EXTRACTION ----------
+# tabula runs inside the worker process through JPype: the JVM starts once
+# per worker (at warm-up) and stays up. Set to True to go back to one java
+# subprocess per call (also the fallback when JPype is not installed).
+TABULA_FORCE_SUBPROCESS = False
+
+# Options for that JVM; they only apply when it starts
+TABULA_JAVA_OPTIONS = ["-Xmx512m", "-Djava.awt.headless=true"]
+
+
+# ---------- OCR ----------
+# pdf_to_excel's fallback for scanned PDFs. Form field "languages" picks the
+# EasyOCR languages ("en,fr"); each language set gets its own cached reader.
+OCR_DEFAULT_LANGUAGES = ["en"]
+
+# Readers created by the process-pool warm-up
+OCR_PRELOAD_LANGUAGES = [["en"]]
+
+# EasyOCR models are read from here. Populate it with
+# python -m scripts.provision_ocr; requests never download models unless
+# OCR_ALLOW_DOWNLOAD is on.
+OCR_MODEL_DIR = STORAGE_DIR / "models" / "easyocr"
+OCR_ALLOW_DOWNLOAD = False
+
+# Scanned pages are rendered at this DPI (within RENDER_MAX_PIXMAP_BYTES)
+OCR_RENDER_DPI = 200
+
+# Pages OCR'd at the same time in one conversion (threads sharing the reader)
+OCR_PARALLEL_PAGES = 2
+
+
+# ---------- JPG TO PDF ----------
+# Images per request (one page each)
+JPG_TO_PDF_MAX_FILES = 500
+
+
+# ---------- ASYNC JOBS ----------
+# Finished jobs are kept this long for polling (GET /jobs/{id})
+JOB_RETENTION_SECONDS = 60 * 60
+
+# Max queued + running async jobs per API worker
+JOB_MAX_ACTIVE = 500
+
+
+# ---------- RESULT CACHE ----------
+# Repeated conversions of the same input (same tool + params) return the
+# existing output instead of converting again.
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_DIR = STORAGE_DIR / "cache" / "results"
+
+# Bounds on what the cache answers from; least recently used entries are
+# forgotten first. The output files themselves are only ever deleted by the
+# storage janitor (STORAGE RETENTION).
+RESULT_CACHE_MAX_ENTRIES = 5000
+RESULT_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024
+RESULT_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Eviction scans the cache folder, so run it at most this often (seconds)
+RESULT_CACHE_EVICT_INTERVAL = 60
+
+
+# ---------- UPLOAD LIMITS ----------
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+MAX_UPLOAD_BYTES = {
+    "bg_remove": 25 * 1024 * 1024,
+    "bg_white_adder": 25 * 1024 * 1024,
+    "bw_converter": 100 * 1024 * 1024,
+    "jpg_to_pdf": 200 * 1024 * 1024,
+    "merge_pdf": 200 * 1024 * 1024,
+    "pdf_compress": 200 * 1024 * 1024,
+    "text_to_speech": 1 * 1024 * 1024,
+}
+
+
+# ---------- STORAGE RETENTION ----------
+# Background janitor pass every N seconds (0 disables it)
+STORAGE_JANITOR_INTERVAL = 5 * 60
+
+# Uploads are deleted when their job finishes; this only catches leftovers
+UPLOAD_TTL_SECONDS = 60 * 60
+
+# Outputs expire this long after their last download (or creation)
+DEFAULT_OUTPUT_TTL_SECONDS = 24 * 60 * 60
+
+OUTPUT_TTL_SECONDS = {
+    "pdf_to_jpg": 6 * 60 * 60,
+    "text_to_speech": 6 * 60 * 60,
+}
+
+# Disk budget for uploads + outputs; least recently downloaded outputs are
+# evicted first once it is exceeded
+STORAGE_MAX_BYTES = 20 * 1024 * 1024 * 1024
+
+# Never delete a file downloaded within this window (it may still be streaming
+# from another API worker)
+STORAGE_IN_USE_GRACE_SECONDS = 10 * 60
+
+# Required as X-Admin-Token on /admin routes, which answer 404 while it is unset
+ADMIN_TOKEN = None
+
+
+# ---------- METRICS ----------
+# Prometheus text format on GET /metrics (per API worker process)
+METRICS_ENABLED = True
+
+METRICS_LATENCY_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+METRICS_SIZE_BUCKETS = [
+    16 * 1024, 64 * 1024, 256 * 1024,
+    1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024,
+    64 * 1024 * 1024, 256 * 1024 * 1024,
+]
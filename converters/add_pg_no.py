@@ -2,15 +2,17 @@
 
 # converters/add_pg_no.py
 
-from pathlib import Path
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import FileResponse
 from typing import Optional
 from pydantic import BaseModel
+import logging
 import uuid
 import fitz
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 
 
 router = APIRouter(
@@ -20,6 +22,8 @@ router = APIRouter(
 
 TOOL_NAME = "add_pg_no"
 
+logger = logging.getLogger(__name__)
+
 
 
 def add_page_numbers(input_path, output_path):
@@ -36,11 +40,13 @@ def add_page_numbers(input_path, output_path):
             y = page_rect.height - 15  
             page.insert_text((x, y), text, fontname="helv", fontsize=10)
 
-        doc.save(output_path)
+        with metrics.stage(TOOL_NAME, "write"):
+            doc.save(output_path)
+        metrics.count(TOOL_NAME, "pages", total_pages)
         return True
 
-    except Exception as e:
-        print(f"Error processing PDF: {e}")
+    except Exception:
+        logger.exception("Adding page numbers failed for %s", input_path)
         return False
 
 
@@ -61,44 +67,53 @@ class PageNumberResponse(BaseModel):
 async def create_numbered_pdf(
     file: UploadFile = File(...),
     position: str = Form("bottom"),
-    custom_text: Optional[str] = Form(None)
+    custom_text: Optional[str] = Form(None),
+    async_mode: bool = Form(False)
 ):
 
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
 
     # Save uploaded file
-    input_path = save_upload(file, TOOL_NAME)
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
     # Output filename
     output_path = build_output_path(input_path.stem, "_numbered.pdf", TOOL_NAME)
 
 
-    success = add_page_numbers(str(input_path), str(output_path))
+    async def work():
+        success = await run_tool(TOOL_NAME, add_page_numbers, str(input_path), str(output_path))
+
+        if not success:
+            raise HTTPException(status_code=500, detail="Processing failed")
 
-    if not success:
-        raise HTTPException(status_code=500, detail="Processing failed")
+        # Download URL
+        download_url = build_download_url(output_path)
 
-    # Download URL
-    download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
+        return PageNumberResponse(
+            success=True,
+            message="Page numbers added successfully!",
+            download_url=download_url
+        )
 
-    return PageNumberResponse(
-        success=True,
-        message="Page numbers added successfully!",
-        download_url=download_url
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"position": position, "custom_text": custom_text}
     )
 
 
 
-@router.get("/file/{file_name}")
+@router.get("/file/{file_name:path}")
 def download_file(file_name: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
+    file_path = resolve_output_file(TOOL_NAME, file_name)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         path=str(file_path),
         media_type="application/pdf",
-        filename=file_name
+        filename=file_path.name
     )
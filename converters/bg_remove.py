@@ -3,13 +3,16 @@
 
 import uuid
 from pathlib import Path
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
-from PIL import Image
-from rembg import remove
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
 import config
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils.segmentation import cut_out, masks_for, model_for_quality, open_image
+from utils.image_batch import run_batch
+from utils import metrics
 
 
 router = APIRouter(
@@ -29,48 +32,132 @@ def is_valid_image(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def process_background_removal(input_path: Path, output_path: Path):
-    input_img = Image.open(input_path)
-    output_img = remove(input_img)
-    output_img.save(output_path)
+def process_background_removal(
+    input_path: Path, output_path: Path, model: str = None, image_key: str = None, low_res: bool = None
+):
+    # image_key (the upload's SHA-256) lets bg_white_adder reuse this mask
+    input_img = open_image(input_path)
+    mask = masks_for([input_path], [input_img], [image_key], model, low_res)[0]
+    output_img = cut_out(input_img, mask)
+    with metrics.stage(TOOL_NAME, "write"):
+        output_img.save(output_path)
+    metrics.count(TOOL_NAME, "images")
     return True
 
 
 
 @router.post("/")
-async def remove_background_api(file: UploadFile = File(...)):
+async def remove_background_api(
+    file: UploadFile = File(...),
+    model: str = Form(config.REMBG_DEFAULT_MODEL),
+    quality: str = Form("high"),
+    low_res: bool = Form(config.REMBG_LOW_RES_INFERENCE),
+    async_mode: bool = Form(False)
+):
 
     if not is_valid_image(file.filename):
         raise HTTPException(status_code=400, detail="Images only are allowed.")
 
     try:
-        # Save uploaded image
-        input_path = save_upload(file, TOOL_NAME)
+        model = model_for_quality(model, quality)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    # Save uploaded image
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
+
+    try:
         # Result should always be PNG since transparency is needed
         output_path = build_output_path(input_path.stem, ".png", TOOL_NAME)
 
-        # Process background removal
-        process_background_removal(input_path, output_path)
-
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
-
-        return {
-            "status": "success",
-            "message": "Background removed successfully!",
-            "download_link": download_url
-        }
-
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def work():
+        try:
+            # Process background removal
+            await run_tool(
+                TOOL_NAME, process_background_removal,
+                input_path, output_path, model, upload.sha256, low_res
+            )
+
+            download_url = build_download_url(output_path)
+
+            return {
+                "status": "success",
+                "message": "Background removed successfully!",
+                "download_link": download_url
+            }
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"model": model, "low_res": low_res}
+    )
+
+
+@router.post("/batch")
+async def remove_background_batch(
+    files: List[UploadFile] = File(...),
+    model: str = Form(config.REMBG_DEFAULT_MODEL),
+    quality: str = Form("high"),
+    output: str = Form("zip"),
+    low_res: bool = Form(config.REMBG_LOW_RES_INFERENCE),
+    async_mode: bool = Form(False)
+):
+    """
+    Many images in one request. output="zip" returns one ZIP,
+    output="links" one download link per image. Files that fail are
+    reported per item; the rest of the batch still completes.
+    """
+    if len(files) > config.BATCH_MAX_FILES:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"At most {config.BATCH_MAX_FILES} files per batch"}
+        )
+
+    if output not in ("zip", "links"):
+        return JSONResponse(status_code=400, content={"status": "error", "message": "output must be 'zip' or 'links'"})
 
-@router.get("/file/{file_name}")
+    try:
+        model = model_for_quality(model, quality)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    uploads, names, rejected = [], [], []
+    for file in files:
+        if not is_valid_image(file.filename):
+            rejected.append((file.filename, "Only image files allowed"))
+            continue
+        try:
+            uploads.append(await save_upload(file, TOOL_NAME))
+            names.append(file.filename)
+        except HTTPException as e:
+            rejected.append((file.filename, str(e.detail)))
+
+    async def work():
+        return await run_batch(
+            TOOL_NAME, uploads, names, cut_out, "PNG", ".png",
+            model, output, rejected, low_res
+        )
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=uploads,
+        params={"model": model, "output": output, "low_res": low_res, "names": names, "rejected": rejected}
+    )
+
+
+@router.get("/file/{file_name:path}")
 def download_removed_bg(file_name: str):
 
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
+    file_path = resolve_output_file(TOOL_NAME, file_name)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(str(file_path), media_type="image/png", filename=file_name)
+    return FileResponse(str(file_path), media_type="image/png", filename=file_path.name)
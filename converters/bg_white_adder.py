@@ -3,12 +3,17 @@
 
 import os
 from pathlib import Path
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from typing import List
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
 from fastapi.responses import JSONResponse, FileResponse
 from PIL import Image
-from rembg import remove
 
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils.segmentation import cut_out, masks_for, model_for_quality, open_image
+from utils.image_batch import run_batch
+from utils import metrics
 import config
 
 router = APIRouter(
@@ -25,8 +30,34 @@ def is_valid_image(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def cut_out_on_white(image, mask):
+    cutout = cut_out(image, mask)
+    white_bg = Image.new("RGBA", cutout.size, (255, 255, 255, 255))
+    return Image.alpha_composite(white_bg, cutout).convert("RGB")
+
+
+def add_white_background(
+    input_path: Path, output_path: Path, model: str = None, image_key: str = None, low_res: bool = None
+):
+    # With image_key, a mask already computed by bg_remove is reused
+    input_img = open_image(input_path)
+    mask = masks_for([input_path], [input_img], [image_key], model, low_res)[0]
+    final_img = cut_out_on_white(input_img, mask)
+
+    with metrics.stage(TOOL_NAME, "write"):
+        final_img.save(output_path, "JPEG")
+    metrics.count(TOOL_NAME, "images")
+    return True
+
+
 @router.post("/")
-async def remove_background(file: UploadFile = File(...)):
+async def remove_background(
+    file: UploadFile = File(...),
+    model: str = Form(config.REMBG_DEFAULT_MODEL),
+    quality: str = Form("high"),
+    low_res: bool = Form(config.REMBG_LOW_RES_INFERENCE),
+    async_mode: bool = Form(False)
+):
     if not is_valid_image(file.filename):
         return JSONResponse(
             status_code=400,
@@ -34,45 +65,108 @@ async def remove_background(file: UploadFile = File(...)):
         )
 
     try:
-        #  Uploaded File
-        input_path = save_upload(file, TOOL_NAME)
+        model = model_for_quality(model, quality)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    #  Uploaded File
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
+    try:
         # Extract base name for clean output name 
         original_name = Path(file.filename).stem
         output_filename = build_output_path(original_name, ".jpg", TOOL_NAME)
 
-        # Image Processing 
-        input_img = Image.open(input_path)
-        output_img = remove(input_img)
-
-        output_img = output_img.convert("RGBA")
-        white_bg = Image.new("RGBA", output_img.size, (255, 255, 255, 255))
-        final_img = Image.alpha_composite(white_bg, output_img).convert("RGB")
-
-        # Save result
-        final_img.save(output_filename, "JPEG")
-
-        # Download URL
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{Path(output_filename).name}"
-
-        return {
-            "status": "success",
-            "message": "White background added successfully",
-            "download_link": download_url
-        }
-
     except Exception as e:
         return JSONResponse(
             status_code=500,
             content={"status": "error", "message": str(e)}
         )
 
+    async def work():
+        try:
+            # Image Processing 
+            await run_tool(
+                TOOL_NAME, add_white_background,
+                input_path, output_filename, model, upload.sha256, low_res
+            )
+
+            # Download URL
+            download_url = build_download_url(output_filename)
+
+            return {
+                "status": "success",
+                "message": "White background added successfully",
+                "download_link": download_url
+            }
+
+        except Exception as e:
+            return JSONResponse(
+                status_code=500,
+                content={"status": "error", "message": str(e)}
+            )
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"model": model, "low_res": low_res}
+    )
+
+
+@router.post("/batch")
+async def add_white_background_batch(
+    files: List[UploadFile] = File(...),
+    model: str = Form(config.REMBG_DEFAULT_MODEL),
+    quality: str = Form("high"),
+    output: str = Form("zip"),
+    low_res: bool = Form(config.REMBG_LOW_RES_INFERENCE),
+    async_mode: bool = Form(False)
+):
+    # Same contract as /remove-bg/batch
+    if len(files) > config.BATCH_MAX_FILES:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"At most {config.BATCH_MAX_FILES} files per batch"}
+        )
+
+    if output not in ("zip", "links"):
+        return JSONResponse(status_code=400, content={"status": "error", "message": "output must be 'zip' or 'links'"})
+
+    try:
+        model = model_for_quality(model, quality)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+    uploads, names, rejected = [], [], []
+    for file in files:
+        if not is_valid_image(file.filename):
+            rejected.append((file.filename, "Only image files allowed"))
+            continue
+        try:
+            uploads.append(await save_upload(file, TOOL_NAME))
+            names.append(file.filename)
+        except HTTPException as e:
+            rejected.append((file.filename, str(e.detail)))
+
+    async def work():
+        return await run_batch(
+            TOOL_NAME, uploads, names, cut_out_on_white, "JPEG", ".jpg",
+            model, output, rejected, low_res
+        )
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=uploads,
+        params={"model": model, "output": output, "low_res": low_res, "names": names, "rejected": rejected}
+    )
+
 
-@router.get("/file/{file_name}")
+@router.get("/file/{file_name:path}")
 def download_whitebg_image(file_name: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
+    file_path = resolve_output_file(TOOL_NAME, file_name)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(str(file_path), media_type="image/jpeg", filename=file_name)
+    return FileResponse(str(file_path), media_type="image/jpeg", filename=file_path.name)
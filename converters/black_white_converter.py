@@ -1,12 +1,17 @@
 
 # converters/bw_converter.py
 
+import mimetypes
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse, FileResponse
-from PIL import Image
 
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
+from utils.bw_engine import convert, open_grayscale, output_extension, save
 import config
 
 router = APIRouter(
@@ -19,8 +24,31 @@ TOOL_NAME = "bw_converter"
 VALID_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tiff"}
 
 
+def bw_convert_image(input_path: Path, output_path: Path, mode: str = None, threshold: int = None):
+    with metrics.stage(TOOL_NAME, "decode"):
+        gray = open_grayscale(input_path)
+
+    with metrics.stage(TOOL_NAME, "binarize"):
+        bw_img = convert(gray, mode or config.BW_DEFAULT_MODE, threshold)
+
+    with metrics.stage(TOOL_NAME, "write"):
+        save(bw_img, output_path, output_path.suffix.lower())
+    metrics.count(TOOL_NAME, "images")
+    return True
+
+
 @router.post("/")
-async def convert_to_bw(img: UploadFile = File(...)):
+async def convert_to_bw(
+    img: UploadFile = File(...),
+    mode: str = Form(config.BW_DEFAULT_MODE),
+    threshold: Optional[int] = Form(None),
+    output_format: str = Form(config.BW_DEFAULT_OUTPUT_FORMAT),
+    async_mode: bool = Form(False)
+):
+    """
+    mode: dither, grayscale, threshold (at threshold, default 128), otsu or
+    adaptive. output_format: png (1-bit), tiff (CCITT G4) or original.
+    """
 
     ext = Path(img.filename).suffix.lower()
     if ext not in VALID_EXTENSIONS:
@@ -32,28 +60,33 @@ async def convert_to_bw(img: UploadFile = File(...)):
             }
         )
 
-    try:
-        #  Save Upload 
-        input_path = save_upload(img, TOOL_NAME)
-
-        # Build Output Name Using Smart Counter
+    if mode not in config.BW_MODES:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"mode must be one of: {', '.join(config.BW_MODES)}"}
+        )
 
-        original_name = Path(img.filename).stem
-        output_path = build_output_path(original_name, ext, TOOL_NAME)
+    if output_format not in config.BW_OUTPUT_FORMATS:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"output_format must be one of: {', '.join(config.BW_OUTPUT_FORMATS)}"}
+        )
 
-        # Convert to B&W 
-        image = Image.open(input_path)
-        bw_img = image.convert("1")  # Pure black & white 
+    if threshold is not None and not 0 <= threshold <= 255:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": "threshold must be between 0 and 255"}
+        )
 
-        bw_img.save(output_path)
+    #  Save Upload 
+    upload = await save_upload(img, TOOL_NAME)
+    input_path = upload.path
 
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{Path(output_path).name}"
+    try:
+        # Build Output Name Using Smart Counter
 
-        return {
-            "status": "success",
-            "message": "Successfully converted image into B&W format.",
-            "download_link": download_url
-        }
+        original_name = Path(img.filename).stem
+        output_path = build_output_path(original_name, output_extension(output_format, ext), TOOL_NAME)
 
     except Exception as e:
         return JSONResponse(
@@ -64,12 +97,43 @@ async def convert_to_bw(img: UploadFile = File(...)):
             }
         )
 
+    async def work():
+        try:
+            # Convert to B&W 
+            await run_tool(TOOL_NAME, bw_convert_image, input_path, output_path, mode, threshold)
+
+            download_url = build_download_url(output_path)
+
+            return {
+                "status": "success",
+                "message": "Successfully converted image into B&W format.",
+                "download_link": download_url
+            }
+
+        except ValueError as e:
+            # Image above BW_MAX_PIXELS
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+        except Exception as e:
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "status": "error",
+                    "message": f"Conversion error: {str(e)}"
+                }
+            )
+
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=[upload], params={
+        "ext": ext, "mode": mode, "threshold": threshold, "output_format": output_format
+    })
+
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download_bw_file(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(str(file_path), media_type="image/jpeg", filename=filename)
+    media_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+    return FileResponse(str(file_path), media_type=media_type, filename=file_path.name)
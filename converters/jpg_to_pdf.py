@@ -2,11 +2,15 @@
 # converters/jpg_to_pdf.py
 
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import JSONResponse, FileResponse
-from PIL import Image
 
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file, remove_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
+from utils.pdf_writer import StreamingPdfWriter
 import config
 
 router = APIRouter(
@@ -17,49 +21,93 @@ router = APIRouter(
 TOOL_NAME = "jpg_to_pdf"
 
 
-@router.post("/")
-async def convert_jpg_to_pdf(file: UploadFile = File(...)):
-    # Validate extension
-    orig_name = file.filename
-    ext = Path(orig_name).suffix.lower()
+def jpg_to_pdf(input_paths, output_path: Path):
+    """
+    One page per image, in order. JPEG data is copied into the PDF without
+    decoding (see utils.pdf_writer); input_paths may also be a single path.
+    """
+    if isinstance(input_paths, (str, Path)):
+        input_paths = [input_paths]
+
+    with metrics.stage(TOOL_NAME, "write"):
+        with StreamingPdfWriter(output_path) as writer:
+            for input_path in input_paths:
+                writer.add_jpeg(input_path)
 
-    if ext not in (".jpg", ".jpeg"):
+    metrics.count(TOOL_NAME, "images", len(input_paths))
+    metrics.count(TOOL_NAME, "reencoded", writer.reencoded)
+    return True
+
+
+@router.post("/")
+async def convert_jpg_to_pdf(
+    file: Optional[UploadFile] = File(None),
+    files: Optional[List[UploadFile]] = File(None),
+    async_mode: bool = Form(False)
+):
+    """
+    One image in "file", or several in "files" (one page each, in upload order).
+    """
+    images = ([file] if file is not None else []) + (files or [])
+
+    if not images:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "No files provided"})
+
+    if len(images) > config.JPG_TO_PDF_MAX_FILES:
         return JSONResponse(
             status_code=400,
-            content={"status": "error", "message": "JPG or JPEG format only."}
+            content={"status": "error", "message": f"At most {config.JPG_TO_PDF_MAX_FILES} images per request"}
         )
 
-    # Save uploaded file 
-    input_path = save_upload(file, TOOL_NAME)
+    # Validate extension
+    for image in images:
+        if Path(image.filename).suffix.lower() not in (".jpg", ".jpeg"):
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": "JPG or JPEG format only."}
+            )
+
+    # Save uploaded files; if one fails (e.g. 413), drop the ones already saved
+    uploads = []
+    try:
+        for image in images:
+            uploads.append(await save_upload(image, TOOL_NAME))
+    except BaseException:
+        for upload in uploads:
+            remove_file(upload.path)
+        raise
+    input_paths = [upload.path for upload in uploads]
 
     # Output filename 
-    base_name = Path(orig_name).stem
+    base_name = Path(images[0].filename).stem
     output_path = build_output_path(base_name, ".pdf", TOOL_NAME)
 
-    try:
-        image = Image.open(input_path)
-        image.convert("RGB").save(output_path, "PDF")
-    except Exception:
-        return JSONResponse(
-            status_code=500,
-            content={"status": "error", "message": "Internal conversion error"}
-        )
+    async def work():
+        try:
+            await run_tool(TOOL_NAME, jpg_to_pdf, input_paths, output_path)
+        except Exception:
+            return JSONResponse(
+                status_code=500,
+                content={"status": "error", "message": "Internal conversion error"}
+            )
+
+        # Build download link
+        download_url = build_download_url(output_path)
 
-    # Build download link
-    download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{Path(output_path).name}"
+        return {
+            "status": "success",
+            "message": "JPG file converted into PDF successfully!",
+            "download_link": download_url
+        }
 
-    return {
-        "status": "success",
-        "message": "JPG file converted into PDF successfully!",
-        "download_link": download_url
-    }
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=uploads)
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download_pdf(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(str(file_path), media_type="application/pdf", filename=filename)
+    return FileResponse(str(file_path), media_type="application/pdf", filename=file_path.name)
@@ -1,14 +1,15 @@
 
 # converters/merge_pdf.py
 
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, Form, UploadFile
 from fastapi.responses import JSONResponse, FileResponse
 from typing import List
 import pypdf
-import os
 
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 
 router = APIRouter(
     prefix="/merge-pdf",
@@ -18,8 +19,26 @@ router = APIRouter(
 TOOL_NAME = "merge_pdf"
 
 
+def merge_pdf_files(pdf_paths, output_path):
+    pdf_writer = pypdf.PdfWriter()
+
+    for pdf_path in pdf_paths:
+        with open(pdf_path, "rb") as f:
+            pdf_reader = pypdf.PdfReader(f)
+
+            for page_num in range(len(pdf_reader.pages)):
+                pdf_writer.add_page(pdf_reader.pages[page_num])
+
+    with metrics.stage(TOOL_NAME, "write"), open(output_path, "wb") as f:
+        pdf_writer.write(f)
+
+    metrics.count(TOOL_NAME, "pages", len(pdf_writer.pages))
+
+    return output_path
+
+
 @router.post("/")
-async def merge_pdfs(files: List[UploadFile] = File(...)):
+async def merge_pdfs(files: List[UploadFile] = File(...), async_mode: bool = Form(False)):
     if not files:
         return JSONResponse(status_code=400, content={"status": "error", "message": "No files provided"})
 
@@ -31,46 +50,39 @@ async def merge_pdfs(files: List[UploadFile] = File(...)):
             )
 
     #  Save uploaded files 
-    saved_paths = []
+    uploads = []
     for file in files:
-        path = save_upload(file, TOOL_NAME)
-        saved_paths.append(path)
-
-    #  Merge Logic
-    try:
-        pdf_writer = pypdf.PdfWriter()
+        uploads.append(await save_upload(file, TOOL_NAME))
+    saved_paths = [upload.path for upload in uploads]
 
-        for pdf_path in saved_paths:
-            with open(pdf_path, "rb") as f:
-                pdf_reader = pypdf.PdfReader(f)
+    # Use counter-safe filename
+    output_path = build_output_path("merged-file", ".pdf", TOOL_NAME)
 
-                for page_num in range(len(pdf_reader.pages)):
-                    pdf_writer.add_page(pdf_reader.pages[page_num])
-
-        # Use counter-safe filename
-        output_path = build_output_path("merged-file", ".pdf", TOOL_NAME)
+    #  Merge Logic
+    async def work():
+        try:
+            await run_tool(TOOL_NAME, merge_pdf_files, saved_paths, output_path)
 
-        with open(output_path, "wb") as f:
-            pdf_writer.write(f)
+        except Exception as e:
+            return JSONResponse(status_code=500, content={
+                "status": "error",
+                "message": f"Error merging PDFs: {str(e)}"
+            })
 
-    except Exception as e:
-        return JSONResponse(status_code=500, content={
-            "status": "error",
-            "message": f"Error merging PDFs: {str(e)}"
-        })
+        return {
+            "status": "success",
+            "message": "Successfully merged PDF files!",
+            "download_link": build_download_url(output_path)
+        }
 
-    return {
-        "status": "success",
-        "message": "Successfully merged PDF files!",
-        "download_link": f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
-    }
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=uploads)
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download(filename: str):
-    path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    path = resolve_output_file(TOOL_NAME, filename)
 
-    if not path.exists():
+    if path is None:
         return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
 
-    return FileResponse(str(path), media_type="application/pdf", filename=filename)
+    return FileResponse(str(path), media_type="application/pdf", filename=path.name)
@@ -3,7 +3,7 @@
 
 # converters/pdf_compress.py
 
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Form
 from fastapi.responses import JSONResponse, FileResponse
 from pathlib import Path
 import os, io, shutil, tempfile, subprocess
@@ -11,7 +11,10 @@ from datetime import datetime
 from PIL import Image
 import pikepdf
 
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 import config
 
 router = APIRouter(
@@ -183,6 +186,7 @@ def compress_with_pikepdf(input_path, output_path, quality=50, max_dimension=800
             recompress_flate=True
         )
         pdf.close()
+        metrics.count(TOOL_NAME, "images", images_processed)
         return True
     except Exception:
         return False
@@ -201,17 +205,20 @@ def compress_pdf(input_path, output_path, target_reduction=0.25):
     results = []
     
     try:
-        if compress_with_ghostscript(input_path, temp_gs_ebook, "ebook"):
-            size = os.path.getsize(temp_gs_ebook)
-            results.append(("ghostscript_ebook", temp_gs_ebook, size))
+        with metrics.stage(TOOL_NAME, "ghostscript_ebook"):
+            if compress_with_ghostscript(input_path, temp_gs_ebook, "ebook"):
+                size = os.path.getsize(temp_gs_ebook)
+                results.append(("ghostscript_ebook", temp_gs_ebook, size))
         
-        if compress_with_ghostscript_aggressive(input_path, temp_gs_screen):
-            size = os.path.getsize(temp_gs_screen)
-            results.append(("ghostscript_screen", temp_gs_screen, size))
+        with metrics.stage(TOOL_NAME, "ghostscript_screen"):
+            if compress_with_ghostscript_aggressive(input_path, temp_gs_screen):
+                size = os.path.getsize(temp_gs_screen)
+                results.append(("ghostscript_screen", temp_gs_screen, size))
         
-        if compress_with_pikepdf(input_path, temp_pikepdf, quality=45, max_dimension=700):
-            size = os.path.getsize(temp_pikepdf)
-            results.append(("pikepdf", temp_pikepdf, size))
+        with metrics.stage(TOOL_NAME, "pikepdf"):
+            if compress_with_pikepdf(input_path, temp_pikepdf, quality=45, max_dimension=700):
+                size = os.path.getsize(temp_pikepdf)
+                results.append(("pikepdf", temp_pikepdf, size))
         
         if not results:
             shutil.copy2(input_path, output_path)
@@ -245,21 +252,25 @@ def format_size(size_bytes):
 
 
 @router.post("/")
-async def compress_endpoint(file: UploadFile = File(...)):
+async def compress_endpoint(file: UploadFile = File(...), async_mode: bool = Form(False)):
     if not file.filename.lower().endswith(".pdf"):
         return JSONResponse(status_code=400, content={"status": "error", "message": "PDF only"})
 
-    input_path = save_upload(file, TOOL_NAME)
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
     output_path = build_output_path(Path(file.filename).stem, ".pdf", TOOL_NAME)
 
-    original, compressed = compress_pdf(str(input_path), str(output_path))
+    async def work():
+        original, compressed = await run_tool(TOOL_NAME, compress_pdf, str(input_path), str(output_path))
 
-    reduction = ((original - compressed) / original * 100) if compressed < original else 0
+        reduction = ((original - compressed) / original * 100) if compressed < original else 0
 
-    return {
-        "status": "success",
-        "download_link": f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}",
-        "original_size": format_size(original),
-        "compressed_size": format_size(compressed),
-        "reduction_percentage": f"{reduction:.1f}%"
-    }
+        return {
+            "status": "success",
+            "download_link": build_download_url(output_path),
+            "original_size": format_size(original),
+            "compressed_size": format_size(compressed),
+            "reduction_percentage": f"{reduction:.1f}%"
+        }
+
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=[upload])
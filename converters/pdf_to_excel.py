@@ -1,16 +1,18 @@
 
 # converters/pdf_to_excel.py
 
-from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse
-import pandas as pd
-import tabula
-import camelot
-import pdfplumber
-import easyocr
-from pdf2image import convert_from_path
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
+from utils.ocr import get_reader, parse_languages
+from utils.tables import read_tables
+from utils.pdf_probe import plan_extraction, probe_pdf
+from utils.page_render import render_page
 import config
 
 
@@ -23,57 +25,152 @@ TOOL_NAME = "pdf_to_excel"
 
 
 
-def hybrid_pdf_to_excel(pdf_path, output_path):
+def _tabula_tables(pdf_path, pages: list) -> list:
+    # Runs in this worker's resident JVM (utils.tables)
+    with metrics.stage(TOOL_NAME, "tabula"):
+        return read_tables(pdf_path, pages=pages)
 
-    reader = easyocr.Reader(["en"], gpu=False)
 
-    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+def _camelot_tables(pdf_path, pages: list) -> list:
+    import camelot
 
-        # Tabula tables
-        try:
-            tables = tabula.read_pdf(pdf_path, pages="all", multiple_tables=True)
-            if tables:
-                for i, table in enumerate(tables):
-                    table.to_excel(writer, sheet_name=f"Table_Tabula_{i+1}", index=False)
-        except Exception:
-            pass
-
-        # Camelot backup extraction
-        try:
-            cams = camelot.read_pdf(pdf_path, pages="all")
-            for i, camtable in enumerate(cams):
-                camtable.df.to_excel(writer, sheet_name=f"Table_Camelot_{i+1}", index=False)
-        except Exception:
-            pass
-
-        # Extract normal text
-        text_rows = []
+    with metrics.stage(TOOL_NAME, "camelot"):
+        return [table.df for table in camelot.read_pdf(pdf_path, pages=",".join(map(str, pages)))]
+
+
+def _text_rows(pdf_path, pages: list) -> list:
+    import pdfplumber
+
+    rows = []
+    with metrics.stage(TOOL_NAME, "text"):
         with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
+            for number in pages:
+                text = pdf.pages[number - 1].extract_text()
                 if text:
-                    for line in text.split("\n"):
-                        text_rows.append([line])
+                    rows += [[line] for line in text.split("\n")]
+    return rows
 
-        if text_rows:
-            df_text = pd.DataFrame(text_rows, columns=["Extracted_Text"])
-            df_text.to_excel(writer, sheet_name="Text_Extracted", index=False)
 
-        # OCR fallback if no text
-        if not text_rows:
-            images = convert_from_path(pdf_path)
-            ocr_lines = []
+def _page_array(doc, number: int):
+    """
+    RGB NumPy array of a 1-based page at OCR_RENDER_DPI (lower for pages over
+    the render memory budget), straight from the pixmap, no file.
+    """
+    import numpy as np
+
+    pix, _ = render_page(doc.load_page(number - 1), config.OCR_RENDER_DPI)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+
+
+def _read_page(reader, image) -> list:
+    with metrics.stage(TOOL_NAME, "ocr"):
+        result = reader.readtext(image, detail=0)
+    metrics.count(TOOL_NAME, "images")
+    return result
+
+
+def _ocr_rows(pdf_path, pages: list, languages) -> list:
+    """
+    OCR lines of pages, in page and line order. A page is rasterised only
+    when one of the OCR_PARALLEL_PAGES slots is free, so at most that many
+    page images exist at a time.
+    """
+    import fitz
+
+    # Cached per process and language set (utils.ocr)
+    reader = get_reader(languages)
+    slots = max(1, config.OCR_PARALLEL_PAGES)
+    ocr_lines = []
+
+    with fitz.open(pdf_path) as doc, ThreadPoolExecutor(max_workers=slots) as pool:
+        pending = deque()
+        for number in pages:
+            if len(pending) >= slots:
+                ocr_lines += [[line] for line in pending.popleft().result()]
+            pending.append(pool.submit(metrics.propagate(_read_page), reader, _page_array(doc, number)))
+
+        while pending:
+            ocr_lines += [[line] for line in pending.popleft().result()]
 
-            for idx, img in enumerate(images):
-                temp_img = f"temp_page_{idx}.png"
-                img.save(temp_img)
+    return ocr_lines
 
-                result = reader.readtext(temp_img, detail=0)
-                for line in result:
-                    ocr_lines.append([line])
 
-                Path(temp_img).unlink(missing_ok=True)
+def _table_key(df) -> tuple:
+    """
+    Content of a table with case, spacing, empty cells and engine-specific
+    headers (camelot's 0..n, tabula's "Unnamed: n") normalised away, so the
+    same table found twice compares equal.
+    """
+    def cell(value):
+        text = "" if value is None else " ".join(str(value).split()).lower()
+        return "" if text in ("nan", "none") or text.startswith("unnamed:") else text
 
+    rows = [] if all(isinstance(c, int) for c in df.columns) else [[cell(c) for c in df.columns]]
+    rows += [[cell(v) for v in row] for row in df.itertuples(index=False)]
+    return tuple(tuple(c for c in row if c) for row in rows if any(row))
+
+
+def _result(future, default):
+    # tabula/camelot failures only lose their tables, as before
+    try:
+        return future.result()
+    except Exception:
+        return default
+
+
+def hybrid_pdf_to_excel(pdf_path, output_path, languages=None):
+    """
+    Probe every page first (utils.pdf_probe), then run each engine only on
+    the pages it suits: camelot on ruled tables, tabula on unruled tables,
+    text extraction on pages with a text layer, OCR on scanned pages.
+    tabula, camelot and text extraction run concurrently; tables found
+    more than once are written once.
+    """
+    # Heavy extraction stack (torch, JVM bridge, ...) is loaded on first use
+    import pandas as pd
+
+    with metrics.stage(TOOL_NAME, "probe"):
+        probes = probe_pdf(pdf_path)
+    plan = plan_extraction(probes)
+    metrics.count(TOOL_NAME, "pages", len(probes))
+
+    with ThreadPoolExecutor(max_workers=config.PDF_TO_EXCEL_ENGINE_THREADS) as pool:
+        futures = {}
+        for name, engine in (("tabula", _tabula_tables), ("camelot", _camelot_tables), ("text", _text_rows)):
+            if plan[name]:
+                futures[name] = pool.submit(metrics.propagate(engine), pdf_path, plan[name])
+
+        # OCR (if any) runs here meanwhile
+        ocr_lines = _ocr_rows(pdf_path, plan["ocr"], languages) if plan["ocr"] else []
+
+        tables = {
+            "Tabula": _result(futures["tabula"], []) if "tabula" in futures else [],
+            "Camelot": _result(futures["camelot"], []) if "camelot" in futures else [],
+        }
+        text_rows = futures["text"].result() if "text" in futures else []
+
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        seen = set()
+        written = 0
+
+        for engine, engine_tables in tables.items():
+            index = 0
+            for table in engine_tables:
+                key = _table_key(table)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                index += 1
+                table.to_excel(writer, sheet_name=f"Table_{engine}_{index}", index=False)
+            written += index
+
+        metrics.count(TOOL_NAME, "duplicate_tables", sum(len(t) for t in tables.values()) - written)
+
+        if text_rows or not ocr_lines:
+            df_text = pd.DataFrame(text_rows, columns=["Extracted_Text"])
+            df_text.to_excel(writer, sheet_name="Text_Extracted", index=False)
+
+        if plan["ocr"]:
             df_ocr = pd.DataFrame(ocr_lines, columns=["OCR_Text"])
             df_ocr.to_excel(writer, sheet_name="Text_OCR", index=False)
 
@@ -84,45 +181,65 @@ def hybrid_pdf_to_excel(pdf_path, output_path):
 # FastAPI Route
 
 @router.post("/")
-async def convert_pdf_to_excel(file: UploadFile = File(...)):
+async def convert_pdf_to_excel(
+    file: UploadFile = File(...),
+    languages: str = Form(",".join(config.OCR_DEFAULT_LANGUAGES)),
+    async_mode: bool = Form(False)
+):
+    """
+    languages: EasyOCR language codes for scanned PDFs, comma-separated.
+    """
 
     if not file.filename.lower().endswith(".pdf"):
         return {"status": "error", "message": "Only PDF files allowed"}
 
+    try:
+        languages = parse_languages(languages)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
     # Save uploaded file
-    input_path = save_upload(file, TOOL_NAME)
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
     # Create output path
     output_path = build_output_path(input_path.stem, ".xlsx", TOOL_NAME)
 
-    try:
-        hybrid_pdf_to_excel(str(input_path), str(output_path))
+    async def work():
+        try:
+            await run_tool(TOOL_NAME, hybrid_pdf_to_excel, str(input_path), str(output_path), languages)
 
-        download_link = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
+            download_link = build_download_url(output_path)
 
-        return {
-            "status": "success",
-            "message": "PDF converted to Excel successfully!",
-            "download_link": download_link,
-            "file_name": output_path.name
-        }
+            return {
+                "status": "success",
+                "message": "PDF converted to Excel successfully!",
+                "download_link": download_link,
+                "file_name": output_path.name
+            }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Conversion failed: {e}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Conversion failed: {e}")
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"languages": ",".join(languages)}
+    )
 
 
 
 # Download Route
 
-@router.get("/file/{file_name}")
+@router.get("/file/{file_name:path}")
 def download_excel(file_name: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
+    file_path = resolve_output_file(TOOL_NAME, file_name)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         path=str(file_path),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        filename=file_name
+        filename=file_path.name
     )
@@ -1,13 +1,24 @@
 
 # converters/pdf_to_jpg.py
 
+import asyncio
+import zipfile
+from collections import deque
+from contextlib import aclosing
 from pathlib import Path
-import shutil
+from typing import Optional
+from urllib.parse import quote
 import fitz
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
-from utils.storage_manager import save_upload, build_output_path
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file, remove_file
+from utils.zip_stream import stream_zip
+from utils.page_render import plan_document, reduced_pages, render_page
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 import config
 
 router = APIRouter(
@@ -18,8 +29,127 @@ router = APIRouter(
 TOOL_NAME = "pdf_to_jpg"
 
 
+def plan_pages(input_path: Path, dpi: int, grayscale: bool) -> list:
+    """
+    DPI each page will be rendered at (lower than dpi for oversized pages).
+    """
+    with fitz.open(input_path) as doc:
+        return plan_document(doc, dpi, grayscale)
+
+
+def render_pages(input_path: Path, page_numbers: list, dpi: int, quality: int, grayscale: bool) -> list:
+    """
+    Worker side: (page_number, JPEG bytes) for each 0-based page number.
+    Every call opens the document itself, so chunks of one PDF render in
+    separate processes at the same time.
+    """
+    pages = []
+
+    with metrics.stage(TOOL_NAME, "render"):
+        with fitz.open(input_path) as doc:
+            for page_number in page_numbers:
+                pix, _ = render_page(doc.load_page(page_number), dpi, grayscale)
+                pages.append((page_number, pix.tobytes("jpeg", jpg_quality=quality)))
+
+    metrics.count(TOOL_NAME, "pages", len(pages))
+    return pages
+
+
+async def iter_rendered_pages(input_path: Path, page_numbers: list, dpi: int, quality: int, grayscale: bool):
+    """
+    (page_number, JPEG bytes) in page order, rendered in chunks of
+    PDF_TO_JPG_PAGES_PER_TASK pages with up to PDF_TO_JPG_PARALLEL_TASKS
+    chunks in flight, so only a few chunks are ever held in memory.
+    """
+    size = max(1, config.PDF_TO_JPG_PAGES_PER_TASK)
+    chunks = [page_numbers[i:i + size] for i in range(0, len(page_numbers), size)]
+    pending = deque()
+    next_chunk = 0
+
+    try:
+        while pending or next_chunk < len(chunks):
+            while next_chunk < len(chunks) and len(pending) < max(1, config.PDF_TO_JPG_PARALLEL_TASKS):
+                pending.append(asyncio.create_task(
+                    run_tool(TOOL_NAME, render_pages, input_path, chunks[next_chunk], dpi, quality, grayscale)
+                ))
+                next_chunk += 1
+
+            for page in await pending.popleft():
+                yield page
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def render_pdf_to_jpg_zip(input_path: Path, zip_output_path: Path, page_numbers: list, dpi: int, quality: int, grayscale: bool):
+    # JPEGs are already compressed: store them as they are
+    try:
+        pages = iter_rendered_pages(input_path, page_numbers, dpi, quality, grayscale)
+        async with aclosing(pages):
+            with zipfile.ZipFile(zip_output_path, "w", zipfile.ZIP_STORED) as archive:
+                async for page_number, data in pages:
+                    await asyncio.to_thread(archive.writestr, f"page_{page_number + 1}.jpg", data)
+    except BaseException:
+        zip_output_path.unlink(missing_ok=True)
+        raise
+
+    return zip_output_path
+
+
+async def _stream_pdf_to_jpg_zip(input_path: Path, page_numbers: list, dpi: int, quality: int, grayscale: bool):
+    """
+    ZIP bytes for a StreamingResponse, one entry per page as it is rendered.
+    The upload is deleted when the stream ends, finished or not; the
+    response's background task deletes it if the stream never starts.
+    """
+    succeeded = False
+    pages = iter_rendered_pages(input_path, page_numbers, dpi, quality, grayscale)
+
+    async def entries():
+        async for page_number, data in pages:
+            yield f"page_{page_number + 1}.jpg", data
+
+    try:
+        async with aclosing(pages):
+            async for chunk in stream_zip(entries()):
+                yield chunk
+        succeeded = True
+    finally:
+        metrics.record_conversion(TOOL_NAME, succeeded)
+        remove_file(input_path)
+
+
+def _page_range(start_page: int, end_page, total: int):
+    """
+    0-based page numbers for the 1-based, inclusive request range, or None
+    if it does not fit the document.
+    """
+    end_page = total if end_page is None else end_page
+    if not 1 <= start_page <= end_page <= total:
+        return None
+    return list(range(start_page - 1, end_page))
+
+
 @router.post("/")
-async def convert_pdf_to_jpg(file: UploadFile = File(...)):
+async def convert_pdf_to_jpg(
+    file: UploadFile = File(...),
+    dpi: int = Form(config.PDF_TO_JPG_DEFAULT_DPI),
+    quality: int = Form(config.PDF_TO_JPG_DEFAULT_QUALITY),
+    grayscale: bool = Form(False),
+    start_page: int = Form(1),
+    end_page: Optional[int] = Form(None),
+    stream: bool = Form(False),
+    async_mode: bool = Form(False)
+):
+    """
+    One JPEG per page in a ZIP. start_page/end_page are 1-based and
+    inclusive; by default every page is rendered.
+
+    stream=true returns the ZIP itself as the response body, each page sent
+    as soon as it is rendered, instead of a download link. Pages rendered
+    below dpi to stay in the memory budget are listed in "reduced_pages"
+    (in the X-Reduced-Pages header when streaming).
+    """
     # Validate file type
     if not file.filename.lower().endswith(".pdf"):
         return JSONResponse(
@@ -27,66 +157,114 @@ async def convert_pdf_to_jpg(file: UploadFile = File(...)):
             content={"status": "error", "message": "Only PDF files allowed."}
         )
 
+    if not config.PDF_TO_JPG_MIN_DPI <= dpi <= config.PDF_TO_JPG_MAX_DPI:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"dpi must be between {config.PDF_TO_JPG_MIN_DPI} and {config.PDF_TO_JPG_MAX_DPI}"
+            }
+        )
+
+    if not 1 <= quality <= 100:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "quality must be between 1 and 100"})
+
+    if stream and async_mode:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": "stream and async_mode cannot be combined"}
+        )
+
     #  Save uploaded PDF
-    input_path = save_upload(file, TOOL_NAME)
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
     # Extract filename without extension to use as base output name
     base_name = Path(file.filename).stem
 
+    if stream:
+        try:
+            plan = await run_tool(TOOL_NAME, plan_pages, input_path, dpi, grayscale)
+        except Exception as e:
+            remove_file(input_path)
+            return JSONResponse(
+                status_code=500,
+                content={"status": "error", "message": f"Conversion failed: {str(e)}"}
+            )
+
+        page_numbers = _page_range(start_page, end_page, len(plan))
+        if page_numbers is None:
+            remove_file(input_path)
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": f"Page range must be within 1-{len(plan)}"}
+            )
+
+        headers = {"Content-Disposition": f"attachment; filename*=UTF-8''{quote(base_name)}.zip"}
+        reduced = reduced_pages(plan, dpi, page_numbers)
+        if reduced:
+            # page:dpi pairs, e.g. "3:96,7:120"
+            headers["X-Reduced-Pages"] = ",".join(f"{r['page']}:{r['dpi']}" for r in reduced)
+
+        return StreamingResponse(
+            _stream_pdf_to_jpg_zip(input_path, page_numbers, dpi, quality, grayscale),
+            media_type="application/zip",
+            headers=headers,
+            background=BackgroundTask(remove_file, input_path)
+        )
+
     # Create output zip filename with counter if needed
     zip_output_path = build_output_path(base_name, ".zip", TOOL_NAME)
 
-    # Temp folder to store multiple JPG pages before zipping
-    temp_folder = Path(str(zip_output_path).replace(".zip", ""))
-    temp_folder.mkdir(exist_ok=True, parents=True)
+    async def work():
+        try:
+            plan = await run_tool(TOOL_NAME, plan_pages, input_path, dpi, grayscale)
+            page_numbers = _page_range(start_page, end_page, len(plan))
+            if page_numbers is None:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "error", "message": f"Page range must be within 1-{len(plan)}"}
+                )
 
-    try:
-        #  Conversion Logic 
-        with fitz.open(input_path) as doc:
-            for page_number in range(len(doc)):
-                page = doc.load_page(page_number)
-                pix = page.get_pixmap(dpi=200)
-                output_img = temp_folder / f"page_{page_number + 1}.jpg"
-                pix.save(str(output_img))
-
-        # Create ZIP
-        shutil.make_archive(str(zip_output_path).replace(".zip", ""), 'zip', temp_folder)
-
-        # Optional: Copy first page into output folder (single JPG preview)
-        first_jpg = temp_folder / "page_1.jpg"
-        if first_jpg.exists():
-            preview_output = build_output_path(base_name, ".jpg", TOOL_NAME)
-            shutil.copy(first_jpg, preview_output)
-
-        # Build download URL
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{Path(zip_output_path).name}"
-
-        return {
-            "status": "success",
-            "message": "PDF converted into JPG successfully!",
-            "download_link": download_url
-        }
-
-    except Exception as e:
-        return JSONResponse(
-            status_code=500,
-            content={"status": "error", "message": f"Conversion failed: {str(e)}"}
-        )
+            await render_pdf_to_jpg_zip(input_path, zip_output_path, page_numbers, dpi, quality, grayscale)
 
-    finally:
-        # Cleanup temp image folder
-        if temp_folder.exists():
-            shutil.rmtree(temp_folder, ignore_errors=True)
+            # Build download URL
+            download_url = build_download_url(zip_output_path)
+
+            response = {
+                "status": "success",
+                "message": "PDF converted into JPG successfully!",
+                "download_link": download_url
+            }
+
+            # Pages too large for RENDER_MAX_PIXMAP_BYTES at the requested dpi
+            reduced = reduced_pages(plan, dpi, page_numbers)
+            if reduced:
+                response["reduced_pages"] = reduced
+
+            return response
+
+        except Exception as e:
+            return JSONResponse(
+                status_code=500,
+                content={"status": "error", "message": f"Conversion failed: {str(e)}"}
+            )
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"dpi": dpi, "quality": quality, "grayscale": grayscale, "start_page": start_page, "end_page": end_page}
+    )
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download_converted(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
     # Return correct MIME based on file type
     mimetype = "application/zip" if file_path.suffix == ".zip" else "image/jpeg"
 
-    return FileResponse(str(file_path), media_type=mimetype, filename=filename)
+    return FileResponse(str(file_path), media_type=mimetype, filename=file_path.name)
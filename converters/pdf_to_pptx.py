@@ -1,14 +1,19 @@
 
 # converters/pdf_to_ppt.py
 
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, Form, UploadFile, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
 from pptx import Presentation
+from pptx.parts.image import ImagePart
 from pptx.util import Inches
-from PIL import Image
-import fitz, tempfile, uuid, io
-
-from utils.storage_manager import save_upload, build_output_path
+import fitz, hashlib, tempfile, time
+from pathlib import Path
+
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file, remove_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
+from utils.page_render import reduced_pages, render_page
 import config
 
 router = APIRouter(
@@ -18,33 +23,106 @@ router = APIRouter(
 
 TOOL_NAME = "pdf_to_ppt"
 
+# Was fitz.Matrix(2, 2)
+RENDER_DPI = 144
 
-# ORIGINAL LOGIC 
-
-def pdf_to_images(pdf_bytes: bytes) -> list:
-    images = []
-    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
 
-    for page_num in range(pdf_document.page_count):
-        page = pdf_document[page_num]
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-        images.append(pix.tobytes("png"))
+class PageLimitExceeded(Exception):
+    """
+    The PDF has more pages than PDF_TO_PPT_MAX_PAGES; the route answers 400.
+    """
 
-    pdf_document.close()
-    return images
 
+# ORIGINAL LOGIC 
 
-def create_ppt(images: list, output_path: str):
+def iter_page_images(pdf_path: str, image_format: str = "png", quality: int = None):
+    """
+    One page at a time: (image bytes, width, height, DPI rendered at).
+    Only the current page's pixmap is alive while it is encoded. Raises
+    PageLimitExceeded, before rendering anything, past PDF_TO_PPT_MAX_PAGES
+    pages when that limit is set.
+    """
+    quality = config.PDF_TO_PPT_DEFAULT_QUALITY if quality is None else quality
+    max_pages = config.PDF_TO_PPT_MAX_PAGES
+
+    with fitz.open(pdf_path) as pdf_document:
+        if max_pages is not None and pdf_document.page_count > max_pages:
+            raise PageLimitExceeded(
+                f"PDF has {pdf_document.page_count} pages; the limit is {config.PDF_TO_PPT_MAX_PAGES}"
+            )
+
+        for page in pdf_document:
+            start_time = time.perf_counter()
+            pix, used_dpi = render_page(page, RENDER_DPI)
+            if image_format == "jpeg":
+                data = pix.tobytes("jpeg", jpg_quality=quality)
+            else:
+                data = pix.tobytes("png")
+            width, height = pix.width, pix.height
+            pix = None
+            metrics.observe_stage(TOOL_NAME, "render", time.perf_counter() - start_time)
+
+            yield data, width, height, used_dpi
+
+        metrics.count(TOOL_NAME, "pages", pdf_document.page_count)
+
+
+class _SpilledImagePart(ImagePart):
+    """
+    ImagePart whose bytes stay in a file until the package is written.
+    python-pptx keeps every image part's bytes in memory until save(); with
+    these the deck holds only paths and hashes, and save() reads one image
+    at a time.
+    """
+
+    @property
+    def blob(self):
+        return Path(self._spill_path).read_bytes()
+
+    @property
+    def sha1(self):
+        return self._spill_sha1
+
+
+def _spill(image_part, path: Path, sha1: str):
+    if not isinstance(image_part, _SpilledImagePart):
+        image_part.__class__ = _SpilledImagePart
+        image_part._spill_path = path
+        image_part._spill_sha1 = sha1
+        image_part._blob = None
+
+
+def create_ppt(pages, output_path: str) -> int:
+    """
+    One slide per (image bytes, width, height) from pages. Each image is
+    written to a scratch file and only read back while the deck is saved,
+    so memory stays flat however many pages there are. python-pptx stores
+    identical images (blank pages, repeated backgrounds) as a single part.
+    Returns the slide count; nothing is written when there are no pages.
+    """
     prs = Presentation()
     
     prs.slide_width = Inches(10)
     prs.slide_height = Inches(5.625)
 
-    for img_bytes in images:
-        slide = prs.slides.add_slide(prs.slide_layouts[6])
+    with tempfile.TemporaryDirectory(prefix="dtit_ppt_") as scratch_dir:
+        count = _add_slides(prs, pages, Path(scratch_dir))
 
-        img = Image.open(io.BytesIO(img_bytes))
-        width, height = img.size
+        if count:
+            with metrics.stage(TOOL_NAME, "write"):
+                prs.save(output_path)
+    return count
+
+
+def _add_slides(prs, pages, scratch_dir: Path) -> int:
+    count = 0
+    for img_bytes, width, height in pages:
+        image_path = scratch_dir / f"page_{count + 1}"
+        image_path.write_bytes(img_bytes)
+        sha1 = hashlib.sha1(img_bytes).hexdigest()
+        img_bytes = None
+
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
 
         slide_aspect = prs.slide_width / prs.slide_height
         img_aspect = width / height
@@ -59,60 +137,110 @@ def create_ppt(images: list, output_path: str):
         left = (prs.slide_width - new_width) / 2
         top = (prs.slide_height - new_height) / 2
 
-        temp_img = tempfile.gettempdir() + f"/{uuid.uuid4()}.png"
-        with open(temp_img, "wb") as f:
-            f.write(img_bytes)
+        # Same part as add_picture's (found by SHA-1), with its bytes on disk
+        image_part, _ = slide.part.get_or_add_image_part(str(image_path))
+        _spill(image_part, image_path, sha1)
+        slide.shapes.add_picture(str(image_path), left, top, width=new_width, height=new_height)
+        count += 1
 
-        slide.shapes.add_picture(temp_img, left, top, width=new_width, height=new_height)
+    return count
 
-    prs.save(output_path)
+
+def pdf_file_to_ppt(pdf_path: str, output_path: str, image_format: str = "png", quality: int = None) -> tuple:
+    """
+    Returns (page count, reduced_pages entries for pages rendered below
+    RENDER_DPI to stay in the memory budget).
+    """
+    plan = []
+
+    def pages():
+        for data, width, height, used_dpi in iter_page_images(pdf_path, image_format, quality):
+            plan.append(used_dpi)
+            yield data, width, height
+
+    page_count = create_ppt(pages(), output_path)
+    return page_count, reduced_pages(plan, RENDER_DPI)
 
 
 # API ROUTE
 
 @router.post("/")
-async def convert_pdf(file: UploadFile = File(...)):
+async def convert_pdf(
+    file: UploadFile = File(...),
+    image_format: str = Form(config.PDF_TO_PPT_DEFAULT_FORMAT),
+    quality: int = Form(config.PDF_TO_PPT_DEFAULT_QUALITY),
+    async_mode: bool = Form(False)
+):
+    """
+    One slide per page. image_format "png" (lossless) or "jpeg" (smaller,
+    at quality 1-100). When config.PDF_TO_PPT_MAX_PAGES is set, longer PDFs
+    get a 400.
+    """
 
     if not file.filename.lower().endswith(".pdf"):
         return JSONResponse(status_code=400, content={"status": "error", "message": "Only PDF files allowed"})
 
-    pdf_bytes = await file.read()
-    if len(pdf_bytes) == 0:
-        return JSONResponse(status_code=400, content={"status": "error", "message": "Empty PDF file"})
-
-    try:
-        # CREATE OUTPUT WITH COUNTER LOGIC
-        output_path = build_output_path("converted-slide", ".pptx", TOOL_NAME)
+    if image_format not in config.PDF_TO_PPT_IMAGE_FORMATS:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "error", "message": f"image_format must be one of: {', '.join(config.PDF_TO_PPT_IMAGE_FORMATS)}"}
+        )
 
-        # ORIGINAL CONVERSION LOGIC 
-        images = pdf_to_images(pdf_bytes)
-        if not images:
-            return JSONResponse(status_code=400, content={"status": "error", "message": "PDF has no pages"})
+    if not 1 <= quality <= 100:
+        return JSONResponse(status_code=400, content={"status": "error", "message": "quality must be between 1 and 100"})
 
-        create_ppt(images, str(output_path))
-
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
-
-        return {
-            "status": "success",
-            "message": "Converted PDF → PPT successfully!",
-            "download_link": download_url,
-            "file_name": output_path.name
-        }
+    upload = await save_upload(file, TOOL_NAME)
+    if upload.size == 0:
+        remove_file(upload.path)
+        return JSONResponse(status_code=400, content={"status": "error", "message": "Empty PDF file"})
 
-    except Exception as e:
-        return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+    # CREATE OUTPUT WITH COUNTER LOGIC
+    output_path = build_output_path("converted-slide", ".pptx", TOOL_NAME)
+
+    async def work():
+        try:
+            # ORIGINAL CONVERSION LOGIC 
+            page_count, reduced = await run_tool(
+                TOOL_NAME, pdf_file_to_ppt, str(upload.path), str(output_path), image_format, quality
+            )
+            if not page_count:
+                return JSONResponse(status_code=400, content={"status": "error", "message": "PDF has no pages"})
+
+            download_url = build_download_url(output_path)
+
+            response = {
+                "status": "success",
+                "message": "Converted PDF → PPT successfully!",
+                "download_link": download_url,
+                "file_name": output_path.name
+            }
+            if reduced:
+                response["reduced_pages"] = reduced
+
+            return response
+
+        except PageLimitExceeded as e:
+            return JSONResponse(status_code=400, content={"status": "error", "message": str(e)})
+
+        except Exception as e:
+            return JSONResponse(status_code=500, content={"status": "error", "message": str(e)})
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"image_format": image_format, "quality": quality}
+    )
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if not file_path.exists():
+    if file_path is None:
         return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
 
     return FileResponse(
         path=str(file_path),
-        filename=filename,
+        filename=file_path.name,
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
     )
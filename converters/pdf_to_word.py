@@ -4,12 +4,13 @@
 
 from pathlib import Path
 
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, Form
 from fastapi import HTTPException
-from pdf2docx import Converter
 
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 
 router = APIRouter(
     prefix="/pdf-to-word",
@@ -20,9 +21,12 @@ TOOL_NAME = "pdf_to_word"
 
 
 def pdf_to_word_internal(pdf_path: Path, output_path: Path):
+    from pdf2docx import Converter
+
     try:
         cv = Converter(str(pdf_path))
         cv.convert(str(output_path))
+        metrics.count(TOOL_NAME, "pages", len(cv.fitz_doc))
         cv.close()
     except Exception as e:
         if output_path.exists():
@@ -31,7 +35,7 @@ def pdf_to_word_internal(pdf_path: Path, output_path: Path):
 
 
 @router.post("/")
-async def convert_pdf_to_word(file: UploadFile = File(...)):
+async def convert_pdf_to_word(file: UploadFile = File(...), async_mode: bool = Form(False)):
     #  Validate extension
     if not file.filename.lower().endswith(".pdf"):
         return {
@@ -39,47 +43,58 @@ async def convert_pdf_to_word(file: UploadFile = File(...)):
             "message": "Only PDF files are allowed",
         }
 
-    try:
-        # Save upload in storage/uploads/pdf_to_word/
-        input_path = save_upload(file, TOOL_NAME)
+    # Save upload in storage/uploads/pdf_to_word/
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
+    try:
         # Prepare output path in storage/outputs/pdf_to_word/
         original_name = input_path.stem  # filename without extension
         output_path = build_output_path(original_name, ".docx", TOOL_NAME)
 
-        # Convert
-        pdf_to_word_internal(input_path, output_path)
-
-        #  download link
-     
-        download_link = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
-
-        return {
-            "status": "success",
-            "message": "PDF converted successfully!",
-            "download_link": download_link,
-            "file_name": output_path.name,
-        }
-
     except Exception as e:
         return {
             "status": "error",
             "message": f"Conversion failed: {str(e)}",
         }
 
+    async def work():
+        try:
+            # Convert
+            await run_tool(TOOL_NAME, pdf_to_word_internal, input_path, output_path)
+
+            #  download link
+     
+            download_link = build_download_url(output_path)
+
+            return {
+                "status": "success",
+                "message": "PDF converted successfully!",
+                "download_link": download_link,
+                "file_name": output_path.name,
+            }
+
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Conversion failed: {str(e)}",
+            }
+
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=[upload])
+
 
 # (Optional) backward-compatible route similar to /api/filesword/{file_name}
-@router.get("/file/{file_name}")
+@router.get("/file/{file_name:path}")
 def download_pdf_to_word(file_name: str):
-    word_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
-    if word_path.exists():
+    word_path = resolve_output_file(TOOL_NAME, file_name)
+    if word_path is not None:
         from fastapi.responses import FileResponse
         return FileResponse(
             str(word_path),
             media_type=(
                 "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
             ),
-            filename=file_name,
+            filename=word_path.name,
         )
 
     raise HTTPException(status_code=404, detail="File not found.")
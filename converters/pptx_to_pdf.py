@@ -2,9 +2,9 @@
 
 # converters/pptx_to_pdf.py
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
-import uuid, os, platform, subprocess, tempfile
+import platform
 from pathlib import Path
 
 from pptx import Presentation
@@ -13,8 +13,10 @@ from reportlab.lib.pagesizes import landscape
 from PIL import Image
 import fitz
 
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils import libreoffice_pool
+from utils.jobs import dispatch
 
 
 
@@ -34,8 +36,11 @@ TOOL_NAME = "pptx_to_pdf"
 # ---------------- ORIGINAL LOGIC (NOT MODIFIED) ---------------- #
 
 def pptx_to_pdf_windows(pptx_path: str, pdf_path: str):
+    import comtypes
     import comtypes.client
     try:
+        # Runs in a worker thread, which needs its own COM apartment
+        comtypes.CoInitialize()
         powerpoint = comtypes.client.CreateObject("Powerpoint.Application")
         powerpoint.Visible = 1
         deck = powerpoint.Presentations.Open(pptx_path)
@@ -49,23 +54,8 @@ def pptx_to_pdf_windows(pptx_path: str, pdf_path: str):
 
 def pptx_to_pdf_libreoffice(pptx_path: str, pdf_path: str):
     try:
-        commands = ["libreoffice", "soffice", "/usr/bin/libreoffice"]
-        for cmd in commands:
-            try:
-                result = subprocess.run([
-                    cmd, "--headless", "--convert-to", "pdf",
-                    "--outdir", str(Path(pdf_path).parent), pptx_path
-                ], capture_output=True, timeout=50)
-
-                if result.returncode == 0:
-                    generated = Path(pptx_path).with_suffix(".pdf")
-                    if generated.exists():
-                        if generated != pdf_path:
-                            os.replace(generated, pdf_path)
-                        return True
-            except:
-                continue
-        return False
+        libreoffice_pool.convert_to_pdf(Path(pptx_path), Path(pdf_path))
+        return Path(pdf_path).exists()
     except:
         return False
 
@@ -104,42 +94,46 @@ def convert_ppt_logic(pptx_path: str, pdf_path: str) -> bool:
 #  API ENDPOINT 
 
 @router.post("/")
-async def convert(file: UploadFile = File(...)):
+async def convert(file: UploadFile = File(...), async_mode: bool = Form(False)):
 
     if not file.filename.lower().endswith((".pptx", ".ppt")):
         raise HTTPException(status_code=400, detail="Only PPTX/PPT files allowed")
 
     # Save upload to /uploads/
-    input_path = save_upload(file, TOOL_NAME)
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
     # Build output filename with counter logic
     output_path = build_output_path(Path(file.filename).stem, ".pdf", TOOL_NAME)
 
-    # Perform conversion
-    success = convert_ppt_logic(str(input_path), str(output_path))
+    async def work():
+        # Perform conversion
+        success = await run_tool(TOOL_NAME, convert_ppt_logic, str(input_path), str(output_path))
+
+        if not success or not output_path.exists():
+            raise HTTPException(status_code=500, detail="Conversion failed. LibreOffice or PowerPoint required.")
 
-    if not success or not output_path.exists():
-        raise HTTPException(status_code=500, detail="Conversion failed. LibreOffice or PowerPoint required.")
+        download_url = build_download_url(output_path)
 
-    download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
+        return JSONResponse({
+            "status": "success",
+            "message": "PPTX converted to PDF successfully!",
+            "download_link": download_url,
+            "file_name": output_path.name
+        })
 
-    return JSONResponse({
-        "status": "success",
-        "message": "PPTX converted to PDF successfully!",
-        "download_link": download_url,
-        "file_name": output_path.name
-    })
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=[upload])
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 async def download(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         str(file_path),
-        filename=filename,
+        filename=file_path.name,
         media_type="application/pdf"
     )
@@ -5,9 +5,10 @@ from fastapi import APIRouter, UploadFile, File, Form
 from fastapi.responses import JSONResponse, FileResponse
 from PyPDF2 import PdfReader, PdfWriter
 from pathlib import Path
-import tempfile
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 
 router = APIRouter(
     prefix="/split-pdf",
@@ -16,14 +17,36 @@ router = APIRouter(
 
 TOOL_NAME = "split_pdf"
 
+
+def split_pdf_pages(input_path, output_path, start_page: int, end_page: int):
+    pdf = PdfReader(str(input_path))
+    total_pages = len(pdf.pages)
+
+    # Validate page range
+    if start_page < 1 or end_page > total_pages or start_page > end_page:
+        raise ValueError(f"Invalid page range. PDF has {total_pages} pages.")
+
+    # Split logic 
+    writer = PdfWriter()
+    for page_index in range(start_page - 1, end_page):
+        writer.add_page(pdf.pages[page_index])
+
+    # Save output
+    with metrics.stage(TOOL_NAME, "write"), open(output_path, "wb") as f:
+        writer.write(f)
+
+    metrics.count(TOOL_NAME, "pages", end_page - start_page + 1)
+
+    return output_path
+
+
 @router.post("/")
 async def split_pdf(
     file: UploadFile = File(...),
     start_page: int = Form(...),
-    end_page: int = Form(...)
+    end_page: int = Form(...),
+    async_mode: bool = Form(False)
 ):
-    tmp_path = None
-
     # Validate file is PDF
     if not file.filename.lower().endswith(".pdf"):
         return JSONResponse(
@@ -31,30 +54,11 @@ async def split_pdf(
             content={"status": "error", "message": "Only PDF files allowed"}
         )
 
-    try:
-        # Save uploaded PDF using storage manager
-        input_path = save_upload(file, TOOL_NAME)
-
-        # Create temp file copy for reading
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(Path(input_path).read_bytes())
-            tmp_path = tmp.name
-
-        pdf = PdfReader(tmp_path)
-        total_pages = len(pdf.pages)
-
-        # Validate page range
-        if start_page < 1 or end_page > total_pages or start_page > end_page:
-            return JSONResponse(
-                status_code=400,
-                content={"status": "error", "message": f"Invalid page range. PDF has {total_pages} pages."}
-            )
-
-        # Split logic 
-        writer = PdfWriter()
-        for page_index in range(start_page - 1, end_page):
-            writer.add_page(pdf.pages[page_index])
+    # Save uploaded PDF using storage manager
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
+    try:
         # Create filename format based on original name
         original_stem = Path(file.filename).stem
         base_output_name = f"{original_stem}_pages_{start_page}_to_{end_page}"
@@ -62,33 +66,47 @@ async def split_pdf(
         # Counter save system 
         output_path = build_output_path(base_output_name, ".pdf", TOOL_NAME)
 
-        # Save output
-        with open(output_path, "wb") as f:
-            writer.write(f)
-
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{output_path.name}"
-
-        return {
-            "status": "success",
-            "message": "PDF split successfully!",
-            "download_link": download_url
-        }
-
     except Exception as e:
         return JSONResponse(
             status_code=500,
             content={"status": "error", "message": str(e)}
         )
-    finally:
-        if tmp_path and Path(tmp_path).exists():
-            Path(tmp_path).unlink()
+
+    async def work():
+        try:
+            await run_tool(TOOL_NAME, split_pdf_pages, input_path, output_path, start_page, end_page)
+
+            download_url = build_download_url(output_path)
+
+            return {
+                "status": "success",
+                "message": "PDF split successfully!",
+                "download_link": download_url
+            }
+
+        except ValueError as e:
+            return JSONResponse(
+                status_code=400,
+                content={"status": "error", "message": str(e)}
+            )
+        except Exception as e:
+            return JSONResponse(
+                status_code=500,
+                content={"status": "error", "message": str(e)}
+            )
+
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[upload],
+        params={"start_page": start_page, "end_page": end_page}
+    )
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download_split_file(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
+    file_path = resolve_output_file(TOOL_NAME, filename)
 
-    if file_path.exists():
-        return FileResponse(str(file_path), media_type="application/pdf", filename=filename)
+    if file_path is not None:
+        return FileResponse(str(file_path), media_type="application/pdf", filename=file_path.name)
 
     return JSONResponse(status_code=404, content={"status": "error", "message": "File not found"})
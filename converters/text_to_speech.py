@@ -4,22 +4,17 @@
 
 import os
 import uuid
-import shutil
 from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse, JSONResponse
 from pydantic import BaseModel
-from gtts import gTTS
-import langdetect
-from pydub import AudioSegment
-from gtts.lang import tts_langs
-from googletrans import Translator
-import nltk
 
-from utils.storage_manager import save_upload, build_output_path
-import config
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file, remove_file
+from utils.executor import run_tool
+from utils.jobs import dispatch
+from utils import metrics
 
 
 router = APIRouter(
@@ -29,11 +24,38 @@ router = APIRouter(
 
 TOOL_NAME = "text_to_speech"
 
-translator = Translator()
-nltk.download("punkt", quiet=True)
+# gTTS, pydub, langdetect and googletrans are imported on first use so that
+# importing this router stays fast and never touches the network.
+_translator = None
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()
+    return _translator
+
+
+def tts_langs():
+    from gtts.lang import tts_langs as gtts_langs
+    return gtts_langs()
+
+
+def synthesize(text: str, language: str, mp3_path: str):
+    """
+    Text -> MP3 through Google TTS. The load-test harness swaps this (and the
+    translator) for local stand-ins; see benchmarks/fakes.py.
+    """
+    from gtts import gTTS
+
+    gTTS(text=text, lang=language, slow=False).save(mp3_path)
+
 
 #  Original Functions 
 def detect_language(text):
+    import langdetect
+
     try:
         return langdetect.detect(text)
     except:
@@ -53,33 +75,32 @@ def adjust_voice(audio, gender='female'):
 
 
 
-def text_to_speech_engine(text, gender='female', language='auto'):
+def text_to_speech_engine(text, output_path: Path, gender='female', language='auto'):
+    from pydub import AudioSegment
+
     detected_lang = detect_language(text)
 
     if language != "auto" and language != detected_lang:
-        translated = translator.translate(text, src=detected_lang, dest=language)
+        translated = get_translator().translate(text, src=detected_lang, dest=language)
         text = translated.text
     elif language == "auto":
         language = detected_lang  
 
-    unique_id = str(uuid.uuid4())
-    temp_file = f"temp_{unique_id}.mp3"
-
-    output_filename = f"{unique_id}_{gender}_{language}.mp3"
+    # Raw gTTS audio goes next to the output (its own request folder),
+    # not into the working directory
+    temp_file = str(output_path.with_name(f"temp_{output_path.name}"))
 
-    # Final output placement
-    output_path = build_output_path(unique_id, ".mp3", TOOL_NAME)
-
-    tts = gTTS(text=text, lang=language, slow=False)
-    tts.save(temp_file)
+    with metrics.stage(TOOL_NAME, "synthesize"):
+        synthesize(text, language, temp_file)
 
     audio = AudioSegment.from_mp3(temp_file)
     modified_audio = adjust_voice(audio, gender)
 
-    modified_audio.export(output_path, format="mp3")
+    with metrics.stage(TOOL_NAME, "write"):
+        modified_audio.export(output_path, format="mp3")
     os.remove(temp_file)
 
-    return output_path.name
+    return output_path
 
 
 
@@ -99,7 +120,8 @@ async def api_text_to_speech(
         text: Optional[str] = Form(None),
         file: Optional[UploadFile] = File(None),
         gender: str = Form("female"),
-        language: str = Form("auto")
+        language: str = Form("auto"),
+        async_mode: bool = Form(False)
 ):
     if gender not in ['male', 'female']:
         gender = 'female'
@@ -122,24 +144,35 @@ async def api_text_to_speech(
         text_content = text.strip()
 
     elif file and file.filename.endswith(".txt"):
-        temp_path = save_upload(file, TOOL_NAME)
-        text_content = Path(temp_path).read_text("utf-8")
+        upload = await save_upload(file, TOOL_NAME)
+        text_content = upload.path.read_text("utf-8")
+        remove_file(upload.path)
     else:
         raise HTTPException(status_code=400, detail="Provide text or a .txt file.")
 
-    filename = text_to_speech_engine(text_content, gender, language)
+    # Built here, not in the worker, so dispatch owns the request folder
+    output_path = build_output_path(str(uuid.uuid4()), ".mp3", TOOL_NAME)
+
+    async def work():
+        await run_tool(TOOL_NAME, text_to_speech_engine, text_content, output_path, gender, language)
+
+        download_url = build_download_url(output_path)
 
-    download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{filename}"
+        return SuccessResponse(status="success", download_link=download_url)
 
-    return SuccessResponse(status="success", download_link=download_url)
+    return await dispatch(
+        TOOL_NAME, work, async_mode,
+        inputs=[text_content],
+        params={"gender": gender, "language": language}
+    )
 
 
 
-@router.get("/file/{filename}")
+@router.get("/file/{filename:path}")
 def download_file(filename: str):
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / filename
-    if file_path.exists():
-        return FileResponse(str(file_path), media_type="audio/mpeg", filename=filename)
+    file_path = resolve_output_file(TOOL_NAME, filename)
+    if file_path is not None:
+        return FileResponse(str(file_path), media_type="audio/mpeg", filename=file_path.name)
     raise HTTPException(status_code=404, detail="File not found")
 
 
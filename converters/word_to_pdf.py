@@ -271,11 +271,12 @@
 # converters/word_to_pdf.py
 
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from fastapi.responses import FileResponse
-import subprocess
-import os
-import config
+from utils.executor import run_tool
+from utils import libreoffice_pool
+from utils.storage_manager import save_upload, build_output_path, build_download_url, resolve_output_file
+from utils.jobs import dispatch
 
 router = APIRouter(
     prefix="/word-to-pdf",
@@ -285,47 +286,21 @@ router = APIRouter(
 TOOL_NAME = "word_to_pdf"
 
 
-def convert_word_to_pdf_libreoffice(input_path: Path, output_dir: Path):
+def convert_word_to_pdf_libreoffice(input_path: Path, output_path: Path):
     """
     Convert DOCX to PDF using LibreOffice
     Preserves all formatting, colors, fonts, and table layouts
     """
     try:
-        # Ensure output directory exists
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # LibreOffice command
-        command = [
-            "libreoffice",
-            "--headless",
-            "--convert-to", "pdf",
-            "--outdir", str(output_dir),
-            str(input_path)
-        ]
-        
-        # Run conversion
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        if result.returncode != 0:
-            raise Exception(f"LibreOffice conversion failed: {result.stderr}")
-            
-        # Return the output PDF path
-        pdf_filename = input_path.stem + ".pdf"
-        return output_dir / pdf_filename
-        
-    except subprocess.TimeoutExpired:
-        raise Exception("Conversion timeout - file too large")
+        # Warm pooled instance (falls back to a one-off soffice run)
+        return libreoffice_pool.convert_to_pdf(input_path, output_path)
+
     except Exception as e:
         raise Exception(f"LibreOffice conversion error: {str(e)}")
 
 
 @router.post("/")
-async def word_to_pdf(file: UploadFile = File(...)):
+async def word_to_pdf(file: UploadFile = File(...), async_mode: bool = Form(False)):
     """Upload Word → PDF Conversion Route"""
 
     # Validate format
@@ -335,41 +310,49 @@ async def word_to_pdf(file: UploadFile = File(...)):
             "message": "Only .doc or .docx files allowed"
         }
 
-    try:
-        # Save upload
-        from utils.storage_manager import save_upload, build_output_path
-        input_path = save_upload(file, TOOL_NAME)
-        
-        # Get output directory
-        output_dir = config.OUTPUT_ROOT / TOOL_NAME
-        
-        # Convert using LibreOffice
-        pdf_path = convert_word_to_pdf_libreoffice(input_path, output_dir)
-        
-        # Download link
-        download_url = f"{config.BASE_DOWNLOAD_URL}/{TOOL_NAME}/{pdf_path.name}"
+    # Save upload
+    upload = await save_upload(file, TOOL_NAME)
+    input_path = upload.path
 
-        return {
-            "status": "success",
-            "message": "Converted successfully!",
-            "download_link": download_url,
-            "file_name": pdf_path.name,
-        }
+    try:
+        # Build output path (.pdf) so a same-named upload never overwrites
+        # an earlier result
+        output_path = build_output_path(input_path.stem, ".pdf", TOOL_NAME)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def work():
+        try:
+            # Convert using LibreOffice
+            pdf_path = await run_tool(TOOL_NAME, convert_word_to_pdf_libreoffice, input_path, output_path)
+        
+            # Download link
+            download_url = build_download_url(pdf_path)
+
+            return {
+                "status": "success",
+                "message": "Converted successfully!",
+                "download_link": download_url,
+                "file_name": pdf_path.name,
+            }
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await dispatch(TOOL_NAME, work, async_mode, inputs=[upload])
+
 
-@router.get("/file/{file_name}")
+@router.get("/file/{file_name:path}")
 def download_word_to_pdf(file_name: str):
     """Download converted PDF"""
-    file_path = config.OUTPUT_ROOT / TOOL_NAME / file_name
+    file_path = resolve_output_file(TOOL_NAME, file_name)
 
-    if not file_path.exists():
+    if file_path is None:
         raise HTTPException(status_code=404, detail="File not found")
 
     return FileResponse(
         str(file_path),
         media_type="application/pdf",
-        filename=file_name
+        filename=file_path.name
     )
@@ -3,21 +3,63 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 import config
+from utils import executor, jobs, janitor, libreoffice_pool, metrics
+from utils.storage_manager import get_max_upload_bytes
+from utils.upload_limit import UploadLimitMiddleware
 from  converters import pdf_to_word, word_to_pdf, add_pg_no, bg_remove, pdf_to_excel, excel_to_pdf
 from converters import text_to_speech, bg_white_adder, jpg_to_pdf, pdf_to_jpg, black_white_converter
 from converters import split_pdf, merge_pdf, pdf_to_pptx, pptx_to_pdf, pdf_compress
 
 
+TOOL_MODULES = [
+    pdf_to_word, word_to_pdf, add_pg_no, bg_remove, pdf_to_excel, excel_to_pdf,
+    text_to_speech, bg_white_adder, jpg_to_pdf, pdf_to_jpg, black_white_converter,
+    split_pdf, merge_pdf, pdf_to_pptx, pptx_to_pdf, pdf_compress,
+]
+
+
 app = FastAPI(
     title=config.APP_TITLE,
     description=config.APP_DESCRIPTION,
     version=config.APP_VERSION,
 )
 
-# CORS
+# WORKER POOLS (converters run here, never on the event loop)
+
+@app.on_event("startup")
+async def start_workers():
+    executor.start()
+    executor.warm_up()
+    libreoffice_pool.start()
+    janitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    janitor.shutdown()
+    executor.shutdown()
+    libreoffice_pool.shutdown()
+
+
+# UPLOAD SIZE LIMITS (413 before the body is parsed)
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        **{tool.router.prefix: get_max_upload_bytes(tool.TOOL_NAME) for tool in TOOL_MODULES},
+        **{f"{tool.router.prefix}/batch": config.BATCH_MAX_UPLOAD_BYTES for tool in (bg_remove, bg_white_adder)},
+    },
+)
+
+# METRICS (request counts and latency per tool, served on /metrics)
+app.add_middleware(
+    metrics.MetricsMiddleware,
+    tools={tool.router.prefix: tool.TOOL_NAME for tool in TOOL_MODULES},
+)
+
+# CORS (added last, so it is the outermost layer and its headers reach
+# 413s from the upload limit too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.ALLOWED_ORIGINS,
@@ -28,7 +70,8 @@ app.add_middleware(
 
 # STATIC DOWNLOADS 
 
-app.mount("/downloads", StaticFiles(directory=config.OUTPUT_ROOT), name="downloads")
+# Tracked so the storage janitor never deletes a file while it is being served
+app.mount("/downloads", janitor.TrackedStaticFiles(directory=config.OUTPUT_ROOT), name="downloads")
 
 # ROUTERS (TOOLS) 
 app.include_router(pdf_to_word.router)
@@ -63,6 +106,12 @@ app.include_router(pptx_to_pdf.router)
 
 app.include_router(pdf_compress.router)
 
+app.include_router(jobs.router)
+
+app.include_router(janitor.router)
+
+app.include_router(metrics.router)
+
 
 @app.get("/api/")
 def home():
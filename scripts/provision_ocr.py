@@ -0,0 +1,46 @@
+# scripts/provision_ocr.py
+#
+# Download the EasyOCR models into config.OCR_MODEL_DIR, so pdf_to_excel's
+# OCR fallback never downloads anything at request time.
+#
+#   python -m scripts.provision_ocr                      # OCR_PRELOAD_LANGUAGES
+#   python -m scripts.provision_ocr --languages en,fr,de
+
+import argparse
+
+import config
+
+
+def provision(languages: list):
+    import easyocr
+
+    config.OCR_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+    easyocr.Reader(
+        languages,
+        gpu=False,
+        model_storage_directory=str(config.OCR_MODEL_DIR),
+        download_enabled=True,
+        verbose=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download EasyOCR models for the OCR fallback")
+    parser.add_argument("--languages", help="comma-separated language set, e.g. en,fr")
+    args = parser.parse_args()
+
+    if args.languages:
+        language_sets = [[code.strip() for code in args.languages.split(",") if code.strip()]]
+    else:
+        language_sets = config.OCR_PRELOAD_LANGUAGES
+
+    for languages in language_sets:
+        provision(languages)
+        print(f"{','.join(languages)}: ok")
+
+    files = sorted(p.name for p in config.OCR_MODEL_DIR.glob("*.pth"))
+    print(f"{config.OCR_MODEL_DIR}: {', '.join(files)}")
+
+
+if __name__ == "__main__":
+    main()
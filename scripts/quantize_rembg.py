@@ -0,0 +1,65 @@
+# scripts/quantize_rembg.py
+#
+# Build the int8 u2net used by the "fast" background-removal tier
+# (config.REMBG_CUSTOM_MODELS["u2net_int8"]) from rembg's float32 u2net.
+#
+#   python -m scripts.quantize_rembg
+#   python -m scripts.quantize_rembg --source ~/.u2net/u2net.onnx
+#
+# Weights are quantized to uint8 (dynamic quantization), which makes the
+# file ~4x smaller and CPU inference faster. Compare quality with
+# python -m benchmarks.bench_rembg before switching traffic to it.
+
+import argparse
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import config
+
+
+def default_source() -> Path:
+    return Path(os.environ.get("U2NET_HOME", Path.home() / ".u2net")) / "u2net.onnx"
+
+
+def quantize(source: Path, output: Path):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = Path(tmp) / "prepared.onnx"
+        try:
+            # Shape inference + graph cleanup gives better quantization
+            from onnxruntime.quantization.shape_inference import quant_pre_process
+            quant_pre_process(str(source), str(prepared))
+        except Exception:
+            shutil.copy2(source, prepared)
+
+        tmp_output = Path(tmp) / output.name
+        quantize_dynamic(str(prepared), str(tmp_output), weight_type=QuantType.QUInt8)
+        shutil.move(str(tmp_output), output)
+
+
+def main():
+    model_path, _ = config.REMBG_CUSTOM_MODELS["u2net_int8"]
+
+    parser = argparse.ArgumentParser(description="Quantize u2net to int8 for the fast tier")
+    parser.add_argument("--source", type=Path, default=default_source(), help="float32 u2net.onnx")
+    parser.add_argument("--output", type=Path, default=model_path)
+    args = parser.parse_args()
+
+    if not args.source.exists():
+        # rembg downloads the model on first session
+        from rembg import new_session
+        new_session("u2net")
+
+    quantize(args.source, args.output)
+
+    before, after = args.source.stat().st_size, args.output.stat().st_size
+    print(f"{args.source} ({before / 1e6:.1f} MB) -> {args.output} ({after / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+
+# utils/bw_engine.py
+
+import config
+
+
+# Black & white conversion for bw_converter.
+#
+# The image is decoded once as 8-bit grayscale (JPEGs straight from the
+# decoder, skipping the colour conversion). Threshold, Otsu and adaptive modes
+# then run with NumPy on horizontal strips of about BW_TILE_PIXELS pixels, so
+# their extra memory stays bounded however large the scan is. Results are
+# 1-bit images, which PNG and TIFF (CCITT G4) store at one bit per pixel.
+#
+# Not tiled: the decode itself (Pillow has no strip reads for most formats)
+# and the dither and grayscale modes, which work on the whole image. Inputs
+# above BW_MAX_PIXELS are therefore refused before anything is decoded.
+
+
+def open_grayscale(path):
+    """
+    8-bit grayscale image, EXIF orientation applied. Raises ValueError for
+    images above BW_MAX_PIXELS.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        width, height = image.size
+        if width * height > config.BW_MAX_PIXELS:
+            raise ValueError(
+                f"Image is {width}x{height}; the limit is {config.BW_MAX_PIXELS // 1000000} megapixels"
+            )
+
+        image.draft("L", image.size)
+        image = ImageOps.exif_transpose(image)
+        return image if image.mode == "L" else image.convert("L")
+
+
+def _strips(size, halo: int = 0):
+    """
+    (top, bottom) row ranges covering an image of size, sized so a strip
+    plus its halo rows holds about BW_TILE_PIXELS pixels.
+    """
+    width, height = size
+    rows = max(1, config.BW_TILE_PIXELS // max(1, width) - 2 * halo)
+    for top in range(0, height, rows):
+        yield top, min(height, top + rows)
+
+
+def _read_strip(gray, top: int, bottom: int):
+    import numpy as np
+
+    return np.asarray(gray.crop((0, top, gray.width, bottom)))
+
+
+def otsu_level(gray) -> int:
+    """
+    Level that best separates the two classes of the grayscale histogram.
+    """
+    import numpy as np
+
+    hist = np.asarray(gray.histogram()[:256], dtype=np.float64)
+    levels = np.arange(256)
+
+    weight_dark = np.cumsum(hist)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(hist * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    # Pixels above the returned level are white
+    return int(np.argmax(between)) + 1
+
+
+def _threshold(gray, level: int):
+    from PIL import Image
+
+    result = Image.new("1", gray.size)
+    for top, bottom in _strips(gray.size):
+        strip = _read_strip(gray, top, bottom)
+        result.paste(Image.fromarray(strip >= level), (0, top))
+    return result
+
+
+def _adaptive(gray, block: int, offset: int):
+    """
+    White where a pixel is brighter than the mean of its block x block
+    neighbourhood minus offset. Means come from an integral image of each
+    strip plus block // 2 halo rows on either side.
+    """
+    import numpy as np
+    from PIL import Image
+
+    radius = max(1, block // 2)
+    side = 2 * radius + 1
+    area = side * side
+    width, height = gray.size
+
+    result = Image.new("1", gray.size)
+    for top, bottom in _strips(gray.size, radius):
+        halo_top, halo_bottom = max(0, top - radius), min(height, bottom + radius)
+        strip = _read_strip(gray, halo_top, halo_bottom).astype(np.int64)
+        padded = np.pad(
+            strip,
+            ((radius - (top - halo_top), radius - (halo_bottom - bottom)), (radius, radius)),
+            mode="edge",
+        )
+
+        integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=np.int64)
+        np.cumsum(padded, axis=0, out=integral[1:, 1:])
+        np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+
+        rows = bottom - top
+        sums = (
+            integral[side:side + rows, side:side + width]
+            - integral[:rows, side:side + width]
+            - integral[side:side + rows, :width]
+            + integral[:rows, :width]
+        )
+        center = strip[top - halo_top:top - halo_top + rows]
+        result.paste(Image.fromarray(center * area > sums - offset * area), (0, top))
+
+    return result
+
+
+def convert(gray, mode: str, threshold: int = None, block: int = None, offset: int = None):
+    """
+    Black & white version of a grayscale image: mode "L" for "grayscale",
+    mode "1" for every other mode of config.BW_MODES.
+    """
+    if mode == "grayscale":
+        return gray
+    if mode == "dither":
+        return gray.convert("1")
+    if mode == "threshold":
+        return _threshold(gray, config.BW_DEFAULT_THRESHOLD if threshold is None else threshold)
+    if mode == "otsu":
+        return _threshold(gray, otsu_level(gray))
+    if mode == "adaptive":
+        return _adaptive(
+            gray,
+            config.BW_ADAPTIVE_BLOCK if block is None else block,
+            config.BW_ADAPTIVE_OFFSET if offset is None else offset,
+        )
+    raise ValueError(f"Unknown mode '{mode}'. Choose one of: {', '.join(config.BW_MODES)}")
+
+
+def output_extension(output_format: str, original_ext: str) -> str:
+    if output_format == "png":
+        return ".png"
+    if output_format == "tiff":
+        return ".tiff"
+    return original_ext
+
+
+def save(image, path, extension: str):
+    """
+    Save with the most compact encoding the format has for image's mode.
+    """
+    if extension in (".tif", ".tiff"):
+        compression = "group4" if image.mode == "1" else "tiff_adobe_deflate"
+        image.save(path, "TIFF", compression=compression)
+    elif extension == ".png":
+        image.save(path, "PNG")
+    elif extension in (".jpg", ".jpeg", ".webp") and image.mode == "1":
+        # No 1-bit encoding in these formats
+        image.convert("L").save(path)
+    else:
+        image.save(path)
@@ -0,0 +1,179 @@
+
+# utils/executor.py
+
+import asyncio
+import importlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import config
+from utils import jobs, metrics
+
+
+_thread_pool = None
+_process_pools = {}
+_semaphores = {}
+
+
+def _import_modules(module_names):
+    for name in module_names:
+        module_name, _, func_name = name.partition(":")
+        try:
+            module = importlib.import_module(module_name)
+            if func_name:
+                getattr(module, func_name)()
+        except Exception:
+            # Missing optional dependency: the tool reports it on first use
+            pass
+
+
+def _process_worker_init(module_names):
+    # Runs once in every new worker process
+    if module_names:
+        _import_modules(module_names)
+
+
+def _noop():
+    return None
+
+
+def start():
+    """
+    Create the shared worker pools. Safe to call more than once.
+    """
+    global _thread_pool
+
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(
+            max_workers=config.THREAD_POOL_WORKERS,
+            thread_name_prefix="dtit-tool",
+        )
+
+    for name in config.PROCESS_POOLS:
+        _get_process_pool(name)
+
+
+def _get_process_pool(name: str) -> ProcessPoolExecutor:
+    pool = _process_pools.get(name)
+    if pool is None:
+        # Each pool's workers warm up only what that pool's tools use
+        pool = _process_pools[name] = ProcessPoolExecutor(
+            max_workers=config.PROCESS_POOLS[name],
+            mp_context=multiprocessing.get_context(config.PROCESS_POOL_START_METHOD),
+            initializer=_process_worker_init,
+            initargs=(_warmup_modules(name),),
+        )
+    return pool
+
+
+def _warmup_modules(kind: str) -> list:
+    if not config.WARMUP_ON_STARTUP:
+        return []
+    return list(config.WARMUP_IMPORTS.get(kind, []))
+
+
+def warm_up():
+    """
+    Import heavy libraries in the background (called on app startup) instead
+    of at import time, so startup stays fast and the first request is not
+    cold either.
+    """
+    if not config.WARMUP_ON_STARTUP:
+        return
+
+    start()
+
+    threading.Thread(
+        target=_import_modules,
+        args=(_warmup_modules("thread"),),
+        name="dtit-warmup",
+        daemon=True,
+    ).start()
+
+    # Process workers are spawned lazily; one no-op per slot spawns all of
+    # them now, and each runs its pool's warm-up imports in its initializer.
+    for name, workers in config.PROCESS_POOLS.items():
+        pool = _get_process_pool(name)
+        for _ in range(workers):
+            pool.submit(_noop)
+
+
+def shutdown():
+    """
+    Stop the worker pools (called on app shutdown).
+    """
+    global _thread_pool
+
+    for name in list(_process_pools):
+        _process_pools.pop(name).shutdown(wait=False, cancel_futures=True)
+
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False, cancel_futures=True)
+        _thread_pool = None
+
+
+def _get_semaphore(tool_name: str) -> asyncio.Semaphore:
+    sem = _semaphores.get(tool_name)
+    if sem is None:
+        limit = config.TOOL_CONCURRENCY.get(tool_name, config.DEFAULT_TOOL_CONCURRENCY)
+        sem = _semaphores[tool_name] = asyncio.Semaphore(limit)
+    return sem
+
+
+def _get_executor(tool_name: str):
+    start()
+    name = config.TOOL_EXECUTORS.get(tool_name, "thread")
+    if name in config.PROCESS_POOLS:
+        return _get_process_pool(name)
+    return _thread_pool
+
+
+async def run_tool(tool_name: str, func, *args, **kwargs):
+    """
+    Run a blocking converter function for tool_name in its worker pool.
+    At most TOOL_CONCURRENCY[tool_name] calls run at once; the rest wait here
+    without blocking the event loop.
+    """
+    labels = {"tool": tool_name}
+    metrics.gauge_add("dtit_jobs_queued", labels, 1)
+    queued = True
+
+    try:
+        async with _get_semaphore(tool_name):
+            metrics.gauge_add("dtit_jobs_queued", labels, -1)
+            metrics.gauge_add("dtit_jobs_in_flight", labels, 1)
+            queued = False
+
+            try:
+                jobs.mark_running()
+                executor = _get_executor(tool_name)
+                loop = asyncio.get_running_loop()
+                start_time = time.perf_counter()
+
+                try:
+                    # Worker-side instrumentation is buffered and replayed here
+                    result, events = await loop.run_in_executor(
+                        executor, partial(metrics.collect, func, *args, **kwargs)
+                    )
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory). Replace the pool so the
+                    # next request gets a fresh one instead of failing forever.
+                    for name, pool in list(_process_pools.items()):
+                        if pool is executor:
+                            del _process_pools[name]
+                    raise RuntimeError("Worker process crashed during conversion")
+                finally:
+                    metrics.observe_stage(tool_name, "convert", time.perf_counter() - start_time)
+
+                metrics.replay(events)
+                return result
+
+            finally:
+                metrics.gauge_add("dtit_jobs_in_flight", labels, -1)
+    finally:
+        if queued:
+            metrics.gauge_add("dtit_jobs_queued", labels, -1)
@@ -1,9 +1,20 @@
 
 # utils/file_utils.py
 
+import re
+import uuid
 from pathlib import Path
 
+# Characters kept in user-supplied names; everything else becomes "_"
+_UNSAFE_CHARS = re.compile(r"[^\w\-. ()\[\]]+", re.UNICODE)
+
+
 def get_unique_filename(directory: Path, base_name: str, extension: str) -> str:
+    """
+    Legacy counter naming: name.ext, name(1).ext, name(2).ext, ...
+    One exists() call per taken name and racy between concurrent requests;
+    kept for reference and for benchmarks/bench_naming.py.
+    """
    
     directory.mkdir(parents=True, exist_ok=True)
 
@@ -15,3 +26,29 @@ def get_unique_filename(directory: Path, base_name: str, extension: str) -> str:
         counter += 1
 
     return filename
+
+
+def safe_filename(name: str, default: str = "file") -> str:
+    """
+    Strip directories and odd characters from a client-supplied file name.
+    """
+    name = Path(name.replace("\\", "/")).name
+    name = _UNSAFE_CHARS.sub("_", name).strip(" .")
+    return name[:150] or default
+
+
+def create_request_dir(directory: Path) -> Path:
+    """
+    Create a fresh, empty sub-directory for one request. mkdir is atomic, so
+    two requests can never get the same directory, and it costs O(1)
+    however many files already exist.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+
+    while True:
+        request_dir = directory / uuid.uuid4().hex[:16]
+        try:
+            request_dir.mkdir()
+            return request_dir
+        except FileExistsError:
+            continue
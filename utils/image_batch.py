@@ -0,0 +1,196 @@
+
+# utils/image_batch.py
+
+import asyncio
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+
+import config
+from utils import metrics
+from utils.executor import run_tool
+from utils.segmentation import masks_for, open_image
+from utils.storage_manager import build_output_path, build_download_url, remove_file
+
+
+# Multi-image background removal shared by bg_remove and bg_white_adder.
+#
+# The batch is split into chunks of BATCH_CHUNK_SIZE images; each chunk is one
+# run_tool() call, so chunks spread over the process pool. Inside a chunk the
+# images are decoded and encoded on BATCH_IO_THREADS threads and segmented in
+# batches through the shared model session (utils.segmentation). A bad image
+# only fails its own item.
+
+
+def process_chunk(tool_name: str, items, model: str, compose, save_format: str, low_res: bool = None) -> list:
+    """
+    Worker side. items are (input_path, output_path, sha256) tuples;
+    compose(image, mask) returns the image to save. Returns one error
+    message (or None) per item.
+    """
+    errors = [None] * len(items)
+
+    with ThreadPoolExecutor(max_workers=config.BATCH_IO_THREADS) as pool:
+        decoded = list(pool.map(_safe_call(open_image), [item[0] for item in items]))
+
+        images = []
+        for i, result in enumerate(decoded):
+            if isinstance(result, Exception):
+                errors[i] = f"Could not read image: {result}"
+            else:
+                images.append((i, result))
+
+        if not images:
+            return errors
+
+        try:
+            with metrics.stage(tool_name, "inference"):
+                masks = masks_for(
+                    [items[i][0] for i, _ in images],
+                    [image for _, image in images],
+                    [items[i][2] for i, _ in images],
+                    model, low_res, pool.map,
+                )
+        except Exception as e:
+            for i, _ in images:
+                errors[i] = f"Segmentation failed: {e}"
+            return errors
+
+        def save(job):
+            (i, image), mask = job
+            compose(image, mask).save(items[i][1], save_format)
+
+        with metrics.stage(tool_name, "write"):
+            saved = list(pool.map(_safe_call(save), zip(images, masks)))
+
+    for ((i, _), result) in zip(images, saved):
+        if isinstance(result, Exception):
+            errors[i] = f"Could not save image: {result}"
+
+    metrics.count(tool_name, "images", sum(1 for e in errors if e is None))
+    return errors
+
+
+def _safe_call(func):
+    def call(arg):
+        try:
+            return func(arg)
+        except Exception as e:
+            return e
+    return call
+
+
+def _unique_name(name: str, seen: set) -> str:
+    stem, suffix = Path(name).stem, Path(name).suffix
+    candidate, n = name, 1
+    while candidate in seen:
+        candidate = f"{stem}_{n}{suffix}"
+        n += 1
+    seen.add(candidate)
+    return candidate
+
+
+async def run_batch(
+    tool_name: str,
+    uploads: list,
+    names: list,
+    compose,
+    save_format: str,
+    extension: str,
+    model: str,
+    output_mode: str = "zip",
+    rejected: list = None,
+    low_res: bool = None,
+):
+    """
+    Route side. uploads are the saved StoredUploads and names their original
+    file names; rejected lists (name, reason) for files refused before saving.
+
+    output_mode "zip": one ZIP (stored, images are already compressed) that
+    is filled as chunks finish. "links": one download link per image.
+    """
+    total = len(uploads) + len(rejected or [])
+    work_dir = Path(tempfile.mkdtemp(prefix="dtit_batch_")) if output_mode == "zip" else None
+
+    items = []
+    for index, (upload, name) in enumerate(zip(uploads, names)):
+        if work_dir is not None:
+            output_path = work_dir / f"{index:05d}{extension}"
+        else:
+            output_path = build_output_path(Path(name).stem, extension, tool_name)
+        items.append((str(upload.path), str(output_path), upload.sha256))
+
+    item_results = [None] * len(items)
+    chunk_size = max(1, config.BATCH_CHUNK_SIZE)
+
+    async def run_chunk(start):
+        chunk = items[start:start + chunk_size]
+        try:
+            errors = await run_tool(tool_name, process_chunk, tool_name, chunk, model, compose, save_format, low_res)
+        except Exception as e:
+            errors = [str(e)] * len(chunk)
+        return start, errors
+
+    zip_path = build_output_path(f"{tool_name}_batch", ".zip", tool_name) if work_dir is not None else None
+    archive = zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) if zip_path is not None else None
+    arc_names = set()
+    tasks = [asyncio.create_task(run_chunk(start)) for start in range(0, len(items), chunk_size)]
+
+    try:
+        for finished in asyncio.as_completed(tasks):
+            start, errors = await finished
+
+            for offset, error in enumerate(errors):
+                index = start + offset
+                name = names[index]
+                output_path = Path(items[index][1])
+
+                if error is not None:
+                    item_results[index] = {"file": name, "status": "error", "message": error}
+                    remove_file(output_path)
+                    continue
+
+                if archive is not None:
+                    arc_name = _unique_name(f"{Path(name).stem}{extension}", arc_names)
+                    await asyncio.to_thread(archive.write, output_path, arc_name)
+                    output_path.unlink(missing_ok=True)
+                    item_results[index] = {"file": name, "status": "success", "archive_name": arc_name}
+                else:
+                    item_results[index] = {"file": name, "status": "success", "download_link": build_download_url(output_path)}
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        if archive is not None:
+            archive.close()
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = item_results + [
+        {"file": name, "status": "error", "message": reason} for name, reason in (rejected or [])
+    ]
+    processed = sum(1 for r in results if r["status"] == "success")
+
+    if processed == 0:
+        if zip_path is not None:
+            zip_path.unlink(missing_ok=True)
+        return JSONResponse(
+            status_code=422,
+            content={"status": "error", "message": "No image could be processed", "items": results}
+        )
+
+    payload = {
+        "status": "success",
+        "message": f"{processed} of {total} images processed",
+        "processed": processed,
+        "failed": total - processed,
+        "items": results,
+    }
+    if zip_path is not None:
+        payload["download_link"] = build_download_url(zip_path)
+
+    return payload
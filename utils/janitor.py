@@ -0,0 +1,224 @@
+
+# utils/janitor.py
+
+import asyncio
+import os
+import secrets
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.staticfiles import StaticFiles
+
+import config
+from utils import jobs
+from utils.storage_manager import remove_file, touch_access
+
+
+# Retention for storage/uploads and storage/outputs:
+# - uploads are deleted as soon as their job finishes (see jobs.dispatch);
+#   the sweep only catches leftovers from crashed requests
+# - outputs expire after their tool's TTL, counted from the last download
+# - above STORAGE_MAX_BYTES the least recently downloaded outputs go first
+#
+# "Last download" is kept in each file's atime (set explicitly, so it works
+# on noatime mounts and is shared by every API worker). Files being served
+# right now, or touched within STORAGE_IN_USE_GRACE_SECONDS, are never
+# deleted, and neither are the uploads of this worker's queued or running
+# jobs. Request folders left empty are removed as well.
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"]
+)
+
+_serving = Counter()
+_task = None
+
+
+def _last_access(stat) -> float:
+    return max(stat.st_atime, stat.st_mtime)
+
+
+class TrackedStaticFiles(StaticFiles):
+    """
+    StaticFiles for /downloads that records access times and marks files as
+    in use while their response is streaming.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await super().__call__(scope, receive, send)
+
+        file_path = str(Path(self.directory) / self.get_path(scope))
+        _serving[file_path] += 1
+        touch_access(file_path)
+
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _serving[file_path] -= 1
+            if _serving[file_path] <= 0:
+                del _serving[file_path]
+
+
+def _is_protected(file_path: str, stat, now: float) -> bool:
+    return file_path in _serving or now - _last_access(stat) < config.STORAGE_IN_USE_GRACE_SECONDS
+
+
+def _scan(root: Path):
+    """
+    Yield (tool_name, file_path, stat) for every file under root/<tool>/.
+    """
+    if not root.exists():
+        return
+
+    for tool_dir in root.iterdir():
+        if not tool_dir.is_dir():
+            continue
+        for dir_path, _, file_names in os.walk(tool_dir):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    yield tool_dir.name, file_path, os.stat(file_path)
+                except OSError:
+                    continue
+
+
+def _prune_empty_dirs(root: Path, in_use, now: float) -> int:
+    """
+    Remove the empty request folders under root/<tool>/. Folders created
+    within STORAGE_IN_USE_GRACE_SECONDS, or held by a running job, are kept:
+    their conversion may not have written its output yet.
+    """
+    if not root.exists():
+        return 0
+
+    removed = 0
+    for tool_dir in root.iterdir():
+        if not tool_dir.is_dir():
+            continue
+        for request_dir in tool_dir.iterdir():
+            try:
+                if str(request_dir) in in_use or now - request_dir.stat().st_mtime < config.STORAGE_IN_USE_GRACE_SECONDS:
+                    continue
+                # Fails on folders that are not empty
+                request_dir.rmdir()
+                removed += 1
+            except OSError:
+                continue
+
+    return removed
+
+
+def sweep(in_use=frozenset()) -> dict:
+    """
+    One retention pass. in_use holds paths the sweep must not delete
+    (jobs.paths_in_use()). Returns counts of what was deleted.
+    """
+    now = time.time()
+    removed = {"uploads": 0, "expired_outputs": 0, "evicted_outputs": 0, "empty_folders": 0, "freed_bytes": 0}
+    total_bytes = 0
+
+    for _, file_path, stat in _scan(config.UPLOAD_ROOT):
+        if now - stat.st_mtime > config.UPLOAD_TTL_SECONDS and file_path not in in_use:
+            remove_file(file_path)
+            removed["uploads"] += 1
+            removed["freed_bytes"] += stat.st_size
+        else:
+            total_bytes += stat.st_size
+
+    outputs = []
+    for tool_name, file_path, stat in _scan(config.OUTPUT_ROOT):
+        ttl = config.OUTPUT_TTL_SECONDS.get(tool_name, config.DEFAULT_OUTPUT_TTL_SECONDS)
+
+        if now - _last_access(stat) > ttl and not _is_protected(file_path, stat, now):
+            remove_file(file_path)
+            removed["expired_outputs"] += 1
+            removed["freed_bytes"] += stat.st_size
+        else:
+            total_bytes += stat.st_size
+            outputs.append((_last_access(stat), file_path, stat))
+
+    if total_bytes > config.STORAGE_MAX_BYTES:
+        # Least recently downloaded first
+        outputs.sort(key=lambda item: item[0])
+        for _, file_path, stat in outputs:
+            if total_bytes <= config.STORAGE_MAX_BYTES:
+                break
+            if _is_protected(file_path, stat, now):
+                continue
+            remove_file(file_path)
+            total_bytes -= stat.st_size
+            removed["evicted_outputs"] += 1
+            removed["freed_bytes"] += stat.st_size
+
+    for root in (config.UPLOAD_ROOT, config.OUTPUT_ROOT):
+        removed["empty_folders"] += _prune_empty_dirs(root, in_use, now)
+
+    return removed
+
+
+def usage() -> dict:
+    tools = {}
+
+    for kind, root in (("uploads", config.UPLOAD_ROOT), ("outputs", config.OUTPUT_ROOT)):
+        for tool_name, _, stat in _scan(root):
+            tool = tools.setdefault(tool_name, {
+                "uploads_files": 0, "uploads_bytes": 0,
+                "outputs_files": 0, "outputs_bytes": 0,
+            })
+            tool[f"{kind}_files"] += 1
+            tool[f"{kind}_bytes"] += stat.st_size
+
+    total_bytes = sum(t["uploads_bytes"] + t["outputs_bytes"] for t in tools.values())
+
+    return {
+        "total_bytes": total_bytes,
+        "budget_bytes": config.STORAGE_MAX_BYTES,
+        "files_being_served": len(_serving),
+        "tools": dict(sorted(tools.items())),
+    }
+
+
+async def _janitor_loop():
+    while True:
+        try:
+            await asyncio.to_thread(sweep, jobs.paths_in_use())
+        except Exception:
+            pass
+        await asyncio.sleep(config.STORAGE_JANITOR_INTERVAL)
+
+
+def start():
+    """
+    Start the background sweep (called on app startup).
+    """
+    global _task
+    if _task is None and config.STORAGE_JANITOR_INTERVAL > 0:
+        _task = asyncio.get_running_loop().create_task(_janitor_loop())
+
+
+def shutdown():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+def _check_admin(token: Optional[str]):
+    # /admin routes stay disabled until a token is configured
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(token or "", config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# API Routes
+
+@router.get("/storage")
+async def storage_usage(x_admin_token: Optional[str] = Header(None)):
+    _check_admin(x_admin_token)
+    return await asyncio.to_thread(usage)
@@ -0,0 +1,236 @@
+
+# utils/jobs.py
+
+import asyncio
+import os
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+import config
+from utils import metrics, result_cache
+from utils.storage_manager import (
+    StoredUpload, claim_output_dirs, discard_unused_dirs, payload_output_files, remove_file,
+)
+from utils.responses import unwrap_result
+
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"]
+)
+
+# In-memory job table. Jobs live in the worker that accepted them, so run the
+# API behind a sticky proxy (or with one uvicorn worker) when using async mode.
+_jobs = {}
+_current_job = ContextVar("current_job", default=None)
+
+# Uploads and output folders of conversions still queued or running in this
+# worker; the storage janitor leaves them alone
+_in_use = Counter()
+
+
+class Job:
+    def __init__(self, tool_name: str):
+        self.id = uuid.uuid4().hex
+        self.tool = tool_name
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.task = None
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "tool": self.tool,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": None,
+            "run_seconds": None,
+        }
+
+        if self.started_at is not None:
+            data["queue_seconds"] = round(self.started_at - self.created_at, 3)
+            if self.finished_at is not None:
+                data["run_seconds"] = round(self.finished_at - self.started_at, 3)
+
+        if self.status == "done":
+            data["result"] = self.result
+            if isinstance(self.result, dict) and "download_link" in self.result:
+                data["download_link"] = self.result["download_link"]
+        elif self.status == "failed":
+            data["error"] = self.error
+
+        return data
+
+
+def mark_running():
+    """
+    Called once the current job gets a worker slot (see utils.executor).
+    """
+    job = _current_job.get()
+    if job is not None and job.status == "queued":
+        job.status = "running"
+        job.started_at = time.time()
+
+
+async def _run_job(job: Job, work):
+    _current_job.set(job)
+
+    try:
+        result = await work()
+        payload, error = unwrap_result(result)
+    except HTTPException as e:
+        payload, error = None, str(e.detail)
+    except Exception as e:
+        payload, error = None, str(e)
+
+    if job.started_at is None:
+        job.started_at = time.time()
+    job.finished_at = time.time()
+
+    if error is None:
+        job.status = "done"
+        job.result = payload
+    else:
+        job.status = "failed"
+        job.error = error
+
+    job.task = None
+
+
+async def _measured(tool_name: str, work):
+    """
+    Run work() and record its outcome and output sizes in utils.metrics.
+    Only wraps conversions that actually run: cache hits and coalesced
+    requests are counted by result_cache instead.
+    """
+    try:
+        result = await work()
+    except asyncio.CancelledError:
+        raise
+    except BaseException:
+        metrics.record_conversion(tool_name, False)
+        raise
+
+    payload, error = unwrap_result(result)
+    metrics.record_conversion(tool_name, error is None)
+
+    for file_path in payload_output_files(payload):
+        try:
+            metrics.observe_bytes(tool_name, "output", os.path.getsize(file_path))
+        except OSError:
+            pass
+
+    return result
+
+
+def paths_in_use() -> frozenset:
+    """
+    Upload files and output request folders that a queued or running
+    conversion of this worker still needs.
+    """
+    return frozenset(_in_use)
+
+
+def _release(paths):
+    for path in paths:
+        _in_use[path] -= 1
+        if _in_use[path] <= 0:
+            del _in_use[path]
+
+
+def _prune_jobs():
+    cutoff = time.time() - config.JOB_RETENTION_SECONDS
+    for job_id, job in list(_jobs.items()):
+        if job.finished_at is not None and job.finished_at < cutoff:
+            del _jobs[job_id]
+
+
+async def dispatch(tool_name: str, work, async_mode: bool = False, inputs=None, params: dict = None):
+    """
+    Run a tool's conversion. work is a zero-argument coroutine function that
+    returns the tool's normal response.
+
+    async_mode=False: run it now and return its response (the classic API).
+    async_mode=True:  start it in the background and return a job id at once;
+                      the result is fetched from GET /jobs/{job_id}.
+
+    When inputs (uploaded files, bytes or text) are given, the result is
+    cached by content + params and repeated requests skip the conversion.
+    Uploaded files are deleted as soon as the conversion finishes, and so
+    are output folders the route prepared but the result does not use.
+    """
+    tool_work = work
+    output_dirs = claim_output_dirs()
+    held = [str(item.path) for item in inputs or [] if isinstance(item, StoredUpload)]
+    held += [str(request_dir) for request_dir in output_dirs]
+
+    async def converted():
+        if inputs is None:
+            return await _measured(tool_name, tool_work)
+
+        try:
+            return await result_cache.cached(
+                tool_name, lambda: _measured(tool_name, tool_work), inputs, params
+            )
+        finally:
+            for item in inputs:
+                if isinstance(item, StoredUpload):
+                    remove_file(item.path)
+
+    async def work():
+        payload = None
+        try:
+            result = await converted()
+            payload, _ = unwrap_result(result)
+            return result
+        finally:
+            if output_dirs:
+                await asyncio.to_thread(discard_unused_dirs, output_dirs, payload)
+            _release(held)
+
+    if not async_mode:
+        _in_use.update(held)
+        return await work()
+
+    _prune_jobs()
+
+    active = sum(1 for job in _jobs.values() if job.status in ("queued", "running"))
+    if active >= config.JOB_MAX_ACTIVE:
+        raise HTTPException(status_code=503, detail="Too many jobs in progress, try again later")
+
+    job = Job(tool_name)
+    _jobs[job.id] = job
+    _in_use.update(held)
+    job.task = asyncio.create_task(_run_job(job, work))
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "queued",
+            "job_id": job.id,
+            "status_url": f"{config.BASE_DOMAIN}/jobs/{job.id}",
+        }
+    )
+
+
+# API Routes
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    job = _jobs.get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job.to_dict()
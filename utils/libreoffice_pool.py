@@ -0,0 +1,364 @@
+
+# utils/libreoffice_pool.py
+
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import config
+
+
+logger = logging.getLogger(__name__)
+
+# Long-lived headless LibreOffice instances shared by word/excel/pptx -> PDF.
+# Each instance has its own user profile and UNO pipe, so concurrent
+# conversions never share state. When the "uno" module (LibreOffice's Python
+# bridge) is not importable we fall back to one cold soffice run per file.
+
+PDF_FILTERS = {
+    "com.sun.star.text.GenericTextDocument": "writer_pdf_Export",
+    "com.sun.star.sheet.SpreadsheetDocument": "calc_pdf_Export",
+    "com.sun.star.presentation.PresentationDocument": "impress_pdf_Export",
+    "com.sun.star.drawing.DrawingDocument": "draw_pdf_Export",
+}
+
+# UNO exceptions meaning the bridge to the instance is gone
+_CONNECTION_ERRORS = {"DisposedException", "NoConnectException", "ConnectionSetupException"}
+
+
+class InstanceUnavailable(RuntimeError):
+    """
+    No working pooled instance: it failed to start or its UNO connection
+    broke. The only error convert_to_pdf retries with a cold soffice run.
+    """
+
+
+def _load_uno():
+    try:
+        import uno
+        return uno
+    except ImportError:
+        return None
+
+
+def _prop(uno, name, value):
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+class _Instance:
+    def __init__(self, index: int):
+        self.index = index
+        self.pipe_name = f"dtit_lo_{os.getpid()}_{index}"
+        self.profile_dir = config.LIBREOFFICE_PROFILE_ROOT / f"{os.getpid()}_{index}"
+        self.process = None
+        self.desktop = None
+        self.conversions = 0
+
+    def start(self):
+        uno = _load_uno()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+        cmd = [
+            config.SOFFICE_BINARY,
+            "--headless",
+            "--invisible",
+            "--nologo",
+            "--nodefault",
+            "--norestore",
+            "--nolockcheck",
+            f"-env:UserInstallation={self.profile_dir.resolve().as_uri()}",
+            f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+        ]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.conversions = 0
+
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx
+        )
+        url = f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+
+        deadline = time.monotonic() + config.LIBREOFFICE_STARTUP_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                self.desktop = ctx.ServiceManager.createInstanceWithContext(
+                    "com.sun.star.frame.Desktop", ctx
+                )
+                return
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise InstanceUnavailable(f"LibreOffice instance {self.index} failed to start")
+                time.sleep(0.25)
+
+    def is_alive(self) -> bool:
+        if self.process is None or self.process.poll() is not None or self.desktop is None:
+            return False
+        try:
+            # Cheap round trip over the bridge
+            self.desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+    def stop(self):
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            self.desktop = None
+
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def convert(self, input_path: Path, output_path: Path):
+        uno = _load_uno()
+
+        # Kill the instance if a document hangs; the UNO call then fails
+        # and the pool restarts it.
+        timed_out = threading.Event()
+
+        def on_timeout():
+            timed_out.set()
+            self.kill()
+
+        watchdog = threading.Timer(config.LIBREOFFICE_CONVERT_TIMEOUT, on_timeout)
+        watchdog.start()
+
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                Path(input_path).resolve().as_uri(),
+                "_blank",
+                0,
+                (_prop(uno, "Hidden", True), _prop(uno, "ReadOnly", True)),
+            )
+            if doc is None:
+                raise RuntimeError("LibreOffice could not open the document")
+
+            try:
+                filter_name = next(
+                    (name for service, name in PDF_FILTERS.items() if doc.supportsService(service)),
+                    "writer_pdf_Export",
+                )
+                doc.storeToURL(
+                    Path(output_path).resolve().as_uri(),
+                    (_prop(uno, "FilterName", filter_name),),
+                )
+            finally:
+                doc.close(True)
+        except Exception as e:
+            if timed_out.is_set():
+                raise RuntimeError("Conversion timeout - file too large") from e
+            if type(e).__name__ in _CONNECTION_ERRORS:
+                raise InstanceUnavailable(f"Lost connection to LibreOffice instance {self.index}") from e
+            raise
+        finally:
+            watchdog.cancel()
+
+        self.conversions += 1
+
+
+class LibreOfficePool:
+    def __init__(self, size: int):
+        self.size = size
+        self._instances = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopping = threading.Event()
+
+    def start(self):
+        """
+        Boot all instances. Instances that fail to start are retried by the
+        health checker.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        for index in range(self.size):
+            instance = _Instance(index)
+            try:
+                instance.start()
+            except Exception:
+                logger.exception("LibreOffice instance %d failed to start", index)
+            self._instances.append(instance)
+            self._idle.put(instance)
+
+        threading.Thread(target=self._health_loop, name="lo-health", daemon=True).start()
+
+    def _health_loop(self):
+        while not self._stopping.wait(config.LIBREOFFICE_HEALTH_CHECK_INTERVAL):
+            # Only look at idle instances; busy ones are checked on release
+            for _ in range(self._idle.qsize()):
+                try:
+                    instance = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    if not instance.is_alive():
+                        instance.restart()
+                except Exception:
+                    logger.exception("LibreOffice instance %d failed to restart", instance.index)
+                finally:
+                    self._idle.put(instance)
+
+    def convert(self, input_path: Path, output_path: Path):
+        self.start()
+
+        try:
+            instance = self._idle.get(timeout=config.LIBREOFFICE_CONVERT_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("No LibreOffice instance became free in time")
+
+        restarted = False
+        try:
+            if not instance.is_alive():
+                restarted = True
+                instance.restart()
+
+            instance.convert(input_path, output_path)
+
+        except Exception:
+            # At most one restart per request: when the one above already
+            # failed, another would only add a start-up timeout before the
+            # caller falls back (the health checker keeps retrying)
+            if not restarted:
+                self._restart(instance)
+            raise
+
+        else:
+            # Recycle long-running instances to contain memory growth
+            if instance.conversions >= config.LIBREOFFICE_MAX_CONVERSIONS:
+                self._restart(instance)
+
+        finally:
+            self._idle.put(instance)
+
+    def _restart(self, instance: _Instance):
+        try:
+            instance.restart()
+        except Exception:
+            logger.exception("LibreOffice instance %d failed to restart", instance.index)
+
+    def shutdown(self):
+        self._stopping.set()
+        for instance in self._instances:
+            instance.stop()
+            shutil.rmtree(instance.profile_dir, ignore_errors=True)
+        self._instances = []
+
+
+_pool = None
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = LibreOfficePool(config.LIBREOFFICE_POOL_SIZE)
+    return _pool
+
+
+def is_available() -> bool:
+    return (
+        config.LIBREOFFICE_POOL_SIZE > 0
+        and _load_uno() is not None
+        and Path(config.SOFFICE_BINARY).exists()
+    )
+
+
+def start():
+    """
+    Warm up the pool in the background (called on app startup).
+    """
+    if is_available():
+        threading.Thread(target=get_pool().start, name="lo-start", daemon=True).start()
+
+
+def shutdown():
+    if _pool is not None:
+        _pool.shutdown()
+
+
+def convert_with_soffice_cli(input_path: Path, output_path: Path, timeout: int = None):
+    """
+    Cold-start fallback: one soffice process per file, with a throwaway
+    profile and output folder so parallel runs cannot collide.
+    """
+    timeout = timeout or config.LIBREOFFICE_CONVERT_TIMEOUT
+
+    if not shutil.which(config.SOFFICE_BINARY) and not Path(config.SOFFICE_BINARY).exists():
+        raise RuntimeError(
+            "LibreOffice (soffice) not found. Install LibreOffice and ensure it's added to PATH."
+        )
+
+    with tempfile.TemporaryDirectory(prefix="dtit_lo_") as work_dir:
+        work_dir = Path(work_dir)
+        cmd = [
+            config.SOFFICE_BINARY,
+            "--headless",
+            "--norestore",
+            "--nolockcheck",
+            "--invisible",
+            f"-env:UserInstallation={(work_dir / 'profile').as_uri()}",
+            "--convert-to", "pdf",
+            "--outdir", str(work_dir),
+            str(Path(input_path).resolve()),
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("Conversion timeout - file too large")
+
+        produced = work_dir / f"{Path(input_path).stem}.pdf"
+        if result.returncode != 0 or not produced.exists():
+            raise RuntimeError(f"LibreOffice conversion failed: {result.stderr.decode(errors='ignore')}")
+
+        shutil.move(str(produced), str(output_path))
+
+    return Path(output_path)
+
+
+def convert_to_pdf(input_path: Path, output_path: Path) -> Path:
+    """
+    Convert an office document to PDF, using a warm pooled instance when
+    possible and a cold soffice run otherwise. A timeout or a document the
+    pool fails on is an error, not a reason to convert it all over again.
+    """
+    if is_available():
+        try:
+            get_pool().convert(input_path, output_path)
+        except InstanceUnavailable:
+            logger.exception("LibreOffice pool unavailable, converting %s with soffice", input_path)
+        else:
+            if not Path(output_path).exists():
+                raise RuntimeError("LibreOffice conversion failed: no PDF was written")
+            return Path(output_path)
+
+    return convert_with_soffice_cli(input_path, output_path)
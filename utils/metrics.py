@@ -0,0 +1,287 @@
+
+# utils/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+import config
+
+
+# Prometheus metrics in the text exposition format, kept in process memory.
+# Each uvicorn worker has its own numbers, so scrape every worker (or run one).
+#
+# Converters call the instrumentation API (stage, count, observe_bytes) from
+# inside their worker functions. Those run in the thread/process pools, so
+# run_tool() executes them through collect(): events are buffered in the
+# worker and replayed into the registry of the API process with replay().
+
+router = APIRouter(tags=["Metrics"])
+
+_lock = threading.Lock()
+_local = threading.local()
+
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+HELP = {
+    "dtit_http_requests_total": ("counter", "HTTP requests per tool, method and status code"),
+    "dtit_http_request_duration_seconds": ("histogram", "Total HTTP request time per tool"),
+    "dtit_conversions_total": ("counter", "Finished conversions per tool and outcome (success/failure)"),
+    "dtit_cache_hits_total": ("counter", "Requests answered without converting, per tool and kind (hit/coalesced)"),
+    "dtit_stage_duration_seconds": ("histogram", "Time spent per tool and stage (upload, convert, write, ...)"),
+    "dtit_input_bytes": ("histogram", "Size of uploaded inputs per tool"),
+    "dtit_output_bytes": ("histogram", "Size of produced outputs per tool"),
+    "dtit_items_processed_total": ("counter", "Pages, images, ... processed per tool"),
+    "dtit_jobs_in_flight": ("gauge", "Conversions running in a worker right now"),
+    "dtit_jobs_queued": ("gauge", "Conversions waiting for a worker slot"),
+}
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _buckets_for(name: str):
+    if name.endswith("_bytes"):
+        return config.METRICS_SIZE_BUCKETS
+    return config.METRICS_LATENCY_BUCKETS
+
+
+# Registry (API process)
+
+def _inc(name: str, labels: dict, value: float = 1):
+    with _lock:
+        series = _counters.setdefault(name, {})
+        key = _key(labels)
+        series[key] = series.get(key, 0) + value
+
+
+def _observe(name: str, labels: dict, value: float):
+    buckets = _buckets_for(name)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        key = _key(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+        index = bisect_left(buckets, value)
+        if index < len(buckets):
+            hist["buckets"][index] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+
+def gauge_add(name: str, labels: dict, delta: float):
+    with _lock:
+        series = _gauges.setdefault(name, {})
+        key = _key(labels)
+        series[key] = series.get(key, 0) + delta
+
+
+def replay(events):
+    """
+    Apply events recorded in a worker (see collect).
+    """
+    for kind, name, labels, value in events:
+        if kind == "inc":
+            _inc(name, labels, value)
+        else:
+            _observe(name, labels, value)
+
+
+def collect(func, *args, **kwargs):
+    """
+    Run func in a worker with a local event buffer. Returns (result, events).
+    Top-level so it can be pickled for the process pool.
+    """
+    _local.events = []
+    try:
+        return func(*args, **kwargs), _local.events
+    finally:
+        _local.events = None
+
+
+def propagate(func):
+    """
+    Wrap func so that, run on another thread (e.g. a ThreadPoolExecutor
+    inside a pool worker), it records into the calling thread's buffer.
+    """
+    events = getattr(_local, "events", None)
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, "events", None)
+        _local.events = events
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.events = previous
+
+    return run
+
+
+def _record(kind: str, name: str, labels: dict, value: float):
+    if not config.METRICS_ENABLED:
+        return
+
+    events = getattr(_local, "events", None)
+    if events is not None:
+        events.append((kind, name, labels, value))
+    elif kind == "inc":
+        _inc(name, labels, value)
+    else:
+        _observe(name, labels, value)
+
+
+# Instrumentation API (safe to call anywhere: API process or pool worker)
+
+def observe_stage(tool_name: str, stage: str, seconds: float):
+    _record("observe", "dtit_stage_duration_seconds", {"tool": tool_name, "stage": stage}, seconds)
+
+
+@contextmanager
+def stage(tool_name: str, stage_name: str):
+    """
+    with metrics.stage(TOOL_NAME, "write"):
+        doc.save(output_path)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(tool_name, stage_name, time.perf_counter() - start)
+
+
+def count(tool_name: str, kind: str, n: int = 1):
+    """
+    Count processed items, e.g. count(TOOL_NAME, "pages", len(doc)).
+    """
+    if n:
+        _record("inc", "dtit_items_processed_total", {"tool": tool_name, "kind": kind}, n)
+
+
+def observe_bytes(tool_name: str, direction: str, size: int):
+    """
+    direction is "input" or "output".
+    """
+    _record("observe", f"dtit_{direction}_bytes", {"tool": tool_name}, size)
+
+
+def record_conversion(tool_name: str, success: bool):
+    _record(
+        "inc", "dtit_conversions_total",
+        {"tool": tool_name, "outcome": "success" if success else "failure"}, 1
+    )
+
+
+def record_cache_hit(tool_name: str, kind: str):
+    """
+    kind is "hit" (stored result) or "coalesced" (shared an identical
+    conversion that was already running). Not counted as a conversion.
+    """
+    _record("inc", "dtit_cache_hits_total", {"tool": tool_name, "kind": kind}, 1)
+
+
+# HTTP middleware
+
+class MetricsMiddleware:
+    """
+    Count requests and time them per tool. tools maps a route prefix
+    (e.g. "/pdf-compress") to its tool name; other paths are not recorded.
+    """
+
+    def __init__(self, app, tools: dict):
+        self.app = app
+        self.tools = sorted(tools.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _tool_for(self, path: str):
+        for prefix, tool_name in self.tools:
+            if path == prefix or path.startswith(prefix + "/"):
+                return tool_name
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        tool_name = self._tool_for(scope["path"])
+        if tool_name is None:
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def tracked_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, tracked_send)
+        finally:
+            labels = {"tool": tool_name, "method": scope["method"], "status": str(status_code)}
+            _inc("dtit_http_requests_total", labels)
+            _observe("dtit_http_request_duration_seconds", {"tool": tool_name}, time.perf_counter() - start)
+
+
+# Exposition
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: dict = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in items) + "}"
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render() -> str:
+    lines = []
+
+    with _lock:
+        for name in sorted(set(_counters) | set(_gauges) | set(_histograms)):
+            kind, help_text = HELP.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for key, value in sorted(_counters.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+
+            for key, value in sorted(_gauges.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+
+            buckets = _buckets_for(name)
+            for key, hist in sorted(_histograms.get(name, {}).items()):
+                cumulative = 0
+                for bound, hits in zip(buckets, hist["buckets"]):
+                    cumulative += hits
+                    le = {"le": _format_number(bound)}
+                    lines.append(f"{name}_bucket{_format_labels(key, le)} {cumulative}")
+                lines.append(f'{name}_bucket{_format_labels(key, {"le": "+Inf"})} {hist["count"]}')
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_number(hist['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+# API Routes
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
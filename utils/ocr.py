@@ -0,0 +1,81 @@
+
+# utils/ocr.py
+
+import threading
+
+import config
+
+
+# EasyOCR readers, one per language set per process. Building a reader loads
+# the detection and recognition torch models, so it happens once (on first
+# OCR, or in the "tables" pool warm-up via preload) and the reader is reused.
+#
+# Models are read from OCR_MODEL_DIR only; with OCR_ALLOW_DOWNLOAD off a
+# missing model is an error instead of a download in the middle of a request.
+# Fetch them beforehand with python -m scripts.provision_ocr.
+
+_readers = {}
+_lock = threading.Lock()
+
+
+def parse_languages(value: str = None) -> tuple:
+    """
+    Language set for a comma-separated request value ("en,fr"), defaulting
+    to OCR_DEFAULT_LANGUAGES. Raises ValueError for malformed codes.
+    """
+    languages = [code.strip() for code in (value or "").split(",") if code.strip()]
+    if not languages:
+        languages = list(config.OCR_DEFAULT_LANGUAGES)
+
+    for code in languages:
+        if not code.replace("_", "").isalnum():
+            raise ValueError(f"Invalid language code '{code}'")
+
+    # Order does not change the result, so "fr,en" shares the "en,fr" reader
+    return tuple(sorted(set(languages)))
+
+
+def get_reader(languages=None):
+    """
+    The shared easyocr.Reader for languages (a tuple from parse_languages).
+    """
+    key = tuple(sorted(set(languages or config.OCR_DEFAULT_LANGUAGES)))
+
+    reader = _readers.get(key)
+    if reader is not None:
+        return reader
+
+    with _lock:
+        reader = _readers.get(key)
+        if reader is None:
+            import easyocr
+
+            config.OCR_MODEL_DIR.mkdir(parents=True, exist_ok=True)
+            try:
+                reader = easyocr.Reader(
+                    list(key),
+                    gpu=False,
+                    model_storage_directory=str(config.OCR_MODEL_DIR),
+                    download_enabled=config.OCR_ALLOW_DOWNLOAD,
+                    verbose=False,
+                )
+            except FileNotFoundError as e:
+                raise RuntimeError(
+                    f"OCR models for {', '.join(key)} are not installed "
+                    f"(python -m scripts.provision_ocr --languages {','.join(key)}): {e}"
+                )
+            _readers[key] = reader
+
+    return reader
+
+
+def preload():
+    """
+    Create the readers for config.OCR_PRELOAD_LANGUAGES. Language sets whose
+    models are missing are skipped and fail on first use instead.
+    """
+    for languages in config.OCR_PRELOAD_LANGUAGES:
+        try:
+            get_reader(languages)
+        except Exception:
+            pass
@@ -0,0 +1,55 @@
+
+# utils/page_render.py
+
+import math
+
+import config
+
+
+# PDF page rasterisation under a memory budget, shared by pdf_to_jpg and
+# pdf_to_ppt. A pixmap costs width x height x components bytes, so an A0
+# poster at 200 DPI needs over 300 MB. Pages whose pixmap would exceed
+# RENDER_MAX_PIXMAP_BYTES are rendered at the highest DPI that fits instead.
+
+
+def page_dpi(rect, dpi: float, components: int = 3) -> float:
+    """
+    DPI to render a page of rect (in points) at: dpi, or less if the
+    pixmap would not fit in RENDER_MAX_PIXMAP_BYTES.
+    """
+    width, height = rect.width * dpi / 72, rect.height * dpi / 72
+    size = width * height * components
+    if size <= config.RENDER_MAX_PIXMAP_BYTES:
+        return dpi
+    return dpi * math.sqrt(config.RENDER_MAX_PIXMAP_BYTES / size)
+
+
+def render_page(page, dpi: float, grayscale: bool = False):
+    """
+    (pixmap, DPI it was rendered at) for a fitz page.
+    """
+    import fitz
+
+    colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+    used_dpi = page_dpi(page.rect, dpi, colorspace.n)
+    zoom = used_dpi / 72
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False), used_dpi
+
+
+def plan_document(doc, dpi: float, grayscale: bool = False) -> list:
+    """
+    The DPI each page of doc will be rendered at.
+    """
+    return [page_dpi(page.rect, dpi, 1 if grayscale else 3) for page in doc]
+
+
+def reduced_pages(plan: list, dpi: float, page_numbers=None) -> list:
+    """
+    Response entries for the pages (0-based numbers) of plan rendered below dpi.
+    """
+    if page_numbers is None:
+        page_numbers = range(len(plan))
+    return [
+        {"page": n + 1, "dpi": round(plan[n])}
+        for n in page_numbers if plan[n] < dpi
+    ]
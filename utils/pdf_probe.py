@@ -0,0 +1,126 @@
+
+# utils/pdf_probe.py
+
+import config
+
+
+# Cheap per-page probe for pdf_to_excel. Reading a page's text layer, word
+# boxes and vector drawings with PyMuPDF takes milliseconds, and tells which
+# extraction engines are worth running on it:
+#
+#   no text layer            -> OCR only (scanned page)
+#   ruling lines             -> camelot (lattice)
+#   aligned columns of text  -> tabula (stream)
+#   any text                 -> plain text extraction
+
+
+class PageProbe:
+    """
+    What the probe found on one page (number is 1-based).
+    """
+
+    def __init__(self, number: int, text_chars: int, rulings: int, table_rows: int):
+        self.number = number
+        self.text_chars = text_chars
+        self.rulings = rulings
+        self.table_rows = table_rows
+
+    @property
+    def scanned(self) -> bool:
+        return self.text_chars < config.PDF_PROBE_MIN_TEXT_CHARS
+
+    @property
+    def ruled(self) -> bool:
+        return self.rulings >= config.PDF_PROBE_MIN_RULINGS
+
+    @property
+    def tabular_text(self) -> bool:
+        return self.table_rows >= config.PDF_PROBE_MIN_TABLE_ROWS
+
+
+def _count_rulings(page) -> int:
+    """
+    Horizontal and vertical strokes at least PDF_PROBE_MIN_RULING_LENGTH
+    long; a stroked rectangle (a table cell) counts as its four sides.
+    """
+    min_length = config.PDF_PROBE_MIN_RULING_LENGTH
+    count = 0
+
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                dx, dy = abs(p2.x - p1.x), abs(p2.y - p1.y)
+                if (dy < 1 and dx >= min_length) or (dx < 1 and dy >= min_length):
+                    count += 1
+            elif item[0] == "re":
+                rect = item[1]
+                if rect.height < 2 and rect.width >= min_length:
+                    count += 1  # filled rectangle used as a horizontal rule
+                elif rect.width < 2 and rect.height >= min_length:
+                    count += 1
+                elif drawing.get("color") is not None and min(rect.width, rect.height) >= min_length:
+                    count += 4
+
+    return count
+
+
+def _count_table_rows(page) -> int:
+    """
+    Text lines (words grouped by baseline) split into at least three
+    columns by gaps wider than PDF_PROBE_COLUMN_GAP.
+    """
+    rows = {}
+    for x0, y0, x1, y1, *_ in page.get_text("words"):
+        rows.setdefault(round((y0 + y1) / 6), []).append((x0, x1))
+
+    count = 0
+    for words in rows.values():
+        words.sort()
+        cells = 1 + sum(
+            1 for (_, prev_end), (start, _) in zip(words, words[1:])
+            if start - prev_end > config.PDF_PROBE_COLUMN_GAP
+        )
+        if cells >= 3:
+            count += 1
+    return count
+
+
+def probe_pdf(pdf_path) -> list:
+    """
+    A PageProbe for every page of pdf_path.
+    """
+    import fitz
+
+    probes = []
+    with fitz.open(pdf_path) as doc:
+        for index, page in enumerate(doc):
+            text_chars = len(page.get_text("text").strip())
+            probes.append(PageProbe(
+                index + 1,
+                text_chars,
+                _count_rulings(page) if text_chars else 0,
+                _count_table_rows(page) if text_chars else 0,
+            ))
+    return probes
+
+
+def plan_extraction(probes: list) -> dict:
+    """
+    engine -> 1-based page numbers to run it on, for "camelot", "tabula",
+    "text" and "ocr".
+    """
+    plan = {"camelot": [], "tabula": [], "text": [], "ocr": []}
+
+    for probe in probes:
+        if probe.scanned:
+            plan["ocr"].append(probe.number)
+            continue
+
+        plan["text"].append(probe.number)
+        if probe.ruled:
+            plan["camelot"].append(probe.number)
+        elif probe.tabular_text:
+            plan["tabula"].append(probe.number)
+
+    return plan
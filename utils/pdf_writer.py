@@ -0,0 +1,213 @@
+
+# utils/pdf_writer.py
+
+import io
+import shutil
+import struct
+from pathlib import Path
+
+
+# Minimal streaming PDF writer for image-only documents (jpg_to_pdf).
+#
+# JPEGs are embedded as they are: the DCT stream is copied from the file into
+# a /DCTDecode image XObject, never decoded. Each page is written to disk as
+# soon as it is added, so only the object offsets stay in memory however many
+# pages the document has. The page tree and cross-reference table are written
+# by finish().
+
+# EXIF orientation -> page /Rotate (mirrored orientations are re-encoded)
+_EXIF_ROTATION = {1: 0, 3: 180, 6: 90, 8: 270}
+
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+_COLOR_SPACES = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+
+
+def _exif_orientation(data: bytes) -> int:
+    if not data.startswith(b"Exif\x00\x00") or len(data) < 14:
+        return 1
+
+    tiff = data[6:]
+    endian = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if endian is None:
+        return 1
+
+    try:
+        ifd = struct.unpack(endian + "I", tiff[4:8])[0]
+        count = struct.unpack(endian + "H", tiff[ifd:ifd + 2])[0]
+        for i in range(count):
+            entry = tiff[ifd + 2 + 12 * i:ifd + 14 + 12 * i]
+            tag, _, _ = struct.unpack(endian + "HHI", entry[:8])
+            if tag == 0x0112:
+                return struct.unpack(endian + "H", entry[8:10])[0]
+    except struct.error:
+        pass
+    return 1
+
+
+def jpeg_info(path):
+    """
+    (width, height, components, adobe, orientation) from a JPEG's headers,
+    or None when the file cannot be embedded as is (not a baseline or
+    progressive 8-bit JPEG with a known size).
+    """
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+
+        adobe, orientation = False, 1
+        while True:
+            byte = f.read(1)
+            if not byte:
+                return None
+            if byte != b"\xff":
+                continue
+
+            marker = f.read(1)
+            while marker == b"\xff":
+                marker = f.read(1)
+            if not marker:
+                return None
+            marker = marker[0]
+
+            if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+                continue
+            if marker in (0xD9, 0xDA):
+                return None
+
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return None
+            segment = f.read(struct.unpack(">H", length_bytes)[0] - 2)
+
+            if marker == 0xE1:
+                orientation = _exif_orientation(segment) if orientation == 1 else orientation
+            elif marker == 0xEE and segment.startswith(b"Adobe"):
+                adobe = True
+            elif marker in _SOF_MARKERS:
+                if marker not in (0xC0, 0xC1, 0xC2) or len(segment) < 6:
+                    return None
+                precision, height, width, components = struct.unpack(">BHHB", segment[:6])
+                if precision != 8 or not height or not width or components not in _COLOR_SPACES:
+                    return None
+                return width, height, components, adobe, orientation
+
+
+def _reencode(path):
+    """
+    Fallback for images jpeg_info rejects: decode with Pillow, apply the EXIF
+    orientation and encode a plain JPEG in memory.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("L" if image.mode in ("1", "L") else "RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=95)
+
+    components = 1 if image.mode == "L" else 3
+    return buffer.getvalue(), (image.width, image.height, components, False, 1)
+
+
+class StreamingPdfWriter:
+    """
+    Writes one image per page to path. Use as a context manager; the
+    document is completed on a clean exit.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "wb")
+        self._offsets = []
+        self._pages = []
+        self.reencoded = 0
+
+        # Objects 1 and 2 are the catalog and the page tree, written last
+        self._next_id = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.finish()
+        finally:
+            self._file.close()
+
+    def _allocate(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _begin(self, obj_id: int):
+        self._offsets.append((obj_id, self._file.tell()))
+        self._file.write(f"{obj_id} 0 obj\n".encode())
+
+    def _write_object(self, obj_id: int, body: str):
+        self._begin(obj_id)
+        self._file.write(body.encode() + b"\nendobj\n")
+
+    def _write_stream(self, obj_id: int, header: str, length: int, copy):
+        self._begin(obj_id)
+        entries = f"{header} /Length {length}" if header else f"/Length {length}"
+        self._file.write(f"<< {entries} >>\nstream\n".encode())
+        copy(self._file)
+        self._file.write(b"\nendstream\nendobj\n")
+
+    def add_jpeg(self, path):
+        """
+        Append a page showing the JPEG at path, one point per pixel.
+        """
+        info = jpeg_info(path)
+        if info is None or info[4] not in _EXIF_ROTATION:
+            data, info = _reencode(path)
+            length, copy = len(data), lambda out: out.write(data)
+            self.reencoded += 1
+        else:
+            def copy(out):
+                with open(path, "rb") as src:
+                    shutil.copyfileobj(src, out, 1024 * 1024)
+            length = Path(path).stat().st_size
+
+        width, height, components, adobe, orientation = info
+        image_id, content_id, page_id = self._allocate(), self._allocate(), self._allocate()
+
+        header = (
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {_COLOR_SPACES[components]} /BitsPerComponent 8 /Filter /DCTDecode"
+        )
+        if components == 4 and adobe:
+            # Adobe CMYK JPEGs store inverted values
+            header += " /Decode [1 0 1 0 1 0 1 0]"
+        self._write_stream(image_id, header, length, copy)
+
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode()
+        self._write_stream(content_id, "", len(content), lambda out: out.write(content))
+
+        self._write_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Rotate {_EXIF_ROTATION[orientation]} "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        self._pages.append(page_id)
+
+    def finish(self):
+        if not self._pages:
+            raise ValueError("A PDF needs at least one page")
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._pages)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        offsets = dict(self._offsets)
+        xref_offset = self._file.tell()
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, self._next_id)]
+        self._file.write("".join(lines).encode())
+        self._file.write(
+            f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+        )
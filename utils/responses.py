@@ -0,0 +1,30 @@
+
+# utils/responses.py
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+
+def unwrap_result(result):
+    """
+    Turn whatever a route returns (dict, pydantic model, JSONResponse) into
+    (payload, error_message). Exactly one of the two is None.
+    """
+    if isinstance(result, Response):
+        try:
+            body = json.loads(result.body)
+        except (ValueError, AttributeError):
+            body = {}
+
+        if result.status_code >= 400:
+            message = body.get("message") or body.get("detail") or f"HTTP {result.status_code}"
+            return None, message
+        return body, None
+
+    payload = jsonable_encoder(result)
+    if isinstance(payload, dict) and payload.get("status") == "error":
+        return None, payload.get("message", "Conversion failed")
+
+    return payload, None
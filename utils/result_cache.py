@@ -0,0 +1,204 @@
+
+# utils/result_cache.py
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import config
+from utils import metrics
+from utils.responses import unwrap_result
+from utils.storage_manager import payload_output_files, touch_access
+
+
+# Content-addressed cache of finished conversions.
+# key = sha256(tool, input bytes, parameters) -> the response payload that was
+# returned for it. Outputs stay where the tool wrote them (so download links
+# keep working); the cache only remembers which files belong to which key.
+# Entries are small JSON files, so every API worker shares the same cache.
+#
+# Expiring or evicting an entry never deletes its files: links to them may
+# have been handed out or be downloading right now. The storage janitor
+# deletes outputs on its own terms (TTL since last download, in-use guard),
+# and an entry whose files are gone is simply a miss.
+
+_in_flight = {}
+_last_eviction = 0.0
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _digest(item) -> str:
+    # Files are keyed by content and name: outputs (and the file_name in the
+    # payload) are named after the upload, so another name is another result
+    if hasattr(item, "sha256"):
+        # StoredUpload: already hashed while it was being saved
+        return f"{item.sha256}/{Path(item.path).name}"
+    if isinstance(item, (bytes, bytearray)):
+        return hashlib.sha256(item).hexdigest()
+    if isinstance(item, str):
+        return hashlib.sha256(item.encode("utf-8")).hexdigest()
+    return f"{file_digest(item)}/{Path(item).name}"
+
+
+def make_key(tool_name: str, digests, params: dict = None) -> str:
+    h = hashlib.sha256()
+    h.update(tool_name.encode("utf-8"))
+    for digest in digests:
+        h.update(b"\0" + digest.encode("utf-8"))
+    h.update(b"\0" + json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return config.RESULT_CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _remove_entry(entry_path: Path):
+    # Only the entry: the output files are left to the storage janitor
+    entry_path.unlink(missing_ok=True)
+
+
+def lookup(key: str):
+    entry_path = _entry_path(key)
+
+    try:
+        entry = json.loads(entry_path.read_text("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    expired = time.time() - entry.get("created", 0) > config.RESULT_CACHE_TTL_SECONDS
+    missing = any(not Path(f).exists() for f in entry.get("files", []))
+
+    if expired or missing:
+        _remove_entry(entry_path)
+        return None
+
+    # mtime doubles as "last used" for LRU eviction
+    os.utime(entry_path)
+    # The link is handed out again: count it as a download for the janitor
+    for file_path in entry.get("files", []):
+        touch_access(file_path)
+    return entry["payload"]
+
+
+def store(key: str, payload):
+    entry_path = _entry_path(key)
+    entry_path.parent.mkdir(parents=True, exist_ok=True)
+
+    files = payload_output_files(payload)
+    entry = {
+        "created": time.time(),
+        "payload": payload,
+        "files": files,
+        "size": sum(os.path.getsize(f) for f in files if os.path.exists(f)),
+    }
+
+    tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(entry), "utf-8")
+    os.replace(tmp_path, entry_path)
+
+
+def evict():
+    """
+    Drop expired entries, then least recently used ones until the cache is
+    within RESULT_CACHE_MAX_ENTRIES and RESULT_CACHE_MAX_BYTES.
+    """
+    now = time.time()
+    entries = []
+
+    for entry_path in config.RESULT_CACHE_DIR.glob("*/*.json"):
+        try:
+            entry = json.loads(entry_path.read_text("utf-8"))
+            last_used = entry_path.stat().st_mtime
+        except (OSError, ValueError):
+            continue
+
+        if now - entry.get("created", 0) > config.RESULT_CACHE_TTL_SECONDS:
+            _remove_entry(entry_path)
+            continue
+
+        entries.append((last_used, entry_path, entry))
+
+    entries.sort(key=lambda item: item[0])
+    total_bytes = sum(entry.get("size", 0) for _, _, entry in entries)
+
+    while entries and (
+        len(entries) > config.RESULT_CACHE_MAX_ENTRIES
+        or total_bytes > config.RESULT_CACHE_MAX_BYTES
+    ):
+        _, entry_path, entry = entries.pop(0)
+        total_bytes -= entry.get("size", 0)
+        _remove_entry(entry_path)
+
+
+def _store_and_evict(key: str, payload):
+    global _last_eviction
+
+    store(key, payload)
+
+    if time.time() - _last_eviction > config.RESULT_CACHE_EVICT_INTERVAL:
+        _last_eviction = time.time()
+        evict()
+
+
+def _retrieve_exception(future):
+    if not future.cancelled():
+        future.exception()
+
+
+async def cached(tool_name: str, work, inputs, params: dict = None):
+    """
+    Run work() unless the same inputs + params were already converted by
+    this tool. inputs are StoredUploads, file paths, bytes or text.
+
+    Identical requests arriving while the first one is still running wait for
+    it and share its result instead of converting again.
+    """
+    if not config.RESULT_CACHE_ENABLED:
+        return await work()
+
+    digests = await asyncio.to_thread(lambda: [_digest(item) for item in inputs])
+    key = make_key(tool_name, digests, params)
+
+    payload = await asyncio.to_thread(lookup, key)
+    if payload is not None:
+        metrics.record_cache_hit(tool_name, "hit")
+        return payload
+
+    future = _in_flight.get(key)
+    if future is not None:
+        metrics.record_cache_hit(tool_name, "coalesced")
+        return await asyncio.shield(future)
+
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(_retrieve_exception)
+    _in_flight[key] = future
+
+    try:
+        result = await work()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+    finally:
+        _in_flight.pop(key, None)
+
+    payload, error = unwrap_result(result)
+    if error is None and payload_output_files(payload):
+        await asyncio.to_thread(_store_and_evict, key, payload)
+
+    return result
@@ -0,0 +1,344 @@
+
+# utils/segmentation.py
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import config
+
+
+# Long-lived rembg sessions, one per model per process. Creating a session
+# loads the ONNX weights and builds the inference graph, which costs far more
+# than running it, so bg_remove and bg_white_adder share these instead of
+# calling rembg.remove() without a session (a new session every call).
+#
+# Both tools run in the "rembg" process pool, so each of its workers holds its
+# own sessions; they are created on first use or preloaded by the pool's
+# warm-up (see preload and config.WARMUP_IMPORTS).
+
+_sessions = {}
+_slots = {}
+_lock = threading.Lock()
+
+
+def resolve_model(model: str = None) -> str:
+    """
+    rembg model name for a request's model choice (custom models such as
+    the quantized u2net keep their own name). Raises ValueError for models
+    that are not offered or whose file is missing.
+    """
+    model = model or config.REMBG_DEFAULT_MODEL
+    if model in config.REMBG_CUSTOM_MODELS:
+        if not is_available(model):
+            raise ValueError(f"Model '{model}' is not installed on this server")
+        return model
+    if model not in config.REMBG_MODELS:
+        raise ValueError(f"Unknown model '{model}'. Choose one of: {', '.join(config.REMBG_MODELS)}")
+    return config.REMBG_MODELS[model]
+
+
+def is_available(model: str) -> bool:
+    """
+    Built-in rembg models are always available (downloaded on first use);
+    custom ones only once their .onnx file exists.
+    """
+    if model in config.REMBG_CUSTOM_MODELS:
+        return Path(config.REMBG_CUSTOM_MODELS[model][0]).exists()
+    return model in config.REMBG_MODELS
+
+
+def model_for_quality(model: str, quality: str) -> str:
+    """
+    The model a request runs with. "high" keeps the requested model; other
+    tiers use the first available model of config.REMBG_QUALITY_TIERS.
+    """
+    if quality not in config.REMBG_QUALITY_TIERS:
+        raise ValueError(f"Unknown quality '{quality}'. Choose one of: {', '.join(config.REMBG_QUALITY_TIERS)}")
+
+    candidates = config.REMBG_QUALITY_TIERS[quality]
+    if not candidates:
+        resolve_model(model)
+        return model or config.REMBG_DEFAULT_MODEL
+
+    for candidate in candidates:
+        if is_available(candidate):
+            return candidate
+    raise ValueError(f"No model available for quality '{quality}'")
+
+
+def get_session(model: str = None):
+    """
+    The shared session for model, created on first use.
+    """
+    model_name = resolve_model(model)
+
+    session = _sessions.get(model_name)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(model_name)
+        if session is None:
+            from rembg import new_session
+
+            if model_name in config.REMBG_CUSTOM_MODELS:
+                model_path, _ = config.REMBG_CUSTOM_MODELS[model_name]
+                session = new_session("u2net_custom", model_path=str(model_path))
+            else:
+                session = new_session(model_name)
+            _slots[model_name] = threading.BoundedSemaphore(config.REMBG_SESSION_CONCURRENCY)
+            _sessions[model_name] = session
+
+    return session
+
+
+def preload():
+    """
+    Create the sessions for config.REMBG_PRELOAD_MODELS. Models whose weights
+    cannot be loaded are skipped and retried on first use.
+    """
+    for model in config.REMBG_PRELOAD_MODELS:
+        try:
+            get_session(model)
+        except Exception:
+            pass
+
+
+# Batched inference
+#
+# rembg predicts one image per ONNX run. For batches we normalise each image
+# with the session's own preprocessing, stack them and run the graph once per
+# REMBG_INFERENCE_BATCH images. Models exported with a fixed batch size of 1
+# reject that; they are remembered and run image by image instead.
+
+# rembg model name -> (input size, mean, std), as in rembg's sessions
+MODEL_INPUTS = {
+    "u2net": (320, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225)),
+    "u2netp": (320, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225)),
+    "silueta": (320, (0.485, 0.456, 0.406), (0.229, 0.224, 0.225)),
+    "isnet-general-use": (1024, (0.485, 0.456, 0.406), (1.0, 1.0, 1.0)),
+}
+
+_single_batch_only = set()
+
+
+def _model_inputs(model_name: str):
+    if model_name in config.REMBG_CUSTOM_MODELS:
+        _, architecture = config.REMBG_CUSTOM_MODELS[model_name]
+        return MODEL_INPUTS.get(architecture)
+    return MODEL_INPUTS.get(model_name)
+
+
+def _to_mask(prediction):
+    import numpy as np
+    from PIL import Image
+
+    low, high = prediction.min(), prediction.max()
+    scaled = (prediction - low) / (high - low) if high > low else np.zeros_like(prediction)
+    return Image.fromarray((scaled * 255).astype("uint8"), mode="L")
+
+
+def _run_graph(session, model_name: str, images: list) -> list:
+    import numpy as np
+
+    side, mean, std = _model_inputs(model_name)
+    inputs = [session.normalize(image, mean, std, (side, side)) for image in images]
+    input_name = next(iter(inputs[0]))
+    batch = np.concatenate([item[input_name] for item in inputs], axis=0)
+
+    outputs = session.inner_session.run(None, {input_name: batch})
+    return [outputs[0][i, 0, :, :] for i in range(len(images))]
+
+
+def predict_raw_masks(images: list, model: str = None) -> list:
+    """
+    Alpha masks at the model's own resolution (e.g. 320x320) for a list of
+    RGB PIL images, inferred in batches. Scale them with fit_mask.
+    """
+    session = get_session(model)
+    model_name = resolve_model(model)
+    batch_size = max(1, config.REMBG_INFERENCE_BATCH)
+
+    if _model_inputs(model_name) is None:
+        # No known preprocessing: let rembg handle it one by one
+        with _slots[model_name]:
+            return [session.predict(image)[0] for image in images]
+
+    masks = []
+    with _slots[model_name]:
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+
+            predictions = None
+            if len(chunk) > 1 and model_name not in _single_batch_only:
+                try:
+                    predictions = _run_graph(session, model_name, chunk)
+                except Exception:
+                    _single_batch_only.add(model_name)
+
+            if predictions is None:
+                predictions = [_run_graph(session, model_name, [image])[0] for image in chunk]
+
+            masks += [_to_mask(pred) for pred in predictions]
+
+    return masks
+
+
+def fit_mask(mask, size):
+    from PIL import Image
+
+    return mask if mask.size == size else mask.resize(size, Image.LANCZOS)
+
+
+def predict_masks(images: list, model: str = None) -> list:
+    """
+    Alpha masks the size of each input image.
+    """
+    return [fit_mask(mask, image.size) for mask, image in zip(predict_raw_masks(images, model), images)]
+
+
+# Image loading
+
+def open_image(path):
+    """
+    Full-size RGB image, EXIF orientation applied.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        return ImageOps.exif_transpose(image).convert("RGB")
+
+
+def open_for_inference(path, model: str = None):
+    """
+    A reduced copy just big enough for the model's input. JPEGs are decoded
+    straight at 1/2..1/8 scale, so a 6000x4000 photo never becomes a
+    full-resolution buffer on its way into the model.
+    """
+    from PIL import Image, ImageOps
+
+    side = (_model_inputs(resolve_model(model)) or (1024,))[0]
+
+    with Image.open(path) as image:
+        image.draft("RGB", (side * 2, side * 2))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image.thumbnail((side * 2, side * 2), Image.BILINEAR)
+        return image
+
+
+# Mask cache
+#
+# Masks are stored at model resolution as small PNGs, keyed by the upload's
+# SHA-256 and the model, under MASK_CACHE_DIR. The directory is shared by all
+# worker processes, so bg_white_adder reuses the inference bg_remove did for
+# the same image (and vice versa) and only composites.
+
+_last_mask_eviction = 0.0
+
+
+def _mask_path(image_key: str, model_name: str, low_res: bool) -> Path:
+    variant = "lr" if low_res else "fr"
+    return config.MASK_CACHE_DIR / image_key[:2] / f"{image_key}_{model_name}_{variant}.png"
+
+
+def _load_cached_mask(path: Path):
+    from PIL import Image
+
+    try:
+        with Image.open(path) as mask:
+            mask.load()
+        os.utime(path)
+        return mask
+    except (OSError, ValueError):
+        return None
+
+
+def _store_mask(path: Path, mask):
+    global _last_mask_eviction
+
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        mask.save(tmp_path, "PNG")
+        os.replace(tmp_path, path)
+    except OSError:
+        return
+
+    if time.time() - _last_mask_eviction > config.MASK_CACHE_EVICT_INTERVAL:
+        _last_mask_eviction = time.time()
+        evict_masks()
+
+
+def evict_masks():
+    """
+    Drop masks past MASK_CACHE_TTL_SECONDS, then least recently used ones
+    until the cache fits in MASK_CACHE_MAX_BYTES.
+    """
+    now = time.time()
+    entries = []
+
+    for path in config.MASK_CACHE_DIR.glob("*/*.png"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if now - stat.st_mtime > config.MASK_CACHE_TTL_SECONDS:
+            path.unlink(missing_ok=True)
+        else:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= config.MASK_CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def masks_for(paths: list, images: list, image_keys: list, model: str = None, low_res: bool = None, map_func=map) -> list:
+    """
+    Full-size masks for decoded images (read from paths), using the mask
+    cache where image_keys (SHA-256 of each file, or None) allow.
+
+    low_res (default REMBG_LOW_RES_INFERENCE) feeds the model a reduced
+    decode instead of the full image. map_func can be an executor's map to
+    decode those in parallel.
+    """
+    model_name = resolve_model(model)
+    if low_res is None:
+        low_res = config.REMBG_LOW_RES_INFERENCE
+
+    masks = [None] * len(images)
+    cache_paths = [None] * len(images)
+
+    for i, key in enumerate(image_keys):
+        if key and config.MASK_CACHE_ENABLED:
+            cache_paths[i] = _mask_path(key, model_name, low_res)
+            masks[i] = _load_cached_mask(cache_paths[i])
+
+    missing = [i for i, mask in enumerate(masks) if mask is None]
+    if missing:
+        if low_res:
+            inputs = list(map_func(lambda i: open_for_inference(paths[i], model), missing))
+        else:
+            inputs = [images[i] for i in missing]
+
+        for i, mask in zip(missing, predict_raw_masks(inputs, model)):
+            masks[i] = mask
+            if cache_paths[i] is not None:
+                _store_mask(cache_paths[i], mask)
+
+    return [fit_mask(mask, image.size) for mask, image in zip(masks, images)]
+
+
+def cut_out(image, mask):
+    """
+    RGBA image with everything outside mask transparent.
+    """
+    from PIL import Image
+
+    empty = Image.new("RGBA", image.size, 0)
+    return Image.composite(image.convert("RGBA"), empty, mask)
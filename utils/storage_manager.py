@@ -2,12 +2,35 @@
 # utils/storage_manager.py
 
 from pathlib import Path
+from urllib.parse import quote, unquote
+import asyncio
+import hashlib
+import os
 import shutil
-from fastapi import UploadFile
-from .file_utils import get_unique_filename
+import time
+from contextvars import ContextVar
+from fastapi import UploadFile, HTTPException
+from . import metrics
+from .file_utils import create_request_dir, safe_filename
 import config
 
 
+# Output request folders build_output_path created for the current request,
+# until utils.jobs.dispatch claims them
+_new_output_dirs = ContextVar("new_output_dirs", default=None)
+
+
+class StoredUpload:
+    """
+    An upload saved to disk: where it is, how big it is and its SHA-256.
+    """
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
 def get_tool_dirs(tool_name: str) -> tuple[Path, Path]:
     """
     Returns (upload_dir, output_dir) for given tool_name.
@@ -24,23 +47,165 @@ def get_tool_dirs(tool_name: str) -> tuple[Path, Path]:
     return upload_dir, output_dir
 
 
-def save_upload(file: UploadFile, tool_name: str) -> Path:
+def get_max_upload_bytes(tool_name: str) -> int:
+    return config.MAX_UPLOAD_BYTES.get(tool_name, config.DEFAULT_MAX_UPLOAD_BYTES)
+
+
+def _copy_and_hash(source, file_path: Path, max_bytes: int):
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with file_path.open("wb") as buffer:
+            for chunk in iter(lambda: source.read(config.UPLOAD_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Limit is {max_bytes // (1024 * 1024)} MB."
+                    )
+                digest.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        remove_file(file_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+async def save_upload(file: UploadFile, tool_name: str, max_bytes: int = None) -> StoredUpload:
     """
-    Save uploaded file into the tool's upload directory and return the full path.
+    Stream the uploaded file into the tool's upload directory in chunks,
+    off the event loop. Rejects it with 413 past max_bytes (default: the
+    tool's limit from config.MAX_UPLOAD_BYTES) and hashes it on the way.
     """
     upload_dir, _ = get_tool_dirs(tool_name)
-    file_path = upload_dir / file.filename
+    file_path = create_request_dir(upload_dir) / safe_filename(file.filename)
+    max_bytes = max_bytes or get_max_upload_bytes(tool_name)
 
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    with metrics.stage(tool_name, "upload"):
+        size, sha256 = await asyncio.to_thread(_copy_and_hash, file.file, file_path, max_bytes)
 
-    return file_path
+    metrics.observe_bytes(tool_name, "input", size)
+    return StoredUpload(file_path, size, sha256)
 
 
 def build_output_path(original_name: str, extension: str, tool_name: str) -> Path:
     """
     Build a unique output path in the tool's output directory.
+    Each call gets its own request folder, so the file keeps its
+    human-friendly name and never collides with another request:
+    storage/outputs/<tool>/<request id>/<original_name><extension>
     """
     _, output_dir = get_tool_dirs(tool_name)
-    filename = get_unique_filename(output_dir, original_name, extension)
-    return output_dir / filename
+    filename = safe_filename(f"{original_name}{extension}")
+    request_dir = create_request_dir(output_dir)
+
+    created = _new_output_dirs.get()
+    if created is None:
+        created = []
+        _new_output_dirs.set(created)
+    created.append(request_dir)
+
+    return request_dir / filename
+
+
+def claim_output_dirs() -> list:
+    """
+    Output request folders build_output_path created so far in this request.
+    The caller owns them from now on; later calls start a new list.
+    """
+    created = _new_output_dirs.get() or []
+    _new_output_dirs.set(None)
+    return created
+
+
+def discard_unused_dirs(request_dirs, payload=None):
+    """
+    Remove the request folders that payload does not link into: the tool
+    failed, or the result came from the cache and never used them.
+    """
+    used = set()
+    for file_path in payload_output_files(payload):
+        used.update(Path(file_path).resolve().parents)
+
+    for request_dir in request_dirs:
+        if Path(request_dir).resolve() not in used:
+            shutil.rmtree(request_dir, ignore_errors=True)
+
+
+def build_download_url(output_path: Path) -> str:
+    """
+    Public /downloads URL of a file under OUTPUT_ROOT.
+    """
+    relative = Path(output_path).resolve().relative_to(config.OUTPUT_ROOT.resolve())
+    return f"{config.BASE_DOWNLOAD_URL}/{quote(relative.as_posix())}"
+
+
+def output_path_from_url(url: str):
+    """
+    Reverse of build_download_url; None for links that are not downloads.
+    """
+    prefix = f"{config.BASE_DOWNLOAD_URL}/"
+    if not url.startswith(prefix):
+        return None
+    return config.OUTPUT_ROOT / unquote(url[len(prefix):])
+
+
+def payload_output_files(payload) -> list:
+    """
+    Files under OUTPUT_ROOT that a response payload links to, including
+    links nested in lists (e.g. per-item results of a batch).
+    """
+    if isinstance(payload, str):
+        file_path = output_path_from_url(payload)
+        return [str(file_path)] if file_path is not None else []
+
+    values = payload.values() if isinstance(payload, dict) else payload if isinstance(payload, list) else []
+
+    files = []
+    for value in values:
+        files += payload_output_files(value)
+    return files
+
+
+def resolve_output_file(tool_name: str, file_name: str):
+    """
+    Path of a tool's output file from a /file/{file_name} route, or None if it
+    does not exist or points outside the tool's output folder.
+    """
+    tool_dir = (config.OUTPUT_ROOT / tool_name).resolve()
+    file_path = (tool_dir / file_name).resolve()
+
+    if tool_dir not in file_path.parents or not file_path.is_file():
+        return None
+
+    touch_access(file_path)
+    return file_path
+
+
+def touch_access(file_path: Path):
+    """
+    Record a download of file_path (its atime) for the storage janitor's
+    TTL / LRU eviction.
+    """
+    try:
+        stat = os.stat(file_path)
+        os.utime(file_path, (time.time(), stat.st_mtime))
+    except OSError:
+        pass
+
+
+def remove_file(file_path: Path):
+    """
+    Delete a stored file and its request folder once that folder is empty.
+    """
+    file_path = Path(file_path)
+    file_path.unlink(missing_ok=True)
+
+    parent = file_path.parent
+    if parent.parent.parent in (config.UPLOAD_ROOT, config.OUTPUT_ROOT):
+        try:
+            parent.rmdir()
+        except OSError:
+            pass
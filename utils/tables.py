@@ -0,0 +1,55 @@
+
+# utils/tables.py
+
+import config
+
+
+# tabula-java table extraction in a long-lived JVM. tabula-py (2.8+) runs
+# tabula through JPype when it is installed: the JVM is started in the
+# worker process on the first call and reused by every later call, instead
+# of spawning java (JVM startup + class loading) for each PDF. warm_up makes
+# that first call at pool start-up so no request pays for it.
+
+
+def read_tables(pdf_path, pages="all") -> list:
+    """
+    DataFrames for the tables tabula finds in pdf_path.
+    """
+    import tabula
+
+    return tabula.read_pdf(
+        str(pdf_path),
+        pages=pages,
+        multiple_tables=True,
+        force_subprocess=config.TABULA_FORCE_SUBPROCESS,
+        java_options=config.TABULA_JAVA_OPTIONS,
+        silent=True,
+    )
+
+
+def jvm_running() -> bool:
+    try:
+        import jpype
+    except ImportError:
+        return False
+    return jpype.isJVMStarted()
+
+
+def warm_up():
+    """
+    Start the JVM and load tabula's classes by extracting from a blank page.
+    """
+    import tempfile
+    from pathlib import Path
+
+    import fitz
+
+    with tempfile.TemporaryDirectory(prefix="dtit_tabula_") as tmp:
+        blank = Path(tmp) / "blank.pdf"
+        with fitz.open() as doc:
+            doc.new_page()
+            doc.save(blank)
+        try:
+            read_tables(blank, pages=1)
+        except Exception:
+            pass
@@ -0,0 +1,87 @@
+
+# utils/upload_limit.py
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+# Multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class _BodyTooLarge(HTTPException):
+    # An HTTPException so FastAPI's body parsing re-raises it as a 413
+    # instead of turning it into a generic 400.
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=413,
+            detail=f"File too large. Limit is {(limit - MULTIPART_OVERHEAD) // (1024 * 1024)} MB."
+        )
+
+
+class UploadLimitMiddleware:
+    """
+    Reject POST bodies bigger than the tool's upload limit with 413 before
+    they are parsed, using Content-Length when present and counting the
+    streamed body otherwise.
+
+    limits maps a route prefix (e.g. "/pdf-compress") to max bytes.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path: str):
+        for prefix, limit in self.limits:
+            if path == prefix or path.startswith(prefix + "/"):
+                return limit + MULTIPART_OVERHEAD
+        return None
+
+    async def _reject(self, scope, receive, send, limit: int):
+        response = JSONResponse(
+            status_code=413,
+            content={
+                "status": "error",
+                "message": f"File too large. Limit is {(limit - MULTIPART_OVERHEAD) // (1024 * 1024)} MB."
+            }
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+
+        limit = self._limit_for(scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return await self._reject(scope, receive, send, limit)
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise _BodyTooLarge(limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, limit)
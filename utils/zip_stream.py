@@ -0,0 +1,47 @@
+
+# utils/zip_stream.py
+
+import zipfile
+
+
+# ZIP archives produced on the fly for StreamingResponse. zipfile writes to
+# an unseekable sink by putting each entry's size and CRC in a data
+# descriptor after its data, so every entry can be sent as soon as it is
+# added and the archive is never held whole in memory or on disk.
+
+
+class _Sink:
+    """
+    Write-only file object that hands out what was written since the last take().
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(entries):
+    """
+    Bytes of a ZIP (entries stored, not deflated) built from entries, an
+    async iterable of (archive name, bytes). Each entry is yielded as soon
+    as it arrives; the central directory comes last.
+    """
+    sink = _Sink()
+
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        async for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.take()
+
+    yield sink.take()